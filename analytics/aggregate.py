@@ -0,0 +1,278 @@
+"""
+Pushdown Aggregation
+--------------------
+Runs the EDA group-bys inside a SQL engine and returns only the
+aggregated frame, so notebook memory is bounded by the result size.
+
+An aggregation spec mirrors what the notebooks do in pandas:
+
+    spec = {
+        "dimensions": ["order_year", "payment_method"],
+        "measures": {
+            "orders": ("transaction_id", "count"),
+            "revenue": ("final_amount_inr", "sum"),
+        },
+        "filters": {"category": ["Electronics", "Books"], "is_prime_member": True},
+        "years": (2019, 2025),
+    }
+
+Engines:
+  "duckdb"   - embedded DuckDB over the master CSV / Parquet file
+  "sqlite"   - embedded SQLite database built from the master CSV
+  "postgres" - star schema built by db_pipeline/build_star_schema.py
+
+Run (from the project root):
+python -m analytics.aggregate
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+from analytics.loader import coerce_master
+
+# ================================
+# CONFIG
+# ================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MASTER_PATH = os.path.join(BASE_DIR, "master", "amazon_india_master_2015_2025.csv")
+
+SQLITE_PATH = os.path.join(BASE_DIR, "master", "amazon_india_master_2015_2025.sqlite")
+
+# integer columns the loader leaves alone (see build_sqlite_master)
+PERIOD_COLS = ["order_year", "order_quarter", "order_month"]
+
+AGG_FUNCTIONS = {
+    "sum": "SUM({col})",
+    "mean": "AVG({col})",
+    "count": "COUNT({col})",
+    "size": "COUNT(*)",
+    "nunique": "COUNT(DISTINCT {col})",
+    "min": "MIN({col})",
+    "max": "MAX({col})",
+}
+
+# master column -> star schema expression
+STAR_SCHEMA_COLUMNS = {
+    "transaction_id": "t.transaction_id",
+    "order_date": "d.full_date",
+    "order_year": "d.year",
+    "order_quarter": "d.quarter",
+    "order_month": "d.month",
+    "customer_id": "c.customer_id",
+    "product_id": "p.product_id",
+    "product_name": "p.product_name",
+    "category": "p.category",
+    "subcategory": "p.subcategory",
+    "brand": "p.brand",
+    "product_weight_kg": "p.product_weight_kg",
+    "is_prime_eligible": "p.is_prime_eligible",
+    "product_rating": "p.product_rating",
+    "customer_city": "c.customer_city",
+    "customer_state": "c.customer_state",
+    "customer_tier": "c.customer_tier",
+    "customer_spending_tier": "c.customer_spending_tier",
+    "customer_age_group": "c.customer_age_group",
+    "is_prime_member": "c.is_prime_member",
+    "quantity": "t.quantity",
+    "subtotal_inr": "t.subtotal_inr",
+    "discount_percent": "t.discount_percent",
+    "discounted_price_inr": "t.discounted_price_inr",
+    "delivery_charges": "t.delivery_charges",
+    "final_amount_inr": "t.final_amount_inr",
+    "delivery_days": "t.delivery_days",
+    "delivery_type": "t.delivery_type",
+    "payment_method": "t.payment_method",
+    "return_status": "t.return_status",
+    "is_festival_sale": "t.is_festival_sale",
+    "festival_name": "t.festival_name",
+    "customer_rating": "t.customer_rating",
+}
+
+# facts without a product, customer or date keep NULL attributes
+STAR_SCHEMA_FROM = """transactions t
+LEFT JOIN products p ON p.product_key = t.product_key
+LEFT JOIN customers c ON c.customer_version_key = t.customer_version_key
+LEFT JOIN time_dimension d ON d.date_key = t.date_key"""
+
+MASTER_COLUMNS = set(STAR_SCHEMA_COLUMNS) | {"original_price_inr"}
+
+
+# ================================
+# SQL COMPILER
+# ================================
+
+def _column(name, engine):
+    if name not in MASTER_COLUMNS:
+        raise ValueError(f"Unknown column in aggregation spec: {name}")
+    if engine == "postgres":
+        if name not in STAR_SCHEMA_COLUMNS:
+            raise ValueError(f"Column not available in the star schema: {name}")
+        return STAR_SCHEMA_COLUMNS[name]
+    return f'"{name}"'
+
+
+def compile_spec(spec, engine="duckdb", source="master"):
+    """
+    Compiles an aggregation spec to (sql, params).
+
+    source is the FROM clause for the embedded engines; Postgres always
+    reads the star schema.
+    """
+    placeholder = "%s" if engine == "postgres" else "?"
+
+    dimensions = list(spec.get("dimensions", []))
+    measures = spec.get("measures", {"orders": (None, "size")})
+    filters = spec.get("filters", {})
+    years = spec.get("years")
+
+    select = [f"{_column(dim, engine)} AS {dim}" for dim in dimensions]
+
+    for alias, (col, func) in measures.items():
+        if func not in AGG_FUNCTIONS:
+            raise ValueError(f"Unsupported aggregation: {func}")
+        if not alias.isidentifier():
+            raise ValueError(f"Invalid measure name: {alias}")
+        if col is None and func not in ("size", "count"):
+            raise ValueError(f"Aggregation {func} needs a column: {alias}")
+        expr = AGG_FUNCTIONS[func].format(col=_column(col, engine) if col else "*")
+        select.append(f"{expr} AS {alias}")
+
+    where = []
+    params = []
+
+    for col, value in filters.items():
+        expr = _column(col, engine)
+        if value is None:
+            where.append(f"{expr} IS NULL")
+        elif isinstance(value, (list, tuple, set)):
+            values = list(value)
+            if not values:
+                # IN () is not valid SQL; an empty list matches nothing
+                where.append("FALSE")
+                continue
+            where.append(f"{expr} IN ({', '.join([placeholder] * len(values))})")
+            params.extend(values)
+        else:
+            where.append(f"{expr} = {placeholder}")
+            params.append(value)
+
+    if years is not None:
+        start, end = years
+        where.append(f"{_column('order_year', engine)} BETWEEN {placeholder} AND {placeholder}")
+        params.extend([int(start), int(end)])
+
+    from_clause = STAR_SCHEMA_FROM if engine == "postgres" else source
+
+    sql = f"SELECT {', '.join(select)}\nFROM {from_clause}"
+    if where:
+        sql += "\nWHERE " + "\n  AND ".join(where)
+    if dimensions:
+        group_by = ", ".join(_column(dim, engine) for dim in dimensions)
+        sql += f"\nGROUP BY {group_by}\nORDER BY {group_by}"
+
+    return sql, params
+
+
+# ================================
+# ENGINES
+# ================================
+
+def build_sqlite_master(csv_path=MASTER_PATH, db_path=SQLITE_PATH, chunksize=200_000):
+    """
+    Loads the master CSV into an indexed SQLite table in chunks.  Every
+    chunk is read as text and typed by the loader's coercions, so a
+    column gets the same SQLite type in every chunk; order_date is
+    stored as YYYY-MM-DD text.
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    conn = sqlite3.connect(db_path)
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype=str):
+        chunk = coerce_master(chunk)
+        chunk["order_date"] = chunk["order_date"].dt.strftime("%Y-%m-%d")
+        for col in PERIOD_COLS:
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("Int64")
+        chunk.to_sql("master", conn, if_exists="append", index=False)
+
+    conn.execute("CREATE INDEX idx_master_year ON master(order_year)")
+    conn.execute("CREATE INDEX idx_master_category ON master(category)")
+    conn.commit()
+    conn.close()
+
+    return db_path
+
+
+def _duckdb_source(path):
+    escaped = path.replace("'", "''")
+    if path.endswith(".parquet"):
+        return f"read_parquet('{escaped}')"
+    return f"read_csv_auto('{escaped}')"
+
+
+def aggregate(spec, engine="duckdb", path=None, conn=None):
+    """
+    Runs an aggregation spec and returns the aggregated DataFrame.
+
+    engine="duckdb"   path: master CSV or Parquet file
+    engine="sqlite"   path: SQLite file from build_sqlite_master()
+    engine="postgres" conn: open psycopg2 connection to the warehouse
+    """
+    if engine == "duckdb":
+        import duckdb
+
+        sql, params = compile_spec(spec, engine, _duckdb_source(path or MASTER_PATH))
+        with duckdb.connect() as db:
+            return db.execute(sql, params).fetchdf()
+
+    if engine == "sqlite":
+        sql, params = compile_spec(spec, engine, "master")
+        # sqlite3's context manager only commits, it does not close
+        with closing(sqlite3.connect(path or SQLITE_PATH)) as db:
+            return pd.read_sql_query(sql, db, params=params)
+
+    if engine == "postgres":
+        if conn is None:
+            raise ValueError("engine='postgres' needs an open connection")
+        sql, params = compile_spec(spec, engine)
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        columns = [desc[0] for desc in cur.description]
+        result = pd.DataFrame(cur.fetchall(), columns=columns)
+        cur.close()
+        return result
+
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+# ================================
+# DEMO
+# ================================
+
+if __name__ == "__main__":
+
+    yearly_revenue = aggregate({
+        "dimensions": ["order_year"],
+        "measures": {"final_amount_inr": ("final_amount_inr", "sum")},
+    })
+    yearly_revenue["growth_pct"] = yearly_revenue["final_amount_inr"].pct_change() * 100
+
+    print("📈 YEARLY REVENUE")
+    print(yearly_revenue)
+
+    payment_yearly = aggregate({
+        "dimensions": ["order_year", "payment_method"],
+        "measures": {"orders": (None, "size")},
+        "years": (2019, 2025),
+    })
+
+    print("\n💳 PAYMENT METHODS (2019–2025)")
+    print(payment_yearly.pivot(index="order_year", columns="payment_method",
+                               values="orders").fillna(0))
+
+    print("\n✅ Pushdown aggregation completed")
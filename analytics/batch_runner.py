@@ -0,0 +1,814 @@
+"""
+Headless EDA Batch Runner
+-------------------------
+Loads the master dataset once and runs the analyses of EDA_01_02 ...
+EDA_20 as registered jobs in a thread pool.  All jobs read the same
+in-memory DataFrame (no copies, no re-reads) and share cached
+intermediates such as yearly revenue, per-customer aggregates and
+discount buckets.  Every table is written as CSV and every chart as
+PNG to the output directory.
+
+Jobs must treat ctx.df as read-only; derived columns belong in an
+intermediate or in a filtered frame local to the job.  Jobs that drop
+rows with missing values take ctx.complete(columns), which is cached
+per column set and is ctx.df itself when no row is missing.
+
+Run (from the project root):
+python -m analytics.batch_runner --out analysis_output --workers 4
+python -m analytics.batch_runner --jobs EDA_04 EDA_20
+"""
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from analytics.cohorts import (
+    acquisitions_by_month,
+    next_month_retention,
+    product_lifecycle,
+)
+from analytics.customers import (
+    category_journey,
+    cohort_revenue,
+    customer_aggregates,
+    lifetime_value,
+    order_segments,
+    row_share,
+    score_rfm,
+)
+from analytics.loader import MASTER_PATH, load_master
+
+
+# ================================
+# REGISTRIES
+# ================================
+
+JOBS = {}
+
+INTERMEDIATES = {}
+
+
+def job(name):
+    """Registers an analysis job: fn(ctx) -> {output_name: table or Figure}."""
+    def register(fn):
+        JOBS[name] = fn
+        return fn
+    return register
+
+
+def intermediate(name):
+    """Registers a shared intermediate: fn(ctx) -> value, computed once."""
+    def register(fn):
+        INTERMEDIATES[name] = fn
+        return fn
+    return register
+
+
+class AnalysisContext:
+    """Shared read-only data plus a thread-safe intermediate cache."""
+
+    def __init__(self, df):
+        self.df = df
+        self._cache = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def get(self, name):
+        return self._cached(name, lambda: INTERMEDIATES[name](self))
+
+    def complete(self, *columns):
+        """ctx.df without the rows missing any of columns (no copy if none is)."""
+        key = ("complete", frozenset(columns))
+        return self._cached(key, lambda: self._complete(columns))
+
+    def _complete(self, columns):
+        dropped = np.zeros(len(self.df), dtype=bool)
+        for col in columns:
+            dropped |= self._cached(("missing", col), lambda: self.df[col].isna().to_numpy())
+        return self.df[~dropped] if dropped.any() else self.df
+
+    def _cached(self, key, compute):
+        if key in self._cache:
+            return self._cache[key]
+
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+
+        return self._cache[key]
+
+
+# ================================
+# SHARED INTERMEDIATES
+# ================================
+
+@intermediate("yearly_revenue")
+def _yearly_revenue(ctx):
+    yearly = (
+        ctx.df.groupby("order_year")["final_amount_inr"]
+          .sum()
+          .reset_index()
+          .sort_values("order_year")
+    )
+    yearly["growth_pct"] = yearly["final_amount_inr"].pct_change() * 100
+    return yearly
+
+
+@intermediate("monthly_revenue")
+def _monthly_revenue(ctx):
+    return (
+        ctx.df.groupby(["order_year", "order_month"])["final_amount_inr"]
+          .sum()
+          .reset_index()
+    )
+
+
+@intermediate("year_month")
+def _year_month(ctx):
+    return ctx.df["order_date"].dt.to_period("M")
+
+
+@intermediate("customer_aggregates")
+def _customer_aggregates(ctx):
+    return customer_aggregates(ctx.df)
+
+
+@intermediate("discount_bucket")
+def _discount_bucket(ctx):
+    return pd.cut(
+        ctx.df["discount_percent"],
+        bins=[0, 10, 20, 30, 40, 50, 100],
+        labels=["0-10", "10-20", "20-30", "30-40", "40-50", "50+"]
+    )
+
+
+@intermediate("sorted_by_customer")
+def _sorted_by_customer(ctx):
+    df = ctx.complete("customer_id", "order_date", "category")
+    return df.sort_values(["customer_id", "order_date"], kind="stable")
+
+
+# ================================
+# CHART HELPERS
+# ================================
+
+def _figure(title, xlabel="", ylabel="", size=(12, 6)):
+    fig = Figure(figsize=size)
+    ax = fig.add_subplot()
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    return fig, ax
+
+
+def _heatmap(table, title, xlabel="", ylabel=""):
+    fig, ax = _figure(title, xlabel, ylabel, size=(14, 7))
+    image = ax.imshow(table.to_numpy(dtype=float), aspect="auto", cmap="YlGnBu")
+    ax.set_xticks(range(table.shape[1]), [str(c) for c in table.columns], rotation=45)
+    ax.set_yticks(range(table.shape[0]), [str(i) for i in table.index])
+    fig.colorbar(image, ax=ax)
+    fig.tight_layout()
+    return fig
+
+
+def _bar(series, title, xlabel="", ylabel="", horizontal=False):
+    fig, ax = _figure(title, xlabel, ylabel)
+    labels = [str(i) for i in series.index]
+    if horizontal:
+        ax.barh(labels, series.to_numpy())
+    else:
+        ax.bar(labels, series.to_numpy())
+        ax.tick_params(axis="x", rotation=30)
+    fig.tight_layout()
+    return fig
+
+
+def _lines(table, title, xlabel="", ylabel=""):
+    fig, ax = _figure(title, xlabel, ylabel)
+    for col in table.columns:
+        ax.plot(table.index.astype(str), table[col].to_numpy(), marker="o", label=str(col))
+    if table.shape[1] > 1:
+        ax.legend(bbox_to_anchor=(1.02, 1), loc="upper left")
+    fig.tight_layout()
+    return fig
+
+
+def _stacked_area(table, title, xlabel="", ylabel=""):
+    fig, ax = _figure(title, xlabel, ylabel, size=(14, 7))
+    ax.stackplot(table.index.to_numpy(), table.to_numpy(dtype=float).T,
+                 labels=[str(c) for c in table.columns], alpha=0.9)
+    ax.legend(bbox_to_anchor=(1.02, 1), loc="upper left")
+    fig.tight_layout()
+    return fig
+
+
+# ================================
+# JOBS
+# ================================
+
+@job("EDA_01_02")
+def revenue_trends(ctx):
+    df = ctx.df
+    yearly = ctx.get("yearly_revenue")
+    monthly = ctx.get("monthly_revenue")
+
+    monthly_pivot = monthly.pivot(index="order_year", columns="order_month",
+                                  values="final_amount_inr")
+    peak_months = (
+        monthly.groupby("order_month")["final_amount_inr"]
+          .mean()
+          .sort_values(ascending=False)
+    )
+    category_month = (
+        df.groupby(["category", "order_month"])["final_amount_inr"]
+          .sum()
+          .unstack("category")
+    )
+
+    return {
+        "yearly_revenue": yearly,
+        "monthly_revenue": monthly,
+        "peak_months": peak_months,
+        "category_month": category_month,
+        "yearly_revenue_trend": _lines(yearly.set_index("order_year")[["final_amount_inr"]],
+                                       "Amazon India Yearly Revenue Growth (2015–2025)",
+                                       "Year", "Total Revenue (INR)"),
+        "monthly_heatmap": _heatmap(monthly_pivot, "Monthly Revenue Heatmap (Seasonality Analysis)",
+                                    "Month", "Year"),
+        "category_seasonality": _lines(category_month, "Category-wise Seasonal Revenue Trends",
+                                       "Month", "Revenue (INR)"),
+    }
+
+
+@job("EDA_03_14")
+def customer_segmentation(ctx):
+    customers = ctx.get("customer_aggregates")
+
+    rfm = score_rfm(customers)
+    revenue = cohort_revenue(ctx.df, customers).reset_index()
+    clv = lifetime_value(revenue)
+
+    segments = rfm["Segment"].value_counts()
+
+    return {
+        "rfm": rfm,
+        "segment_counts": segments,
+        "cohort_revenue": revenue,
+        "clv": clv,
+        "segment_distribution": _bar(segments, "Customer Segment Distribution",
+                                     "Segment", "Number of Customers"),
+        "clv_by_acquisition_year": _lines(clv.set_index("Acquisition_Year"),
+                                          "Customer Lifetime Value by Acquisition Year",
+                                          "Customer Acquisition Year",
+                                          "Total Lifetime Revenue (INR)"),
+    }
+
+
+@job("EDA_04")
+def payment_evolution(ctx):
+    major_methods = [
+        "UPI", "Cash on Delivery", "Credit Card", "Debit Card",
+        "Net Banking", "Wallet", "BNPL",
+    ]
+    payment = ctx.df["payment_method"].fillna("Unknown")
+    payment = payment.where(payment.isin(major_methods), "Other")
+
+    pivot_orders = (
+        ctx.df.groupby(["order_year", payment.rename("payment_method")])
+          .size()
+          .unstack("payment_method", fill_value=0)
+    )
+    pivot_share = pivot_orders.div(pivot_orders.sum(axis=1), axis=0) * 100
+
+    return {
+        "payment_orders": pivot_orders,
+        "payment_share": pivot_share,
+        "payment_orders_area": _stacked_area(pivot_orders, "Payment Method Evolution by Orders (2015–2025)",
+                                             "Year", "Number of Orders"),
+        "payment_share_area": _stacked_area(pivot_share, "Payment Method Market Share (%) (2015–2025)",
+                                            "Year", "Market Share (%)"),
+    }
+
+
+@job("EDA_05_13_19")
+def category_brand_performance(ctx):
+    df = ctx.complete("category", "brand", "final_amount_inr", "original_price_inr")
+
+    category_revenue = df.groupby("category")["final_amount_inr"].sum().sort_values(ascending=False)
+    category_yearly = (
+        df.groupby(["order_year", "category"])["final_amount_inr"].sum().unstack("category")
+    )
+
+    brand_revenue = df.groupby("brand")["final_amount_inr"].sum().sort_values(ascending=False)
+    top_brands = brand_revenue.head(10)
+    brand_pivot = (
+        df[df["brand"].isin(top_brands.index)]
+          .groupby(["order_year", "brand"])["final_amount_inr"]
+          .sum()
+          .unstack("brand", fill_value=0)
+    )
+    brand_share = brand_pivot.div(brand_pivot.sum(axis=1), axis=0) * 100
+
+    pricing_matrix = (
+        df.groupby(["brand", "category"])
+          .agg(
+              median_price=("original_price_inr", "median"),
+              total_orders=("transaction_id", "count")
+          )
+          .reset_index()
+    )
+
+    return {
+        "category_revenue": category_revenue,
+        "category_yearly": category_yearly,
+        "top_brands": top_brands,
+        "brand_share": brand_share,
+        "pricing_matrix": pricing_matrix,
+        "category_revenue_bar": _bar(category_revenue, "Revenue Contribution by Category (2015–2025)",
+                                     "Category", "Total Revenue (INR)"),
+        "brand_share_area": _stacked_area(brand_share, "Brand Market Share Evolution (%)",
+                                          "Year", "Market Share (%)"),
+    }
+
+
+@job("EDA_06")
+def prime_impact(ctx):
+    df = ctx.complete("final_amount_inr", "category")
+
+    aov = df.groupby("is_prime_member")["final_amount_inr"].mean()
+    order_freq = df.groupby(["customer_id", "is_prime_member"]).size().rename("order_count")
+    category_pref = (
+        df.groupby(["category", "is_prime_member"])["final_amount_inr"].sum().unstack("is_prime_member")
+    )
+    yearly_spend = (
+        df.groupby(["order_year", "is_prime_member"])["final_amount_inr"].sum().unstack("is_prime_member")
+    )
+    summary = df.groupby("is_prime_member").agg(
+        avg_order_value=("final_amount_inr", "mean"),
+        avg_orders_per_customer=("customer_id", "nunique"),
+        avg_delivery_days=("delivery_days", "mean"),
+        avg_rating=("customer_rating", "mean")
+    )
+
+    return {
+        "prime_counts": df["is_prime_member"].value_counts(),
+        "aov": aov,
+        "order_frequency": order_freq.groupby("is_prime_member").describe(),
+        "category_preference": category_pref,
+        "yearly_spend": yearly_spend,
+        "summary": summary,
+        "yearly_spend_trend": _lines(yearly_spend, "Yearly Revenue Trend: Prime vs Non-Prime",
+                                     "Year", "Revenue (INR)"),
+    }
+
+
+@job("EDA_07")
+def geographic_performance(ctx):
+    df = ctx.df
+
+    state_revenue = df.groupby("customer_state")["final_amount_inr"].sum().sort_values(ascending=False)
+    city_revenue = df.groupby("customer_city")["final_amount_inr"].sum().sort_values(ascending=False)
+    tier_revenue = df.groupby("customer_tier")["final_amount_inr"].sum()
+    tier_year = df.groupby(["order_year", "customer_tier"])["final_amount_inr"].sum().unstack("customer_tier")
+
+    top_states = state_revenue.head(5).index
+    state_year = (
+        df[df["customer_state"].isin(top_states)]
+          .groupby(["order_year", "customer_state"])["final_amount_inr"]
+          .sum()
+          .unstack("customer_state")
+    )
+    state_density = (
+        df.groupby("customer_state")
+          .agg(
+              total_revenue=("final_amount_inr", "sum"),
+              total_orders=("transaction_id", "count"),
+              avg_order_value=("final_amount_inr", "mean")
+          )
+          .sort_values("total_revenue", ascending=False)
+    )
+    pivot_tier_state = df.pivot_table(values="final_amount_inr", index="customer_state",
+                                      columns="customer_tier", aggfunc="sum")
+
+    return {
+        "state_revenue": state_revenue,
+        "city_revenue": city_revenue,
+        "tier_revenue": tier_revenue,
+        "tier_year": tier_year,
+        "state_year_top5": state_year,
+        "state_density": state_density,
+        "state_tier_revenue": pivot_tier_state,
+        "top_states_bar": _bar(state_revenue.head(15)[::-1], "Top 15 States by Revenue (2015–2025)",
+                               "Total Revenue (INR)", "State", horizontal=True),
+        "state_tier_heatmap": _heatmap(pivot_tier_state.fillna(0), "Revenue Heatmap: State vs Customer Tier"),
+    }
+
+
+@job("EDA_08")
+def festival_impact(ctx):
+    buffer = pd.Timedelta(days=14)
+    df = ctx.df[["order_date", "order_year", "is_festival_sale", "festival_name",
+                 "final_amount_inr", "transaction_id"]]
+
+    festival_ranges = (
+        df[df["is_festival_sale"]]
+          .groupby(["festival_name", "order_year"])
+          .agg(start_date=("order_date", "min"), end_date=("order_date", "max"))
+          .reset_index()
+    )
+
+    parts = []
+    for row in festival_ranges.itertuples(index=False):
+        in_year = df["order_year"] == row.order_year
+        windows = {
+            "Before": (df["order_date"] >= row.start_date - buffer)
+                      & (df["order_date"] < row.start_date) & ~df["is_festival_sale"],
+            "During": (df["order_date"] >= row.start_date) & (df["order_date"] <= row.end_date)
+                      & (df["festival_name"] == row.festival_name),
+            "After": (df["order_date"] > row.end_date)
+                     & (df["order_date"] <= row.end_date + buffer) & ~df["is_festival_sale"],
+        }
+        for window, mask in windows.items():
+            selected = df.loc[in_year & mask]
+            parts.append({
+                "festival_tag": row.festival_name,
+                "window": window,
+                "total_revenue": selected["final_amount_inr"].sum(),
+                "orders": len(selected),
+            })
+
+    festival_revenue = pd.DataFrame(parts, columns=["festival_tag", "window", "total_revenue", "orders"])
+    festival_revenue = festival_revenue.groupby(["festival_tag", "window"], as_index=False).sum()
+
+    summary = festival_revenue.pivot_table(index="festival_tag", columns="window",
+                                           values="total_revenue", fill_value=0)
+    summary = summary.reindex(columns=["Before", "During", "After"], fill_value=0)
+    summary["Festival Lift (%)"] = np.where(
+        summary["Before"] > 0,
+        (summary["During"] - summary["Before"]) / summary["Before"].where(summary["Before"] > 0) * 100,
+        0
+    )
+    summary = summary.sort_values("Festival Lift (%)", ascending=False)
+
+    return {
+        "festival_ranges": festival_ranges,
+        "festival_revenue": festival_revenue,
+        "festival_summary": summary,
+        "festival_lift": _bar(summary["Festival Lift (%)"], "Festival Revenue Lift (%)",
+                              "Festival", "Lift (%)"),
+    }
+
+
+@job("EDA_09")
+def demographics(ctx):
+    df = ctx.df
+
+    age_revenue = (
+        df.groupby("customer_age_group")
+          .agg(
+              total_revenue=("final_amount_inr", "sum"),
+              orders=("transaction_id", "count"),
+              avg_order_value=("final_amount_inr", "mean")
+          )
+          .sort_values("total_revenue", ascending=False)
+    )
+    age_revenue["Revenue Share (%)"] = age_revenue["total_revenue"] / age_revenue["total_revenue"].sum() * 100
+
+    age_category = df.pivot_table(index="customer_age_group", columns="category",
+                                  values="final_amount_inr", aggfunc="sum", fill_value=0)
+    freq = df.groupby("customer_age_group").agg(
+        orders=("transaction_id", "count"),
+        customers=("customer_id", "nunique")
+    )
+    freq["orders_per_customer"] = freq["orders"] / freq["customers"]
+
+    payment_age = df.groupby(["customer_age_group", "payment_method"]).size().unstack(fill_value=0)
+    tier_age = df.groupby(["customer_age_group", "customer_tier"]).size().unstack(fill_value=0)
+
+    return {
+        "age_revenue": age_revenue,
+        "age_category_revenue": age_category,
+        "age_frequency": freq,
+        "payment_by_age": payment_age,
+        "tier_by_age": tier_age,
+        "age_category_heatmap": _heatmap(age_category, "Category Revenue by Age Group",
+                                         "Category", "Age Group"),
+        "age_revenue_share": _bar(age_revenue["Revenue Share (%)"], "Revenue Contribution by Age Group",
+                                  "Age Group", "Revenue Share (%)"),
+    }
+
+
+@job("EDA_10_15")
+def pricing_discounts(ctx):
+    df = ctx.df
+    bucket = ctx.get("discount_bucket").rename("discount_bucket")
+
+    cat_price_demand = (
+        df.groupby("category")
+          .agg(
+              avg_price=("original_price_inr", "mean"),
+              avg_qty=("quantity", "mean"),
+              total_qty=("quantity", "sum")
+          )
+          .sort_values("avg_price")
+    )
+    corr = df[["original_price_inr", "discount_percent", "discounted_price_inr",
+               "quantity", "final_amount_inr"]].corr()
+
+    discount_perf = (
+        df.groupby(bucket, observed=False)
+          .agg(
+              avg_qty=("quantity", "mean"),
+              avg_revenue=("final_amount_inr", "mean"),
+              total_revenue=("final_amount_inr", "sum")
+          )
+    )
+    cat_disc = (
+        df.groupby(["category", bucket], observed=False)
+          .agg(revenue=("final_amount_inr", "sum"), qty=("quantity", "sum"))
+          .reset_index()
+    )
+    prime_disc = (
+        df.groupby(["is_prime_member", bucket], observed=False)
+          .agg(avg_qty=("quantity", "mean"), avg_revenue=("final_amount_inr", "mean"))
+          .reset_index()
+    )
+    year_disc = (
+        df.groupby(["order_year", bucket], observed=False)["final_amount_inr"]
+          .sum()
+          .unstack("discount_bucket")
+    )
+
+    return {
+        "category_price_demand": cat_price_demand,
+        "pricing_correlation": corr,
+        "discount_performance": discount_perf,
+        "category_discount": cat_disc,
+        "prime_discount": prime_disc,
+        "yearly_discount_revenue": year_disc,
+        "pricing_correlation_heatmap": _heatmap(corr, "Pricing & Demand Correlation Matrix"),
+        "discount_avg_qty": _bar(discount_perf["avg_qty"], "Average Quantity Sold vs Discount Level",
+                                 "Discount % Bucket", "Avg Quantity"),
+        "yearly_discount_trend": _lines(year_disc, "Revenue by Discount Level Over Time",
+                                        "Year", "Revenue (INR)"),
+    }
+
+
+@job("EDA_11_12")
+def delivery_returns(ctx):
+    df = ctx.complete("delivery_days", "customer_rating", "return_status",
+                      "customer_city", "customer_tier")
+
+    median_days = df["delivery_days"].median()
+    on_time = (df["delivery_days"] <= median_days).value_counts(normalize=True) * 100
+
+    top_cities = df["customer_city"].value_counts().head(15).index
+    top_city_df = df[df["customer_city"].isin(top_cities)]
+    city_perf = top_city_df.groupby("customer_city")["delivery_days"].mean().sort_values()
+    city_tier = top_city_df.pivot_table(values="delivery_days", index="customer_city",
+                                        columns="customer_tier", aggfunc="mean")
+
+    return_share = df["return_status"].value_counts(normalize=True) * 100
+    cat_return = pd.crosstab(df["category"], df["return_status"], normalize="index") * 100
+    prime_return = pd.crosstab(df["is_prime_member"], df["return_status"], normalize="index") * 100
+    cat_rating = df.groupby(["category", "return_status"])["customer_rating"].mean().unstack()
+    corr = df[["delivery_days", "discounted_price_inr", "final_amount_inr",
+               "product_rating", "customer_rating", "quantity"]].corr()
+
+    return {
+        "on_time_share": on_time,
+        "city_delivery_days": city_perf,
+        "city_tier_delivery_days": city_tier,
+        "return_share": return_share,
+        "category_return_pct": cat_return,
+        "prime_return_pct": prime_return,
+        "category_rating_by_return": cat_rating,
+        "delivery_correlation": corr,
+        "city_delivery_bar": _bar(city_perf, "Average Delivery Days — Top Cities",
+                                  "Days", "", horizontal=True),
+        "delivery_correlation_heatmap": _heatmap(corr, "Correlation — Delivery, Price, Ratings & Spend"),
+    }
+
+
+@job("EDA_16")
+def ratings_sales(ctx):
+    df = ctx.complete("product_rating", "quantity", "final_amount_inr", "category")
+
+    rating_band = pd.cut(df["product_rating"], bins=[0, 2, 3, 4, 5],
+                         labels=["0-2", "2-3", "3-4", "4-5"]).rename("rating_band")
+    price_band = pd.qcut(df["discounted_price_inr"], q=5,
+                         labels=["Very Low", "Low", "Medium", "High", "Very High"]).rename("price_band")
+
+    rating_perf = (
+        df.groupby(rating_band, observed=False)
+          .agg(
+              avg_qty=("quantity", "mean"),
+              avg_revenue=("final_amount_inr", "mean"),
+              total_revenue=("final_amount_inr", "sum")
+          )
+    )
+    cat_rating = (
+        df.groupby("category")
+          .agg(
+              avg_rating=("product_rating", "mean"),
+              total_qty=("quantity", "sum"),
+              total_revenue=("final_amount_inr", "sum")
+          )
+          .sort_values("avg_rating", ascending=False)
+    )
+    price_rating = (
+        df.groupby([price_band, rating_band], observed=False)
+          .agg(avg_qty=("quantity", "mean"), revenue=("final_amount_inr", "sum"))
+          .reset_index()
+    )
+    corr = df[["product_rating", "quantity", "final_amount_inr", "discounted_price_inr"]].corr()
+
+    return {
+        "rating_performance": rating_perf,
+        "category_rating": cat_rating,
+        "price_rating": price_rating,
+        "rating_correlation": corr,
+        "rating_avg_qty": _bar(rating_perf["avg_qty"], "Average Quantity Sold by Rating Band",
+                               "Rating Band", "Avg Quantity"),
+    }
+
+
+@job("EDA_17")
+def customer_journey(ctx):
+    df_sorted = ctx.get("sorted_by_customer")
+    customers = ctx.get("customer_aggregates")
+
+    segment = order_segments(customers["num_orders"])
+
+    transition, loyalty_dist, loyal_cat = category_journey(df_sorted)
+    transition = row_share(transition)
+    loyal_cat = row_share(loyal_cat)
+
+    segments = segment.value_counts()
+
+    return {
+        "segment_counts": segments,
+        "category_transition": transition,
+        "loyalty_stage_customers": loyalty_dist,
+        "loyalty_category_mix": loyal_cat,
+        "segment_bar": _bar(segments, "Customer Segments by Purchase Frequency", "", "Customers"),
+        "transition_heatmap": _heatmap(transition, "Transition Matrix: First Category → Last Category",
+                                       "Most Recent Category", "First Purchase Category"),
+    }
+
+
+@job("EDA_18")
+def product_lifecycle_job(ctx):
+    df = ctx.complete("product_id", "order_date", "category", "quantity")
+
+    curve, launch_curves, product_life = product_lifecycle(df)
+
+    early = product_life[product_life["months_since_launch"] <= 6].groupby("product_id")["quantity"].mean()
+    late = product_life[product_life["months_since_launch"] > 12].groupby("product_id")["quantity"].mean()
+    life_stage = pd.DataFrame({"early_avg": early, "late_avg": late}).dropna()
+    life_stage["stage"] = np.where(
+        life_stage["late_avg"] > life_stage["early_avg"] * 1.2,
+        "Growing",
+        np.where(life_stage["late_avg"] < life_stage["early_avg"] * 0.6, "Declining", "Mature")
+    )
+
+    yearly_cat = df.groupby(["order_year", "category"])["quantity"].sum().unstack("category")
+
+    return {
+        "lifecycle_curve": curve,
+        "launch_year_curves": launch_curves,
+        "life_stage": life_stage,
+        "stage_distribution": life_stage["stage"].value_counts(),
+        "category_volume": yearly_cat,
+        "fast_risers": early.sort_values(ascending=False).head(15),
+        "fast_decliners": late.sort_values().head(15),
+        "lifecycle_curve_plot": _lines(curve.to_frame(), "Average Product Sales vs Months Since Launch",
+                                       "Months Since Launch", "Avg Quantity Sold"),
+    }
+
+
+@job("EDA_20")
+def business_health(ctx):
+    df = ctx.complete("customer_id", "order_date", "final_amount_inr")
+    year_month = ctx.get("year_month").loc[df.index]
+
+    monthly_revenue = df.groupby(year_month)["final_amount_inr"].sum()
+    growth = monthly_revenue.pct_change() * 100
+    delivery_eff = df.groupby(year_month)["delivery_days"].mean()
+    acquisitions = acquisitions_by_month(df)
+    retention = next_month_retention(df)
+
+    cust_orders = df.groupby("customer_id").size()
+    summary = pd.Series({
+        "Total Revenue (INR)": df["final_amount_inr"].sum(),
+        "Avg Monthly Revenue Growth %": growth.mean(),
+        "Total Customers": df["customer_id"].nunique(),
+        "Repeat Purchase Rate %": (cust_orders > 1).mean() * 100,
+        "Avg Delivery Days": df["delivery_days"].mean(),
+    }, name="Value")
+
+    fig = Figure(figsize=(16, 12))
+    axes = fig.subplots(2, 2)
+    panels = [
+        (monthly_revenue, "Monthly Revenue", "INR"),
+        (acquisitions, "Customer Acquisition per Month", "New Customers"),
+        (retention, "Next-Month Retention Rate (%)", "%"),
+        (delivery_eff, "Avg Delivery Days", "Days"),
+    ]
+    for ax, (series, title, ylabel) in zip(axes.ravel(), panels):
+        ax.plot(series.index.to_timestamp(), series.to_numpy())
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+    fig.suptitle("Amazon India — Business Health Dashboard", fontsize=16)
+    fig.tight_layout()
+
+    return {
+        "monthly_revenue": monthly_revenue,
+        "customer_acquisition": acquisitions,
+        "next_month_retention": retention,
+        "delivery_efficiency": delivery_eff,
+        "kpi_summary": summary,
+        "business_health_dashboard": fig,
+    }
+
+
+# ================================
+# RUNNER
+# ================================
+
+def _write_outputs(name, outputs, out_dir):
+    job_dir = os.path.join(out_dir, name)
+    os.makedirs(job_dir, exist_ok=True)
+
+    written = 0
+    for output_name, value in outputs.items():
+        if isinstance(value, Figure):
+            value.savefig(os.path.join(job_dir, f"{output_name}.png"), dpi=110)
+        else:
+            value.to_csv(os.path.join(job_dir, f"{output_name}.csv"))
+        written += 1
+
+    return written
+
+
+def _run_job(name, ctx, out_dir):
+    start = time.perf_counter()
+    outputs = JOBS[name](ctx)
+    written = _write_outputs(name, outputs, out_dir)
+    return written, time.perf_counter() - start
+
+
+def run_batch(df=None, jobs=None, out_dir="analysis_output", workers=4, data_path=MASTER_PATH):
+    """
+    Runs the registered jobs against one shared DataFrame.
+    Returns {job_name: (outputs_written, seconds)}; failed jobs map to
+    the exception they raised.
+    """
+    if df is None:
+        print("📥 Loading master data:", data_path)
+        df = load_master(data_path)
+    print("Dataset Shape:", df.shape)
+
+    ctx = AnalysisContext(df)
+    names = list(jobs or JOBS)
+    results = {}
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_job, name, ctx, out_dir): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                written, seconds = future.result()
+                results[name] = (written, seconds)
+                print(f"✅ {name:<14} {written:>3} outputs  {seconds:6.2f}s")
+            except Exception as exc:
+                results[name] = exc
+                print(f"❌ {name:<14} failed: {exc!r}")
+
+    return results
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run all EDA analyses headless")
+    parser.add_argument("--data", default=MASTER_PATH)
+    parser.add_argument("--out", default="analysis_output")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--jobs", nargs="*", choices=sorted(JOBS))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    run_batch(jobs=args.jobs, out_dir=args.out, workers=args.workers, data_path=args.data)
+
+    print(f"\n🎯 Analysis pack written to {args.out} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,307 @@
+"""
+Cohort Engine
+-------------
+Integer month-indexed cohorts for customer retention (EDA_20) and
+product lifecycle (EDA_18) analyses.
+
+Dates are mapped to integer month indices (months since 1970-01) and
+entities to integer codes, so cohort x offset matrices are built with
+np.bincount instead of string year_month keys, merges and groupbys.
+
+Run (from the project root):
+python -m analytics.cohorts
+
+Usage (from a notebook in EDA/):
+    import sys; sys.path.append("..")
+    from analytics.cohorts import customer_retention, product_lifecycle
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ================================
+# INDEXING
+# ================================
+
+def month_index(dates):
+    """
+    Maps dates to integer month indices (months since 1970-01).
+    The index equals the ordinal of pd.Period(freq="M").
+    """
+    values = pd.to_datetime(pd.Series(dates), errors="coerce").to_numpy()
+    return values.astype("datetime64[M]").astype(np.int64)
+
+
+def month_labels(indices):
+    """Converts integer month indices back to a monthly PeriodIndex."""
+    return pd.PeriodIndex.from_ordinals(np.asarray(indices, dtype=np.int64), freq="M")
+
+
+def assign_cohorts(entity_ids, dates):
+    """
+    Integer cohort assignment.
+
+    Returns (codes, months, first_month, valid, labels) where codes are
+    entity codes, months the month index of every row, first_month the
+    first active month per entity code and labels the entity id of
+    each code.  Rows with a missing entity or date are excluded by the
+    callers through the valid mask.
+    """
+    months = month_index(dates)
+    codes, labels = pd.factorize(pd.Series(entity_ids), sort=False)
+
+    valid = (codes >= 0) & (months != np.iinfo(np.int64).min)
+
+    first_month = np.full(codes.max() + 1 if len(codes) else 0,
+                          np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first_month, codes[valid], months[valid])
+
+    return codes, months, first_month, valid, labels
+
+
+# ================================
+# CORE MATRIX BUILDER
+# ================================
+
+def cohort_matrix(entity_ids, dates, values=None, how="sum", cohort_freq="M"):
+    """
+    Builds a cohort x offset matrix.
+
+    cohort_freq="M" groups entities by first active month, "Y" by first
+    active year.  Offsets are always months since the entity's first
+    active month.
+
+    how:
+      "sum"    - sum of values per cell
+      "mean"   - mean of values per cell (row weighted)
+      "count"  - number of rows per cell
+      "active" - number of distinct entities active per cell
+    """
+    codes, months, first_month, valid, _ = assign_cohorts(entity_ids, dates)
+
+    codes = codes[valid]
+    months = months[valid]
+    offsets = months - first_month[codes]
+
+    if cohort_freq == "Y":
+        code_cohort = first_month // 12
+    else:
+        code_cohort = first_month
+
+    base = code_cohort[codes].min() if len(codes) else 0
+    code_cohort = code_cohort - base
+    cohorts = code_cohort[codes]
+    n_cohorts = int(cohorts.max()) + 1 if len(cohorts) else 0
+    n_offsets = int(offsets.max()) + 1 if len(offsets) else 0
+    cells = cohorts * n_offsets + offsets
+    size = n_cohorts * n_offsets
+
+    if how == "active":
+        # one entry per (entity, offset) pair before counting
+        pairs = np.unique(codes * n_offsets + offsets)
+        pair_cells = code_cohort[pairs // n_offsets] * n_offsets + pairs % n_offsets
+        matrix = np.bincount(pair_cells, minlength=size).astype(float)
+    elif how == "count":
+        matrix = np.bincount(cells, minlength=size).astype(float)
+    else:
+        weights = np.asarray(values, dtype=float)[valid]
+        has_value = ~np.isnan(weights)
+        totals = np.bincount(cells[has_value], weights=weights[has_value], minlength=size)
+        if how == "mean":
+            counts = np.bincount(cells[has_value], minlength=size)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                matrix = totals / counts
+        else:
+            matrix = totals
+
+    matrix = matrix.reshape(n_cohorts, n_offsets)
+
+    cohort_values = np.arange(n_cohorts) + base
+    if cohort_freq == "Y":
+        index = pd.Index(cohort_values + 1970, name="cohort_year")
+    else:
+        index = pd.Index(month_labels(cohort_values), name="cohort_month")
+
+    return pd.DataFrame(
+        matrix,
+        index=index,
+        columns=pd.RangeIndex(n_offsets, name="months_since_first"),
+    )
+
+
+# ================================
+# CUSTOMER RETENTION
+# ================================
+
+def customer_retention(df, customer_col="customer_id", date_col="order_date",
+                       cohort_freq="M"):
+    """
+    First-purchase cohort retention.
+
+    Returns (cohort_sizes, active_customers, retention_pct) where
+    active_customers[c, k] is the number of distinct customers of
+    cohort c who ordered k months after their first purchase.
+    """
+    active = cohort_matrix(df[customer_col], df[date_col],
+                           how="active", cohort_freq=cohort_freq)
+    if active.empty:
+        sizes = pd.Series(index=active.index, dtype=float, name="cohort_size")
+    else:
+        sizes = active[0].rename("cohort_size")
+    retention_pct = active.div(sizes, axis=0) * 100
+
+    return sizes, active, retention_pct
+
+
+def next_month_counts(df, customer_col="customer_id", date_col="order_date"):
+    """
+    Orders per month ("orders") and how many of them are followed by
+    the customer's next order in the following month ("retained"),
+    indexed by year_month.  This is EDA_20's row-level definition: of a
+    customer's orders in one month only the last one can be retained,
+    so the rate is per order, not per customer.  Both columns add up
+    across disjoint sets of customers.  Empty if no row has a customer
+    and a date.
+    """
+    codes, months, _, valid, _ = assign_cohorts(df[customer_col], df[date_col])
+    codes = codes[valid]
+    months = months[valid]
+
+    if not len(months):
+        return pd.DataFrame(
+            {"orders": np.zeros(0, dtype=np.int64), "retained": np.zeros(0)},
+            index=pd.Index(month_labels([]), name="year_month"),
+        )
+
+    base = months.min()
+    rel = months - base
+    n_months = int(rel.max()) + 2
+
+    keys = np.unique(codes * n_months + rel)
+    # n_months includes one spare slot, so keys + 1 never wraps into
+    # the next customer's months
+    retained = np.isin(keys + 1, keys)
+    key_months = keys % n_months
+
+    orders = np.bincount(rel, minlength=n_months - 1)
+    kept = np.bincount(key_months, weights=retained, minlength=n_months - 1)
+
+    return pd.DataFrame(
+        {"orders": orders, "retained": kept},
+        index=pd.Index(month_labels(np.arange(n_months - 1) + base), name="year_month"),
+    )
+
+
+def retention_rate(counts):
+    """Next-month retention (%) from next_month_counts(), months with orders only."""
+    counts = counts[counts["orders"] > 0]
+    return (counts["retained"] / counts["orders"] * 100).rename("retained_next_month")
+
+
+def next_month_retention(df, customer_col="customer_id", date_col="order_date"):
+    """
+    Share (%) of a month's orders whose customer orders again in the
+    following month (EDA_20), indexed by year_month.
+    """
+    return retention_rate(next_month_counts(df, customer_col, date_col))
+
+
+def acquisitions_by_month(df, customer_col="customer_id", date_col="order_date"):
+    """Number of new customers per first-purchase month (empty if none)."""
+    _, _, first_month, _, _ = assign_cohorts(df[customer_col], df[date_col])
+    first_month = first_month[first_month != np.iinfo(np.int64).max]
+
+    base = first_month.min() if len(first_month) else 0
+    counts = np.bincount(first_month - base).astype(np.int64)
+
+    return pd.Series(
+        counts,
+        index=pd.Index(month_labels(np.arange(len(counts)) + base), name="year_month"),
+        name="new_customers",
+    )
+
+
+# ================================
+# PRODUCT LIFECYCLE
+# ================================
+
+def product_lifecycle(df, product_col="product_id", date_col="order_date",
+                      quantity_col="quantity"):
+    """
+    First-sale cohort quantity curves.
+
+    Returns (lifecycle_curve, launch_year_curves, product_month_qty):
+      lifecycle_curve     - mean quantity per row by months_since_launch
+      launch_year_curves  - launch_year x months_since_launch mean quantity
+      product_month_qty   - long table of quantity per product and
+                            months_since_launch (for stage classification)
+
+    Rows without a quantity are left out before launch months are
+    assigned, so a product launches with its first sale that has one.
+    """
+    df = df[pd.notna(np.asarray(df[quantity_col], dtype=float))]
+
+    codes, months, first_month, valid, labels = assign_cohorts(df[product_col], df[date_col])
+    quantity = np.asarray(df[quantity_col], dtype=float)[valid]
+    codes = codes[valid]
+    offsets = months[valid] - first_month[codes]
+
+    n_offsets = int(offsets.max()) + 1 if len(offsets) else 0
+
+    totals = np.bincount(offsets, weights=quantity, minlength=n_offsets)
+    counts = np.bincount(offsets, minlength=n_offsets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        curve = totals / counts
+
+    lifecycle_curve = pd.Series(
+        curve,
+        index=pd.RangeIndex(n_offsets, name="months_since_launch"),
+        name="quantity",
+    ).dropna()
+
+    launch_year_curves = cohort_matrix(
+        df[product_col], df[date_col], values=df[quantity_col],
+        how="mean", cohort_freq="Y",
+    )
+    launch_year_curves.index.name = "launch_year"
+    launch_year_curves.columns.name = "months_since_launch"
+
+    # product x offset totals, kept sparse
+    cell = codes.astype(np.int64) * n_offsets + offsets
+    cell_ids, inverse = np.unique(cell, return_inverse=True)
+    cell_qty = np.bincount(inverse, weights=quantity, minlength=len(cell_ids))
+
+    product_month_qty = pd.DataFrame({
+        "product_id": np.asarray(labels)[cell_ids // n_offsets],
+        "months_since_launch": cell_ids % n_offsets,
+        "quantity": cell_qty,
+    })
+
+    return lifecycle_curve, launch_year_curves, product_month_qty
+
+
+# ================================
+# DEMO
+# ================================
+
+if __name__ == "__main__":
+
+    DATA_PATH = "master/amazon_india_master_2015_2025.csv"
+
+    df = pd.read_csv(DATA_PATH, usecols=["customer_id", "product_id",
+                                         "order_date", "quantity"])
+    print("Dataset Shape:", df.shape)
+
+    sizes, active, retention_pct = customer_retention(df, cohort_freq="Y")
+    print("\n📊 RETENTION BY ACQUISITION YEAR (%)")
+    print(retention_pct.iloc[:, :13].round(1))
+
+    print("\n🔁 NEXT-MONTH RETENTION (%)")
+    print(next_month_retention(df).tail(12).round(2))
+
+    curve, launch_curves, _ = product_lifecycle(df)
+    print("\n📦 AVG QUANTITY BY MONTHS SINCE LAUNCH")
+    print(curve.head(13).round(3))
+
+    print("\n✅ Cohort analysis completed")
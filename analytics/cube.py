@@ -0,0 +1,438 @@
+"""
+Bitmap-Indexed Cube
+-------------------
+In-memory cube over the master dataset for interactive slice-and-dice
+over the dimensions the payment, Prime, geographic and demographic
+analyses (EDA_04, EDA_06, EDA_07, EDA_09) filter and group by.
+
+  dimensions  DIMENSIONS; every value (missing included) gets a
+              bitmap of the rows that have it, plus one small integer
+              code per row for grouping
+  measures    MEASURES, kept as float arrays
+  bitmaps     Roaring-style: rows are cut into chunks of 2^16, and a
+              chunk of a bitmap is stored as
+                array   sorted 16-bit row offsets (<= ARRAY_MAX rows)
+                bitmap  1024 64-bit words (more rows)
+                full    nothing at all (every row of the chunk)
+              and is left out when empty, so the time-ordered master
+              makes order_year bitmaps mostly full chunks and rare
+              values small arrays
+
+Filters use the aggregation-spec semantics (analytics.aggregate):
+values of one dimension are OR'ed, dimensions AND'ed (smallest bitmap
+first), and only the selected rows are read to group and aggregate the
+measures.  count() answers from the bitmaps alone.
+
+Usage (from a notebook in EDA/):
+    import sys; sys.path.append("..")
+    from analytics.cube import load_cube
+    cube = load_cube()
+    cube.count({"customer_state": "Karnataka", "is_prime_member": True})
+    cube.aggregate({
+        "dimensions": ["order_year", "payment_method"],
+        "measures": {"revenue": ("final_amount_inr", "sum")},
+        "filters": {"customer_tier": ["Metro", "Tier1"]},
+    })
+
+Run (from the project root):
+python -m analytics.cube
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics.loader import MASTER_PATH, load_master
+from analytics.zonemap import filter_rows
+
+# ================================
+# CONFIG
+# ================================
+
+DIMENSIONS = [
+    "customer_state",
+    "customer_tier",
+    "is_prime_member",
+    "customer_age_group",
+    "payment_method",
+    "category",
+    "order_year",
+]
+
+MEASURES = ["final_amount_inr", "quantity"]
+
+CHUNK_BITS = 16
+CHUNK_ROWS = 1 << CHUNK_BITS
+
+# above this many rows a chunk is cheaper as words (8 KiB) than as offsets
+ARRAY_MAX = 4096
+
+CUBE_FUNCTIONS = ["sum", "mean", "count", "size", "min", "max"]
+
+
+# ================================
+# CONTAINERS
+# ================================
+
+ARRAY, BITMAP, FULL = "array", "bitmap", "full"
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _words_from_offsets(offsets):
+    bits = np.zeros(CHUNK_ROWS, dtype=bool)
+    bits[offsets] = True
+    return np.packbits(bits, bitorder="little").view(np.uint64)
+
+
+def _offsets_from_words(words):
+    bits = np.unpackbits(words.view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _container(offsets, length):
+    """Container for the sorted offsets of a chunk of length rows (None = empty)."""
+    if len(offsets) == 0:
+        return None
+    if len(offsets) == length:
+        return (FULL, None)
+    if len(offsets) <= ARRAY_MAX:
+        return (ARRAY, offsets.astype(np.uint16))
+    return (BITMAP, _words_from_offsets(offsets))
+
+
+def _container_from_words(words, length):
+    cardinality = int(_POPCOUNT[words.view(np.uint8)].sum())
+    if cardinality == 0:
+        return None
+    if cardinality == length:
+        return (FULL, None)
+    if cardinality <= ARRAY_MAX:
+        return (ARRAY, _offsets_from_words(words))
+    return (BITMAP, words)
+
+
+def _words(container, length):
+    kind, data = container
+    if kind == BITMAP:
+        return data
+    if kind == ARRAY:
+        return _words_from_offsets(data)
+    return _words_from_offsets(np.arange(length))
+
+
+def _cardinality(container, length):
+    kind, data = container
+    if kind == FULL:
+        return length
+    if kind == ARRAY:
+        return len(data)
+    return int(_POPCOUNT[data.view(np.uint8)].sum())
+
+
+def _offsets(container, length):
+    kind, data = container
+    if kind == FULL:
+        return np.arange(length)
+    if kind == ARRAY:
+        return data
+    return _offsets_from_words(data)
+
+
+def _and(a, b, length):
+    if a[0] == FULL:
+        return b
+    if b[0] == FULL:
+        return a
+    if a[0] == ARRAY and b[0] == ARRAY:
+        return _container(np.intersect1d(a[1], b[1], assume_unique=True), length)
+    if a[0] == ARRAY or b[0] == ARRAY:
+        (_, offsets), (_, words) = (a, b) if a[0] == ARRAY else (b, a)
+        bits = words.view(np.uint8)[offsets >> 3] >> (offsets & 7).astype(np.uint8)
+        return _container(offsets[(bits & 1).astype(bool)], length)
+    return _container_from_words(a[1] & b[1], length)
+
+
+def _or(a, b, length):
+    if a[0] == FULL or b[0] == FULL:
+        return (FULL, None)
+    if a[0] == ARRAY and b[0] == ARRAY:
+        return _container(np.union1d(a[1], b[1]), length)
+    return _container_from_words(_words(a, length) | _words(b, length), length)
+
+
+# ================================
+# BITMAP
+# ================================
+
+class Bitmap:
+    """Set of row ids in [0, n_rows), one container per non-empty chunk."""
+
+    def __init__(self, n_rows, containers=None):
+        self.n_rows = n_rows
+        self.containers = containers or {}
+
+    @classmethod
+    def from_rows(cls, rows, n_rows):
+        """Bitmap of sorted, distinct row ids."""
+        rows = np.asarray(rows, dtype=np.int64)
+        bitmap = cls(n_rows)
+        chunks = rows >> CHUNK_BITS
+        starts = np.flatnonzero(np.diff(chunks, prepend=-1))
+        for start, end in zip(starts, np.append(starts[1:], len(rows))):
+            chunk = int(chunks[start])
+            offsets = (rows[start:end] - (chunk << CHUNK_BITS)).astype(np.uint16)
+            bitmap.containers[chunk] = _container(offsets, bitmap.chunk_length(chunk))
+        return bitmap
+
+    def chunk_length(self, chunk):
+        return min(CHUNK_ROWS, self.n_rows - (chunk << CHUNK_BITS))
+
+    def __and__(self, other):
+        result = Bitmap(self.n_rows)
+        for chunk in sorted(self.containers.keys() & other.containers.keys()):
+            container = _and(self.containers[chunk], other.containers[chunk], self.chunk_length(chunk))
+            if container is not None:
+                result.containers[chunk] = container
+        return result
+
+    def __or__(self, other):
+        result = Bitmap(self.n_rows)
+        for chunk in sorted(self.containers.keys() | other.containers.keys()):
+            a, b = self.containers.get(chunk), other.containers.get(chunk)
+            result.containers[chunk] = (a if b is None else b if a is None
+                                        else _or(a, b, self.chunk_length(chunk)))
+        return result
+
+    def __len__(self):
+        return sum(_cardinality(c, self.chunk_length(chunk)) for chunk, c in self.containers.items())
+
+    def rows(self):
+        """Sorted row ids."""
+        parts = [(chunk << CHUNK_BITS) + _offsets(self.containers[chunk], self.chunk_length(chunk)).astype(np.int64)
+                 for chunk in sorted(self.containers)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    @property
+    def nbytes(self):
+        return sum(0 if data is None else data.nbytes for _, data in self.containers.values())
+
+
+# ================================
+# CUBE
+# ================================
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+class Cube:
+    """Bitmap indexes, group codes and measure arrays of one frame."""
+
+    def __init__(self, df, dimensions=DIMENSIONS, measures=MEASURES):
+        self.n_rows = len(df)
+        self.labels = {}    # dim -> distinct values, sorted (missing = code len(labels))
+        self.codes = {}     # dim -> code per row
+        self.bitmaps = {}   # dim -> {value: Bitmap}, missing under None
+        self.values = {m: pd.to_numeric(df[m], errors="coerce").to_numpy(dtype=float) for m in measures}
+
+        for dim in dimensions:
+            codes, labels = pd.factorize(df[dim], sort=True)
+            codes = np.where(codes < 0, len(labels), codes)
+
+            # rows of every code, in row order
+            order = np.argsort(codes, kind="stable")
+            ends = np.cumsum(np.bincount(codes, minlength=len(labels) + 1))
+            keys = list(labels) + [None]
+
+            self.labels[dim] = labels
+            self.codes[dim] = codes.astype(np.int32)
+            self.bitmaps[dim] = {
+                key: Bitmap.from_rows(order[end - size:end], self.n_rows)
+                for key, end, size in zip(keys, ends, np.diff(ends, prepend=0)) if size
+            }
+
+    @property
+    def dimensions(self):
+        return list(self.bitmaps)
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for bitmaps in self.bitmaps.values() for b in bitmaps.values())
+
+    def _dimension(self, dim):
+        if dim not in self.bitmaps:
+            raise ValueError(f"{dim} is not a cube dimension ({', '.join(self.bitmaps)})")
+        return self.bitmaps[dim]
+
+    def _union(self, bitmaps):
+        result = Bitmap(self.n_rows)
+        for bitmap in bitmaps:
+            result = result | bitmap
+        return result
+
+    def select(self, filters=None, years=None):
+        """Bitmap of the rows inside filters / years (None = every row)."""
+        selected = []
+
+        for dim, value in (filters or {}).items():
+            bitmaps = self._dimension(dim)
+            selected.append(self._union(bitmaps[v] for v in _as_list(value) if v in bitmaps))
+
+        if years is not None:
+            start, end = (int(y) for y in years)
+            bitmaps = self._dimension("order_year")
+            selected.append(self._union(b for year, b in bitmaps.items()
+                                        if year is not None and start <= year <= end))
+
+        if not selected:
+            return None
+
+        # smallest first, so every AND works on the fewest chunks
+        selected.sort(key=len)
+        result = selected[0]
+        for bitmap in selected[1:]:
+            if not result.containers:
+                break
+            result = result & bitmap
+        return result
+
+    def count(self, filters=None, years=None):
+        """Rows inside filters / years, from the bitmaps alone."""
+        selection = self.select(filters, years)
+        return self.n_rows if selection is None else len(selection)
+
+    def aggregate(self, spec):
+        """
+        analytics.aggregate.aggregate() answered from the cube: one row
+        per group of the spec's dimensions (sorted, missing values
+        last), one column per measure.  Measures must be CUBE_FUNCTIONS
+        of the cube's measure columns; dates filters are not supported.
+        """
+        if spec.get("dates") is not None:
+            raise ValueError("The cube has no order_date; use analytics.aggregate")
+
+        dimensions = list(spec.get("dimensions", []))
+        measures = spec.get("measures", {"orders": (None, "size")})
+        for dim in dimensions:
+            self._dimension(dim)
+        for alias, (col, fn) in measures.items():
+            if fn not in CUBE_FUNCTIONS:
+                raise ValueError(f"Unknown measure function: {fn}")
+            if fn != "size" and col not in self.values:
+                raise ValueError(f"{col} is not a cube measure ({', '.join(self.values)})")
+
+        selection = self.select(spec.get("filters"), spec.get("years"))
+        rows = None if selection is None else selection.rows()
+
+        def take(array):
+            return array if rows is None else array[rows]
+
+        # one integer key per combination of dimension codes
+        key = np.zeros(self.n_rows if rows is None else len(rows), dtype=np.int64)
+        for dim in dimensions:
+            key = key * (len(self.labels[dim]) + 1) + take(self.codes[dim])
+        groups, group = np.unique(key, return_inverse=True)
+        n_groups = len(groups) if dimensions else 1
+
+        result = pd.DataFrame(index=range(n_groups))
+        for dim in reversed(dimensions):
+            groups, codes = np.divmod(groups, len(self.labels[dim]) + 1)
+            labels = pd.Series(self.labels[dim])
+            result.insert(0, dim, labels.reindex(np.where(codes < len(labels), codes, -1)).to_numpy())
+
+        for alias, (col, fn) in measures.items():
+            if fn == "size":
+                result[alias] = np.bincount(group, minlength=n_groups)
+                continue
+
+            values = take(self.values[col])
+            present = ~np.isnan(values)
+            counts = np.bincount(group, weights=present, minlength=n_groups)
+
+            if fn == "count":
+                result[alias] = counts.astype(np.int64)
+            elif fn in ("sum", "mean"):
+                sums = np.bincount(group, weights=np.where(present, values, 0.0), minlength=n_groups)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    result[alias] = sums if fn == "sum" else sums / counts
+            else:
+                extreme = np.full(n_groups, np.inf if fn == "min" else -np.inf)
+                (np.minimum if fn == "min" else np.maximum).at(extreme, group[present], values[present])
+                result[alias] = np.where(counts > 0, extreme, np.nan)
+
+        return result
+
+
+# ================================
+# LOADING
+# ================================
+
+_cubes = {}
+
+
+def build_cube(path=MASTER_PATH, dimensions=DIMENSIONS, measures=MEASURES):
+    """Reads the dimension and measure columns of the master and indexes them."""
+    return Cube(load_master(path, columns=list(dimensions) + list(measures)), dimensions, measures)
+
+
+def load_cube(path=MASTER_PATH):
+    """
+    The cube of the master at path, built once per process and rebuilt
+    when the file changes (an appended delta, a new full run).
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _cubes:
+        _cubes.clear()
+        _cubes[key] = build_cube(path)
+    return _cubes[key]
+
+
+# ================================
+# DEMO
+# ================================
+
+if __name__ == "__main__":
+
+    start = time.perf_counter()
+    df = load_master(columns=DIMENSIONS + MEASURES)
+    cube = Cube(df)
+    print(f"📦 {cube.n_rows} rows | {sum(len(b) for b in cube.bitmaps.values())} bitmaps "
+          f"| {cube.nbytes / 1024 ** 2:.1f} MiB | built in {time.perf_counter() - start:.2f}s")
+
+    slices = [
+        {"filters": {"customer_state": "Karnataka", "is_prime_member": True}},
+        {"filters": {"customer_tier": ["Metro", "Tier1"], "payment_method": "UPI"}, "years": (2020, 2025)},
+        {"filters": {"customer_age_group": "26-35", "category": "Electronics", "order_year": 2024}},
+    ]
+
+    print("\n⏱️  SLICES (cube vs pandas)")
+    for spec in slices:
+        spec = dict(spec, dimensions=["order_year"],
+                    measures={"revenue": ("final_amount_inr", "sum"), "units": ("quantity", "sum")})
+
+        start = time.perf_counter()
+        result = cube.aggregate(spec)
+        cube_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        expected = (filter_rows(df, spec["filters"], spec.get("years"))
+                    .groupby("order_year")[MEASURES].sum())
+        pandas_ms = (time.perf_counter() - start) * 1000
+
+        match = np.allclose(result["revenue"], expected["final_amount_inr"])
+        years = f" {spec['years']}" if "years" in spec else ""
+        print(f"{'✅' if match else '❌'} {spec['filters']}{years} "
+              f"| {cube.count(spec['filters'], spec.get('years'))} rows "
+              f"| cube {cube_ms:.1f} ms | pandas {pandas_ms:.1f} ms")
+
+    print("\n📊 REVENUE BY TIER AND PRIME (2024)")
+    print(cube.aggregate({
+        "dimensions": ["customer_tier", "is_prime_member"],
+        "measures": {"orders": (None, "size"), "revenue": ("final_amount_inr", "sum"),
+                     "avg_order_value": ("final_amount_inr", "mean")},
+        "years": (2024, 2024),
+    }).round(2).to_string(index=False))
@@ -0,0 +1,265 @@
+"""
+Per-Customer Analyses
+---------------------
+RFM segmentation and CLV (EDA_03_14), customer journeys (EDA_17) and
+retention (EDA_20), shared by the batch runner and the sharded runner.
+
+run_sharded() computes them over the customer-hash shards written by
+master/create_master_amazon_data.py (see analytics/shards.py): every
+shard is reduced to partial results in its own process, and the
+partials are merged here.  Since a customer never spans two shards,
+per-customer aggregates simply concatenate and counts simply add;
+only the RFM quartiles, the snapshot date and the row shares are
+computed after the merge.
+
+Run (from the project root):
+python -m analytics.customers --workers 4
+"""
+
+import argparse
+import time
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from analytics.cohorts import acquisitions_by_month, cohort_matrix, next_month_counts, retention_rate
+from analytics.loader import MASTER_PATH, load_master
+from analytics.shards import map_shards, shard_dir
+
+# ================================
+# CONFIG
+# ================================
+
+SHARD_COLUMNS = [
+    "transaction_id",
+    "customer_id",
+    "order_date",
+    "order_year",
+    "category",
+    "final_amount_inr",
+]
+
+ORDER_SEGMENTS = ([0, 1, 3, 10, np.inf], ["One-Time", "Occasional", "Regular", "Loyal"])
+
+LOYALTY_STAGES = ([0, 1, 3, 10, 1000], ["First-Time", "Occasional", "Regular", "Loyal"])
+
+
+# ================================
+# BUILDING BLOCKS
+# ================================
+
+def customer_totals(df):
+    """First / last order, order counts and revenue per customer."""
+    customers = df.groupby("customer_id").agg(
+        first_order=("order_date", "min"),
+        last_order=("order_date", "max"),
+        Frequency=("transaction_id", "count"),
+        num_orders=("transaction_id", "nunique"),
+        Monetary=("final_amount_inr", "sum"),
+    )
+    customers["first_purchase_year"] = customers["first_order"].dt.year
+    return customers
+
+
+def add_recency(customers, snapshot_date):
+    customers["Recency"] = (snapshot_date - customers["last_order"]).dt.days
+    return customers
+
+
+def customer_aggregates(df):
+    """customer_totals plus Recency (days before the day after the last order)."""
+    snapshot_date = df["order_date"].max() + pd.Timedelta(days=1)
+    return add_recency(customer_totals(df), snapshot_date)
+
+
+def score_rfm(customers):
+    """Quartile R / F / M scores and segments (EDA_03_14, Q3)."""
+    rfm = customers[["Recency", "Frequency", "Monetary"]].reset_index()
+    rfm["R_Score"] = pd.qcut(rfm["Recency"], 4, labels=[4, 3, 2, 1]).astype(int)
+    rfm["F_Score"] = pd.qcut(rfm["Frequency"].rank(method="first"), 4, labels=[1, 2, 3, 4]).astype(int)
+    rfm["M_Score"] = pd.qcut(rfm["Monetary"], 4, labels=[1, 2, 3, 4]).astype(int)
+    rfm["RFM_Score"] = (
+        rfm["R_Score"].astype(str) + rfm["F_Score"].astype(str) + rfm["M_Score"].astype(str)
+    )
+    r, f = rfm["R_Score"], rfm["F_Score"]
+    rfm["Segment"] = np.select(
+        [
+            (r == 4) & (f == 4),
+            (r >= 3) & (f >= 3),
+            r == 4,
+            f >= 3,
+            (r <= 2) & (f <= 2),
+        ],
+        ["Champions", "Loyal Customers", "Recent Customers", "Frequent Buyers", "At Risk"],
+        default="Others",
+    )
+    return rfm
+
+
+def cohort_revenue(df, customers):
+    """Revenue by (first_purchase_year, order_year) (EDA_03_14, Q14)."""
+    first_year = df["customer_id"].map(customers["first_purchase_year"])
+    return df.groupby([first_year.rename("first_purchase_year"), "order_year"])["final_amount_inr"].sum()
+
+
+def lifetime_value(cohort_revenue):
+    clv = cohort_revenue.groupby("first_purchase_year")["final_amount_inr"].sum().reset_index()
+    clv.columns = ["Acquisition_Year", "Customer_Lifetime_Value"]
+    return clv
+
+
+def order_segments(num_orders):
+    bins, labels = ORDER_SEGMENTS
+    return pd.cut(num_orders, bins=bins, labels=labels)
+
+
+def category_journey(df_sorted):
+    """
+    EDA_17 counts over rows sorted by customer_id, order_date:
+    (first x last category customers, customers per loyalty stage,
+    loyalty stage x category rows).
+    """
+    by_customer = df_sorted.groupby("customer_id", sort=False)["category"]
+    transition = pd.crosstab(by_customer.first().rename("first_category"),
+                             by_customer.last().rename("last_category"))
+
+    bins, labels = LOYALTY_STAGES
+    order_rank = df_sorted.groupby("customer_id", sort=False).cumcount() + 1
+    loyalty_stage = pd.cut(order_rank, bins=bins, labels=labels).rename("loyalty_stage")
+    loyalty_customers = df_sorted["customer_id"].groupby(loyalty_stage, observed=False).nunique()
+    loyalty_mix = pd.crosstab(loyalty_stage, df_sorted["category"])
+
+    return transition, loyalty_customers, loyalty_mix
+
+
+def row_share(table):
+    """Row-normalized table (pd.crosstab(..., normalize="index"))."""
+    return table.div(table.sum(axis=1), axis=0)
+
+
+# ================================
+# SHARDED RUN
+# ================================
+
+def shard_partials(path):
+    """Mergeable partial results of one shard (runs in a worker process)."""
+    df = load_master(path, columns=SHARD_COLUMNS)
+    if df.empty:
+        return None
+
+    customers = customer_totals(df)
+
+    journey_df = df.dropna(subset=["customer_id", "order_date", "category"])
+    journey_df = journey_df.sort_values(["customer_id", "order_date"], kind="stable")
+    transition, loyalty_customers, loyalty_mix = category_journey(journey_df)
+
+    active_df = df.dropna(subset=["customer_id", "order_date", "final_amount_inr"])
+
+    return {
+        "rows": len(df),
+        "max_date": df["order_date"].max(),
+        "customers": customers,
+        "cohort_revenue": cohort_revenue(df, customers),
+        "transition": transition,
+        "loyalty_customers": loyalty_customers,
+        "loyalty_mix": loyalty_mix,
+        "retention_active": cohort_matrix(active_df["customer_id"], active_df["order_date"],
+                                          how="active", cohort_freq="Y"),
+        "acquisitions": acquisitions_by_month(active_df),
+        "next_month": next_month_counts(active_df),
+    }
+
+
+def _add(tables):
+    return reduce(lambda a, b: a.add(b, fill_value=0), tables)
+
+
+def _month_range(index):
+    return pd.period_range(index.min(), index.max(), freq="M", name=index.name)
+
+
+def merge_partials(parts):
+    """Combines the shard partials into the final per-customer tables."""
+    parts = [p for p in parts if p is not None]
+
+    # RFM / CLV (EDA_03_14)
+    snapshot_date = max(p["max_date"] for p in parts) + pd.Timedelta(days=1)
+    customers = pd.concat([p["customers"] for p in parts]).sort_index()
+    customers = add_recency(customers, snapshot_date)
+    rfm = score_rfm(customers)
+
+    revenue = pd.concat([p["cohort_revenue"] for p in parts])
+    revenue = revenue.groupby(level=[0, 1]).sum().reset_index()
+
+    # journeys (EDA_17)
+    transition = _add([p["transition"] for p in parts]).fillna(0).sort_index().sort_index(axis=1)
+    loyalty_mix = _add([p["loyalty_mix"] for p in parts]).fillna(0).sort_index(axis=1)
+
+    # retention (EDA_20)
+    active = _add([p["retention_active"] for p in parts])
+    active = active.reindex(
+        index=pd.RangeIndex(active.index.min(), active.index.max() + 1, name=active.index.name),
+        columns=pd.RangeIndex(active.columns.max() + 1, name=active.columns.name),
+        fill_value=0,
+    ).fillna(0)
+    sizes = active[0].rename("cohort_size")
+
+    acquisitions = _add([p["acquisitions"] for p in parts])
+    acquisitions = acquisitions.reindex(_month_range(acquisitions.index), fill_value=0).astype(int)
+
+    next_month = _add([p["next_month"] for p in parts])
+    next_month = next_month.reindex(_month_range(next_month.index), fill_value=0)
+
+    return {
+        "customers": customers,
+        "rfm": rfm,
+        "segment_counts": rfm["Segment"].value_counts(),
+        "cohort_revenue": revenue,
+        "clv": lifetime_value(revenue),
+        "order_segment_counts": order_segments(customers["num_orders"]).value_counts(),
+        "category_transition": row_share(transition),
+        "loyalty_stage_customers": _add([p["loyalty_customers"] for p in parts]),
+        "loyalty_category_mix": row_share(loyalty_mix),
+        "cohort_sizes": sizes,
+        "retention_pct": active.div(sizes, axis=0) * 100,
+        "customer_acquisition": acquisitions.rename("new_customers"),
+        "next_month_retention": retention_rate(next_month),
+        "repeat_purchase_rate": (customers["num_orders"] > 1).mean() * 100,
+    }
+
+
+def run_sharded(shards=None, workers=None):
+    """Per-customer analyses over the customer-hash shards, one process per shard."""
+    return merge_partials(map_shards(shard_partials, shards or shard_dir(MASTER_PATH), workers))
+
+
+# ================================
+# RUN
+# ================================
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Sharded per-customer analyses")
+    parser.add_argument("--shards", default=shard_dir(MASTER_PATH))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_sharded(args.shards, args.workers)
+    print(f"\n🧩 Sharded analyses done in {time.perf_counter() - start:.2f}s "
+          f"| {len(results['customers'])} customers")
+
+    print("\n📊 RFM SEGMENTS")
+    print(results["segment_counts"])
+
+    print("\n💰 CLV BY ACQUISITION YEAR")
+    print(results["clv"])
+
+    print("\n🧭 CUSTOMERS PER LOYALTY STAGE")
+    print(results["loyalty_stage_customers"])
+
+    print("\n🔁 NEXT-MONTH RETENTION (%)")
+    print(results["next_month_retention"].tail(12).round(2))
+
+    print(f"\n✅ Repeat purchase rate: {results['repeat_purchase_rate']:.2f}%")
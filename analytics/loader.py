@@ -0,0 +1,116 @@
+"""
+Master Data Loader
+------------------
+Loads amazon_india_master_2015_2025.csv once with the type coercions
+the EDA notebooks repeat in their BASIC CLEAN cells.
+
+Usage (from a notebook in EDA/):
+    import sys; sys.path.append("..")
+    from analytics.loader import load_master
+    df = load_master()
+"""
+
+import os
+
+import pandas as pd
+
+from analytics.zonemap import filter_rows, load_zonemap, matching_blocks, read_blocks
+from cleaning.csv_io import read_csv
+
+
+# ================================
+# CONFIG
+# ================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MASTER_PATH = os.path.join(BASE_DIR, "master", "amazon_india_master_2015_2025.csv")
+
+NUMERIC_COLS = [
+    "original_price_inr",
+    "discount_percent",
+    "discounted_price_inr",
+    "quantity",
+    "subtotal_inr",
+    "delivery_charges",
+    "final_amount_inr",
+    "delivery_days",
+    "customer_rating",
+    "product_rating",
+    "product_weight_kg",
+]
+
+BOOL_COLS = ["is_prime_member", "is_prime_eligible", "is_festival_sale"]
+
+CATEGORY_COLS = [
+    "category",
+    "subcategory",
+    "brand",
+    "customer_city",
+    "customer_state",
+    "customer_tier",
+    "customer_spending_tier",
+    "customer_age_group",
+    "payment_method",
+    "delivery_type",
+    "return_status",
+    "festival_name",
+]
+
+
+# ================================
+# LOADER
+# ================================
+
+def coerce_master(df, categorical=False):
+    """Applies the notebook type coercions in place and returns df."""
+    if "order_date" in df.columns:
+        df["order_date"] = pd.to_datetime(df["order_date"], errors="coerce")
+
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    for col in BOOL_COLS:
+        if col in df.columns and df[col].dtype != bool:
+            df[col] = df[col].astype(str).str.lower().isin(["true", "1"])
+
+    if categorical:
+        for col in CATEGORY_COLS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+
+    return df
+
+
+def load_master(path=MASTER_PATH, columns=None, categorical=False, engine="auto",
+                filters=None, years=None, dates=None):
+    """
+    Reads the master dataset and coerces dates, numerics and booleans.
+    columns limits the read to the given columns.  A compressed
+    master (.csv.gz / .csv.zst) is used when the plain CSV is absent.
+
+    filters ({col: value | list | None}), years ((start, end)) and
+    dates ((start, end)) keep only matching rows; with a zone map next
+    to the master only the blocks that can match are read.
+    """
+    if not (filters or years or dates):
+        df = read_csv(path, engine=engine, usecols=columns)
+        return coerce_master(df, categorical=categorical)
+
+    read_cols = None
+    if columns is not None:
+        needed = list(filters or {}) + (["order_year"] if years else []) + (["order_date"] if dates else [])
+        read_cols = list(dict.fromkeys(list(columns) + needed))
+
+    zonemap = load_zonemap(path)
+    if zonemap is None:
+        df = read_csv(path, engine=engine, usecols=read_cols)
+    else:
+        blocks = matching_blocks(zonemap, filters, years, dates)
+        df = read_blocks(path, blocks, zonemap, engine=engine, usecols=read_cols)
+
+    df = filter_rows(coerce_master(df, categorical=categorical), filters, years, dates)
+    df = df.reset_index(drop=True)
+
+    return df if columns is None else df[list(columns)]
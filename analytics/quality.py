@@ -0,0 +1,162 @@
+"""
+Data-Quality Counters
+---------------------
+Counters emitted by every cleaning rule in All_clean_amazon.py and
+persisted next to each cleaned year file
+(amazon_india_<year>_quality.json).
+
+Each rule counts the same boolean masks it uses to apply its fix, so
+the counters cost one count_nonzero per mask and no extra pass over
+the data.  Layout of a metrics file:
+
+  {"year": "2015", "rows_in": ..., "rows_out": ...,
+   "rules": {"original_price_inr": {"divided_by_100": ..., ...}, ...}}
+
+Run (from the project root, after All_clean_amazon.py) for a
+cross-year drift report:
+python -m analytics.quality
+"""
+
+import glob
+import json
+
+import numpy as np
+import pandas as pd
+
+
+# ================================
+# CONFIG
+# ================================
+
+# flag a counter whose share of rows moved this many points vs the
+# median of the other years
+DRIFT_THRESHOLD_PCT = 5.0
+
+
+# ================================
+# COUNTERS
+# ================================
+
+class QualityCounters:
+
+    def __init__(self, year=None):
+        self.year = year
+        self.rows_in = 0
+        self.rows_out = 0
+        self.rules = {}
+
+    def count(self, rule, name, mask):
+        """Adds the number of True values in mask to rule.name."""
+        counters = self.rules.setdefault(rule, {})
+        counters[name] = counters.get(name, 0) + int(np.count_nonzero(mask))
+        return mask
+
+    def add(self, rule, name, value):
+        counters = self.rules.setdefault(rule, {})
+        counters[name] = counters.get(name, 0) + int(value)
+
+    def merge(self, other):
+        self.rows_in += other.rows_in
+        self.rows_out += other.rows_out
+        for rule, counters in other.rules.items():
+            for name, value in counters.items():
+                self.add(rule, name, value)
+        return self
+
+    def to_dict(self):
+        return {
+            "year": self.year,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rules": self.rules,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        counters = cls(data.get("year"))
+        counters.rows_in = data["rows_in"]
+        counters.rows_out = data["rows_out"]
+        counters.rules = {rule: dict(values) for rule, values in data["rules"].items()}
+        return counters
+
+
+# ================================
+# YEARLY METRICS FILES
+# ================================
+
+def metrics_path(cleaned_file):
+    """amazon_india_2015_cleaned.csv -> amazon_india_2015_quality.json"""
+    return cleaned_file.replace("_cleaned.csv", "_quality.json")
+
+
+def save_metrics(counters, path):
+    with open(path, "w") as f:
+        json.dump(counters.to_dict(), f, indent=2)
+
+
+def load_metrics(path):
+    with open(path) as f:
+        return QualityCounters.from_dict(json.load(f))
+
+
+def metrics_frame(counters_list):
+    """One row per year, one column per rule.counter, as % of input rows."""
+    rows = {}
+    for counters in counters_list:
+        rows[counters.year] = {
+            f"{rule}.{name}": value * 100 / max(counters.rows_in, 1)
+            for rule, values in counters.rules.items()
+            for name, value in values.items()
+        }
+    return pd.DataFrame.from_dict(rows, orient="index").sort_index()
+
+
+def drift_report(counters_list, threshold=DRIFT_THRESHOLD_PCT):
+    """Counters whose share in a year differs from the other years' median."""
+    pct = metrics_frame(counters_list)
+    if len(pct) < 2:
+        return pd.DataFrame(columns=["year", "counter", "pct", "baseline_pct", "delta_pct"])
+
+    flagged = []
+    for year in pct.index:
+        baseline = pct.drop(index=year).median()
+        delta = pct.loc[year] - baseline
+        for counter in delta.index[delta.abs() >= threshold]:
+            flagged.append({
+                "year": year,
+                "counter": counter,
+                "pct": round(pct.loc[year, counter], 2),
+                "baseline_pct": round(baseline[counter], 2),
+                "delta_pct": round(delta[counter], 2),
+            })
+
+    return pd.DataFrame(flagged, columns=["year", "counter", "pct", "baseline_pct", "delta_pct"])
+
+
+# ================================
+# CROSS-YEAR DRIFT REPORT
+# ================================
+
+if __name__ == "__main__":
+
+    files = sorted(glob.glob("amazon_india_*_quality.json"))
+    if not files:
+        raise SystemExit("❌ No quality files found; run All_clean_amazon.py first")
+
+    counters_list = [load_metrics(f) for f in files]
+
+    print(f"📊 {len(files)} yearly quality files")
+
+    print("\nROWS")
+    for counters in counters_list:
+        print(f"{counters.year:<6} in={counters.rows_in:>8} out={counters.rows_out:>8}")
+
+    report = drift_report(counters_list)
+
+    print(f"\nDRIFT (>= {DRIFT_THRESHOLD_PCT:.0f} pct. points vs other years' median)")
+    if report.empty:
+        print("No drift detected")
+    else:
+        print(report.to_string(index=False))
+
+    print("\n✅ Quality report completed")
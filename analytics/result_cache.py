@@ -0,0 +1,257 @@
+"""
+Aggregation Result Cache
+------------------------
+On-disk cache for analytics.aggregate results, so the aggregates the
+notebooks share (yearly revenue, revenue by category / state, payment
+share by year, ...) are computed once per version of the data.
+
+  key      = dataset version + normalized spec + engine
+  version  = BLAKE2 hash of the data file's content (the hash itself is
+             remembered per path / size / mtime, so an unchanged file
+             is not re-read)
+  storage  = one small Parquet file per result in CACHE_DIR
+  eviction = least recently used first once CACHE_DIR exceeds
+             MAX_CACHE_MB (a hit touches the file's mtime)
+
+Results of an older version of the data are never returned and are
+deleted on the next write.  Postgres results are not cached (the
+warehouse has no content version here).
+
+Usage:
+    from analytics.result_cache import cached_aggregate
+    yearly = cached_aggregate({"dimensions": ["order_year"],
+                               "measures": {"revenue": ("final_amount_inr", "sum")}})
+
+Run (from the project root):
+python -m analytics.result_cache
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from analytics.aggregate import MASTER_PATH, SQLITE_PATH, aggregate
+
+# ================================
+# CONFIG
+# ================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CACHE_DIR = os.path.join(BASE_DIR, "aggregate_cache")
+
+MAX_CACHE_MB = 256
+
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+
+VERSIONS_FILE = "versions.json"
+
+
+# ================================
+# KEYS
+# ================================
+
+def _normalize_value(value):
+    if isinstance(value, (list, tuple, set)):
+        return sorted((_normalize_value(v) for v in value), key=repr)
+    if hasattr(value, "item"):          # numpy scalar
+        return value.item()
+    return value
+
+
+def normalize_spec(spec):
+    """
+    Canonical form of an aggregation spec: measure and filter order
+    does not matter, list / tuple / set filters compare equal, and
+    defaults are filled in.  Dimension order is kept (it is the
+    column order of the result).
+    """
+    measures = spec.get("measures", {"orders": (None, "size")})
+    years = spec.get("years")
+    return {
+        "dimensions": list(spec.get("dimensions", [])),
+        "measures": {alias: list(measures[alias]) for alias in sorted(measures)},
+        "filters": {col: _normalize_value(value)
+                    for col, value in sorted(spec.get("filters", {}).items())},
+        "years": [int(years[0]), int(years[1])] if years is not None else None,
+    }
+
+
+def spec_key(spec, engine):
+    text = json.dumps({"engine": engine, "spec": normalize_spec(spec)}, sort_keys=True)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def content_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ================================
+# CACHE
+# ================================
+
+class ResultCache:
+
+    def __init__(self, cache_dir=CACHE_DIR, max_mb=MAX_CACHE_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # ---------- dataset versions ----------
+
+    def _versions_path(self):
+        return os.path.join(self.cache_dir, VERSIONS_FILE)
+
+    def dataset_version(self, path):
+        """Content hash of path, re-hashed only when size / mtime change."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+
+        versions = {}
+        if os.path.exists(self._versions_path()):
+            with open(self._versions_path()) as f:
+                versions = json.load(f)
+
+        entry = versions.get(path)
+        if entry is None or entry["signature"] != signature:
+            entry = {"signature": signature, "version": content_hash(path)}
+            versions[path] = entry
+            tmp_path = self._versions_path() + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(versions, f, indent=2)
+            os.replace(tmp_path, self._versions_path())
+
+        return entry["version"]
+
+    def current_versions(self):
+        if not os.path.exists(self._versions_path()):
+            return set()
+        with open(self._versions_path()) as f:
+            return {entry["version"] for entry in json.load(f).values()}
+
+    # ---------- results ----------
+
+    def result_path(self, version, key):
+        return os.path.join(self.cache_dir, f"{version}_{key}.parquet")
+
+    def get(self, version, key):
+        path = self.result_path(version, key)
+        if not os.path.exists(path):
+            return None
+        os.utime(path)      # mark as recently used
+        return pd.read_parquet(path)
+
+    def put(self, version, key, result):
+        path = self.result_path(version, key)
+        tmp_path = path + ".tmp"
+        result.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """[(path, size, last_used)] of all cached results, oldest first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".parquet"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda e: e[2])
+
+    def evict(self):
+        """Drops results of stale data versions, then LRU down to max size."""
+        versions = self.current_versions()
+        entries = []
+        for path, size, last_used in self.entries():
+            if os.path.basename(path).split("_")[0] not in versions:
+                os.remove(path)
+            else:
+                entries.append((path, size, last_used))
+
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            os.remove(path)
+
+
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+def cached_aggregate(spec, engine="duckdb", path=None, conn=None, cache=None):
+    """
+    aggregate() with the on-disk result cache in front of it.
+    Same arguments as analytics.aggregate.aggregate.
+    """
+    if engine == "postgres":
+        return aggregate(spec, engine, path, conn)
+
+    cache = cache or default_cache()
+    data_path = path or (SQLITE_PATH if engine == "sqlite" else MASTER_PATH)
+
+    version = cache.dataset_version(data_path)
+    key = spec_key(spec, engine)
+
+    result = cache.get(version, key)
+    if result is None:
+        result = aggregate(spec, engine, data_path, conn)
+        cache.put(version, key, result)
+
+    return result
+
+
+# ================================
+# DEMO
+# ================================
+
+if __name__ == "__main__":
+
+    specs = {
+        "yearly revenue": {
+            "dimensions": ["order_year"],
+            "measures": {"final_amount_inr": ("final_amount_inr", "sum")},
+        },
+        "revenue by category / state": {
+            "dimensions": ["category", "customer_state"],
+            "measures": {"revenue": ("final_amount_inr", "sum")},
+        },
+        "payment share by year": {
+            "dimensions": ["order_year", "payment_method"],
+            "measures": {"orders": (None, "size")},
+        },
+    }
+
+    for run in ("cold", "warm"):
+        print(f"\n🚀 {run} run")
+        for name, spec in specs.items():
+            start = time.perf_counter()
+            result = cached_aggregate(spec)
+            print(f"  {name:<30} {len(result):>5} rows | {time.perf_counter() - start:.3f}s")
+
+    yearly = cached_aggregate(specs["yearly revenue"])
+    yearly["growth_pct"] = yearly["final_amount_inr"].pct_change() * 100
+    print("\n📈 YEARLY REVENUE")
+    print(yearly)
+
+    size_mb = sum(size for _, size, _ in default_cache().entries()) / 1e6
+    print(f"\n✅ {len(default_cache().entries())} cached results | {size_mb:.2f} MB in {CACHE_DIR}")
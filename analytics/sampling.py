@@ -0,0 +1,283 @@
+"""
+Stratified Samples
+------------------
+Cached stratified samples of the master dataset, so exploratory cells
+in the EDA notebooks can run on 1% of the rows, with weighted
+estimates and confidence intervals.
+
+  strata    order_year x category x customer_tier
+  sample    simple random sample without replacement in every
+            stratum: n_h = fraction * N_h rows, at least
+            MIN_PER_STRATUM (or the whole stratum if smaller)
+  weights   sample_weight = N_h / n_h, the number of master rows a
+            sampled row stands for
+  cache     one Parquet file per (data version, fraction, seed) in
+            SAMPLE_DIR (analytics/result_cache.py), so a sample is
+            drawn once per version of the master
+
+estimate() gives stratified estimates of sums, means and row counts,
+per group and within filters, with the standard error from the
+within-stratum variances (finite population correction included) and
+a normal confidence interval.  Means are ratio estimates (weighted
+sum / weighted count) with a linearized variance.
+
+sampled_aggregate() takes the aggregation specs of analytics.aggregate,
+so a cell can switch to the exact answer by calling aggregate() (or
+cached_aggregate()) with the same spec.
+
+Usage (from a notebook in EDA/):
+    import sys; sys.path.append("..")
+    from analytics.sampling import estimate, load_sample
+    sample = load_sample(0.01)
+    estimate(sample, "final_amount_inr", "sum", by="order_year")
+
+Run (from the project root):
+python -m analytics.sampling
+"""
+
+import os
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from analytics.loader import MASTER_PATH, load_master
+from analytics.result_cache import ResultCache
+from analytics.zonemap import filter_rows
+
+# ================================
+# CONFIG
+# ================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_DIR = os.path.join(BASE_DIR, "sample_cache")
+
+MAX_SAMPLE_MB = 512
+
+STRATA = ["order_year", "category", "customer_tier"]
+
+DEFAULT_FRACTION = 0.01
+
+# two rows per stratum give a within-stratum variance
+MIN_PER_STRATUM = 2
+
+CONFIDENCE = 0.95
+
+# columns added to every sampled row
+WEIGHT_COLS = ["stratum", "stratum_rows", "stratum_sampled", "sample_weight"]
+
+
+# ================================
+# SAMPLING
+# ================================
+
+def stratified_sample(df, fraction=DEFAULT_FRACTION, seed=0, strata=STRATA):
+    """
+    Stratified random sample of df plus the WEIGHT_COLS columns
+    (stratum code, N_h, n_h and N_h / n_h).
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError("fraction must be in (0, 1]")
+
+    stratum = df.groupby(strata, dropna=False, sort=True).ngroup().to_numpy()
+    sizes = np.bincount(stratum)
+    sampled = np.minimum(np.maximum(np.round(sizes * fraction), MIN_PER_STRATUM), sizes).astype(np.int64)
+
+    # random order within each stratum; the first n_h rows are kept
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(df)), stratum))
+    starts = np.cumsum(sizes) - sizes
+    rank = np.empty(len(df), dtype=np.int64)
+    rank[order] = np.arange(len(df)) - starts[stratum[order]]
+    keep = rank < sampled[stratum]
+
+    sample = df[keep].reset_index(drop=True)
+    codes = stratum[keep]
+    sample["stratum"] = codes
+    sample["stratum_rows"] = sizes[codes]
+    sample["stratum_sampled"] = sampled[codes]
+    sample["sample_weight"] = sizes[codes] / sampled[codes]
+
+    return sample
+
+
+_sample_cache = None
+
+
+def sample_cache():
+    global _sample_cache
+    if _sample_cache is None:
+        _sample_cache = ResultCache(SAMPLE_DIR, MAX_SAMPLE_MB)
+    return _sample_cache
+
+
+def load_sample(fraction=DEFAULT_FRACTION, seed=0, path=MASTER_PATH, columns=None, cache=None):
+    """
+    The cached stratified sample of the master at path, drawn (from a
+    full read of the master) on first use for this version of the data.
+    columns limits the returned columns; WEIGHT_COLS are always kept.
+    """
+    cache = cache or sample_cache()
+    version = cache.dataset_version(path)
+    key = f"stratified-{fraction}-{seed}"
+
+    sample = cache.get(version, key)
+    if sample is None:
+        sample = stratified_sample(load_master(path), fraction, seed)
+        cache.put(version, key, sample)
+
+    if columns is not None:
+        sample = sample[list(dict.fromkeys(list(columns) + WEIGHT_COLS))]
+    return sample
+
+
+# ================================
+# ESTIMATES
+# ================================
+
+def _z(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def estimate(sample, value=None, how="sum", by=None, filters=None, years=None,
+             confidence=CONFIDENCE):
+    """
+    Estimates of a sum / mean of value, or of a row count, over the
+    master (per group of by, within filters / years with the
+    aggregation-spec semantics).  Rows with a missing value are left
+    out, as pandas does.
+
+    Returns one row per group: estimate, std_error, ci_low, ci_high
+    and sample_rows (sampled rows behind the estimate).
+    """
+    if how not in ("sum", "mean", "count"):
+        raise ValueError(f"Unknown estimate: {how}")
+    if how != "count" and value is None:
+        raise ValueError(f"how={how!r} needs a value column")
+
+    by = [by] if isinstance(by, str) else list(by or [])
+
+    # domain = rows inside the filters with a value
+    domain = np.zeros(len(sample), dtype=bool)
+    domain[filter_rows(sample.reset_index(drop=True), filters, years).index] = True
+    if value is not None:
+        values = pd.to_numeric(sample[value], errors="coerce").to_numpy(dtype=float)
+        domain &= ~np.isnan(values)
+    y = domain.astype(float) if how == "count" else np.where(domain, values, 0.0)
+
+    if by:
+        groups = sample.groupby(by, dropna=False, sort=True)
+        group = groups.ngroup().to_numpy()
+        labels = groups.size().index.to_frame(index=False)
+    else:
+        group = np.zeros(len(sample), dtype=np.int64)
+        labels = pd.DataFrame(index=[0])
+
+    stratum = sample["stratum"].to_numpy()
+    n_strata, n_groups = int(stratum.max()) + 1, len(labels)
+
+    # per (stratum, group): domain rows, sum of y, sum of y^2
+    cell = stratum * n_groups + group
+    size = n_strata * n_groups
+    s0 = np.bincount(cell, weights=domain, minlength=size).reshape(n_strata, n_groups)
+    s1 = np.bincount(cell, weights=y, minlength=size).reshape(n_strata, n_groups)
+    s2 = np.bincount(cell, weights=y * y, minlength=size).reshape(n_strata, n_groups)
+
+    strata = sample.groupby("stratum")[["stratum_rows", "stratum_sampled"]].first()
+    N = strata["stratum_rows"].reindex(range(n_strata), fill_value=0).to_numpy(dtype=float)[:, None]
+    n = strata["stratum_sampled"].reindex(range(n_strata), fill_value=1).to_numpy(dtype=float)[:, None]
+    weight = N / n
+
+    total = (weight * s1).sum(axis=0)
+    if how == "mean":
+        rows = (weight * s0).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = total / rows
+            # linearized z_i = (y_i - R) * d_i / X
+            z1 = (s1 - ratio * s0) / rows
+            z2 = (s2 - 2 * ratio * s1 + ratio ** 2 * s0) / rows ** 2
+        point = ratio
+    else:
+        z1, z2 = s1, s2
+        point = total
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s2_within = np.where(n > 1, (z2 - z1 ** 2 / n) / (n - 1), 0.0)
+    variance = (N ** 2 * (1 - n / np.maximum(N, 1)) * s2_within / n).sum(axis=0)
+    std_error = np.sqrt(np.maximum(variance, 0))
+
+    half = _z(confidence) * std_error
+    result = labels.copy()
+    result["estimate"] = point
+    result["std_error"] = std_error
+    result["ci_low"] = point - half
+    result["ci_high"] = point + half
+    result["sample_rows"] = s0.sum(axis=0).astype(np.int64)
+
+    return result[result["sample_rows"] > 0].reset_index(drop=True)
+
+
+SPEC_ESTIMATES = {"sum": "sum", "mean": "mean", "count": "count", "size": "count"}
+
+
+def sampled_aggregate(spec, fraction=DEFAULT_FRACTION, seed=0, path=MASTER_PATH,
+                      confidence=CONFIDENCE, sample=None):
+    """
+    analytics.aggregate.aggregate() answered from the stratified
+    sample: one column per measure plus <measure>_ci_low / _ci_high.
+    Only sum, mean, count and size can be estimated.
+    """
+    if sample is None:
+        sample = load_sample(fraction, seed, path)
+
+    dimensions = list(spec.get("dimensions", []))
+    result = None
+
+    for alias, (col, fn) in spec.get("measures", {"orders": (None, "size")}).items():
+        if fn not in SPEC_ESTIMATES:
+            raise ValueError(f"{fn} cannot be estimated from a sample; use analytics.aggregate")
+
+        est = estimate(sample, None if fn == "size" else col, SPEC_ESTIMATES[fn], by=dimensions,
+                       filters=spec.get("filters"), years=spec.get("years"), confidence=confidence)
+        est = est[dimensions + ["estimate", "ci_low", "ci_high"]].rename(columns={
+            "estimate": alias, "ci_low": f"{alias}_ci_low", "ci_high": f"{alias}_ci_high",
+        })
+        if result is None:
+            result = est
+        elif dimensions:
+            result = result.merge(est, on=dimensions, how="outer")
+        else:
+            result = pd.concat([result, est], axis=1)
+
+    return result
+
+
+# ================================
+# DEMO
+# ================================
+
+if __name__ == "__main__":
+
+    for run in ("cold", "warm"):
+        start = time.perf_counter()
+        sample = load_sample(DEFAULT_FRACTION)
+        print(f"🎯 {run}: {DEFAULT_FRACTION:.0%} sample | {len(sample)} rows in "
+              f"{sample['stratum'].nunique()} strata | {time.perf_counter() - start:.2f}s")
+
+    yearly = estimate(sample, "final_amount_inr", "sum", by="order_year")
+    full = load_master(columns=["order_year", "final_amount_inr"])
+    yearly["exact"] = yearly["order_year"].map(full.groupby("order_year")["final_amount_inr"].sum())
+    yearly["in_ci"] = yearly["exact"].between(yearly["ci_low"], yearly["ci_high"])
+
+    print("\n📊 YEARLY REVENUE (1% sample, 95% CI)")
+    print(yearly.round(0).to_string(index=False))
+
+    print("\n📊 AVG ORDER VALUE BY CATEGORY")
+    print(sampled_aggregate({
+        "dimensions": ["category"],
+        "measures": {"avg_order_value": ("final_amount_inr", "mean")},
+    }, sample=sample).round(2).to_string(index=False))
+
+    print(f"\n✅ {int(yearly['in_ci'].sum())} / {len(yearly)} yearly totals inside their CI")
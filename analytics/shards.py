@@ -0,0 +1,144 @@
+"""
+Customer-Hash Shards
+--------------------
+The master dataset split into N files by a hash of customer_id, each
+sorted by customer_id, order_date:
+
+  master/amazon_india_master_2015_2025_shards/
+  ├── customers_00.csv
+  ├── ...
+  ├── customers_<N-1>.csv
+  └── shards.json          shard count, rows / customers per shard
+
+Every customer lives in exactly one shard, so per-customer analyses
+(RFM, CLV, journeys, retention) run shard by shard in a process pool
+and their partial results merge without any cross-shard shuffle (see
+analytics/customers.py).
+
+The shards are written by master/create_master_amazon_data.py when
+CUSTOMER_SHARDS is set.
+
+Run (from the project root) to inspect them:
+python -m analytics.shards
+"""
+
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cleaning.csv_io import COMPRESSION_SUFFIXES, write_csv
+
+# ================================
+# CONFIG
+# ================================
+
+SHARD_PREFIX = "customers_"
+
+MANIFEST_FILE = "shards.json"
+
+SORT_COLS = ["customer_id", "order_date"]
+
+
+# ================================
+# WRITE
+# ================================
+
+def shard_dir(master_path):
+    """amazon_india_master_2015_2025.csv(.gz) -> ..._2015_2025_shards"""
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if master_path.endswith(suffix):
+            master_path = master_path[:-len(suffix)]
+    return os.path.splitext(master_path)[0] + "_shards"
+
+
+def shard_of(customer_ids, n_shards):
+    """Shard number per customer_id (stable across runs and machines)."""
+    ids = pd.Series(customer_ids).astype(object)
+    hashes = pd.util.hash_pandas_object(ids, index=False).to_numpy()
+    return (hashes % np.uint64(n_shards)).astype(np.int64)
+
+
+def write_shards(df, out_dir, n_shards, compression=None):
+    """
+    Writes df as n_shards customer-hash shards plus the manifest.
+    Shards of an earlier run are removed first.  Returns the manifest.
+    """
+    if n_shards < 1:
+        raise ValueError("n_shards must be at least 1")
+
+    os.makedirs(out_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(out_dir, SHARD_PREFIX + "*")):
+        os.remove(path)
+
+    df = df.sort_values(SORT_COLS, kind="stable", ignore_index=True)
+    shard = shard_of(df["customer_id"], n_shards)
+
+    width = max(2, len(str(n_shards - 1)))
+    shards = []
+    for i in range(n_shards):
+        part = df[shard == i]
+        path = os.path.join(out_dir, f"{SHARD_PREFIX}{i:0{width}d}.csv")
+        path = write_csv(part, path, compression=compression, verbose=False)
+        shards.append({
+            "file": os.path.basename(path),
+            "rows": len(part),
+            "customers": int(part["customer_id"].nunique()),
+        })
+
+    manifest = {
+        "n_shards": n_shards,
+        "hash": "pandas.util.hash_pandas_object(customer_id) % n_shards",
+        "sorted_by": SORT_COLS,
+        "rows": len(df),
+        "shards": shards,
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    return manifest
+
+
+# ================================
+# READ / MAP
+# ================================
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No shards in {out_dir}; set CUSTOMER_SHARDS in master/create_master_amazon_data.py"
+        )
+    with open(path) as f:
+        return json.load(f)
+
+
+def shard_paths(out_dir):
+    return [os.path.join(out_dir, s["file"]) for s in load_manifest(out_dir)["shards"]]
+
+
+def map_shards(fn, out_dir, workers=None):
+    """
+    [fn(shard_path) for every shard], one shard per process.  fn must be
+    a module-level function; it loads its own shard, so the shard's rows
+    never cross the process boundary, only fn's pickled result.  That
+    result can still be large: customers.shard_partials returns one row
+    per customer of the shard.
+    """
+    paths = shard_paths(out_dir)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, paths))
+
+
+if __name__ == "__main__":
+
+    from analytics.loader import MASTER_PATH
+
+    manifest = load_manifest(shard_dir(MASTER_PATH))
+
+    print(f"🧩 {manifest['n_shards']} shards | {manifest['rows']} rows | hash: {manifest['hash']}")
+    for shard in manifest["shards"]:
+        print(f"{shard['file']:<20} {shard['rows']:>9} rows | {shard['customers']:>7} customers")
@@ -0,0 +1,300 @@
+"""
+Mergeable Sketches
+------------------
+Per-year approximate sketches built during cleaning and persisted next
+to each cleaned year file (amazon_india_<year>_sketches.json).
+
+  HyperLogLog - distinct customer_id / product_id, overall and per
+                customer segment (relative std. error 1.04 / sqrt(2^p))
+  DDSketch    - quantiles of original_price_inr, final_amount_inr and
+                delivery_days (relative error <= alpha on every quantile)
+
+Both merge losslessly (register max / bucket count sum), so cross-year
+distinct counts and quantiles come from merging the yearly files
+instead of rescanning rows.
+
+Run (from the project root, after All_clean_amazon.py):
+python -m analytics.sketches
+"""
+
+import base64
+import glob
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# ================================
+# CONFIG
+# ================================
+
+HLL_PRECISION = 14
+
+QUANTILE_ALPHA = 0.01
+
+DISTINCT_COLS = ["customer_id", "product_id"]
+
+QUANTILE_COLS = ["original_price_inr", "final_amount_inr", "delivery_days"]
+
+SEGMENT_COLS = ["customer_tier", "customer_age_group", "is_prime_member"]
+
+
+# ================================
+# HYPERLOGLOG
+# ================================
+
+def _bit_length(values):
+    """Exact bit length of a uint64 array."""
+    values = values.copy()
+    length = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = values >= (np.uint64(1) << np.uint64(shift))
+        length += big * shift
+        values = np.where(big, values >> np.uint64(shift), values)
+    return length + (values > 0)
+
+
+def hash_values(values):
+    """Stable 64-bit hashes (SipHash, fixed key) of any column."""
+    series = pd.Series(values).dropna().astype(str)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+class HyperLogLog:
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = (np.zeros(1 << precision, dtype=np.uint8)
+                          if registers is None else registers)
+
+    def add(self, values):
+        hashes = hash_values(values)
+        if len(hashes) == 0:
+            return self
+
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        rest = hashes << p
+        rank = np.where(rest == 0, 64 - self.precision + 1, 64 - _bit_length(rest) + 1)
+
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(float)))
+
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)   # linear counting for small ranges
+
+        return int(round(estimate))
+
+    def relative_error(self):
+        """Standard error of count() as a fraction."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def to_dict(self):
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(self.registers.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        registers = np.frombuffer(base64.b64decode(data["registers"]), dtype=np.uint8).copy()
+        return cls(data["precision"], registers)
+
+
+# ================================
+# DDSKETCH (QUANTILES)
+# ================================
+
+class DDSketch:
+    """
+    Log-bucketed quantile sketch for non-negative values.  Any returned
+    quantile is within a relative error of alpha of the exact one.
+    """
+
+    def __init__(self, alpha=QUANTILE_ALPHA, counts=None, zero_count=0):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.counts = dict(counts or {})
+        self.zero_count = zero_count
+
+    def add(self, values):
+        values = pd.to_numeric(pd.Series(values), errors="coerce").dropna().to_numpy(dtype=float)
+        values = np.abs(values)
+
+        self.zero_count += int(np.count_nonzero(values == 0))
+        positive = values[values > 0]
+
+        keys = np.ceil(np.log(positive) / math.log(self.gamma)).astype(np.int64)
+        unique, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique.tolist(), counts.tolist()):
+            self.counts[key] = self.counts.get(key, 0) + count
+
+        return self
+
+    def merge(self, other):
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge DDSketches of different accuracy")
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.zero_count += other.zero_count
+        return self
+
+    def count(self):
+        return self.zero_count + sum(self.counts.values())
+
+    def quantile(self, q):
+        total = self.count()
+        if total == 0:
+            return np.nan
+
+        rank = q * (total - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+
+        return 2 * self.gamma ** max(self.counts) / (self.gamma + 1)
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def to_dict(self):
+        return {
+            "alpha": self.alpha,
+            "zero_count": self.zero_count,
+            "counts": {str(k): v for k, v in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        counts = {int(k): v for k, v in data["counts"].items()}
+        return cls(data["alpha"], counts, data["zero_count"])
+
+
+# ================================
+# YEARLY SKETCH FILES
+# ================================
+
+def sketch_path(cleaned_file):
+    """amazon_india_2015_cleaned.csv -> amazon_india_2015_sketches.json"""
+    return cleaned_file.replace("_cleaned.csv", "_sketches.json")
+
+
+def build_year_sketches(df):
+    """Builds all sketches for one cleaned year frame."""
+    sketches = {"rows": int(len(df)), "distinct": {}, "segments": {}, "quantiles": {}}
+
+    for col in DISTINCT_COLS:
+        sketches["distinct"][col] = HyperLogLog().add(df[col])
+
+    for col in SEGMENT_COLS:
+        if col not in df.columns:
+            continue
+        sketches["segments"][col] = {
+            str(value): HyperLogLog().add(group)
+            for value, group in df.groupby(col, dropna=False)["customer_id"]
+        }
+
+    for col in QUANTILE_COLS:
+        sketches["quantiles"][col] = DDSketch().add(df[col])
+
+    return sketches
+
+
+def save_sketches(sketches, path):
+    data = {
+        "rows": sketches["rows"],
+        "distinct": {k: v.to_dict() for k, v in sketches["distinct"].items()},
+        "segments": {
+            col: {value: hll.to_dict() for value, hll in groups.items()}
+            for col, groups in sketches["segments"].items()
+        },
+        "quantiles": {k: v.to_dict() for k, v in sketches["quantiles"].items()},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def load_sketches(path):
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        "rows": data["rows"],
+        "distinct": {k: HyperLogLog.from_dict(v) for k, v in data["distinct"].items()},
+        "segments": {
+            col: {value: HyperLogLog.from_dict(hll) for value, hll in groups.items()}
+            for col, groups in data["segments"].items()
+        },
+        "quantiles": {k: DDSketch.from_dict(v) for k, v in data["quantiles"].items()},
+    }
+
+
+def merge_sketches(sketch_list):
+    """Merges per-year sketches into one set covering all years."""
+    merged = {"rows": 0, "distinct": {}, "segments": {}, "quantiles": {}}
+
+    for sketches in sketch_list:
+        merged["rows"] += sketches["rows"]
+
+        for col, hll in sketches["distinct"].items():
+            merged["distinct"].setdefault(col, HyperLogLog(hll.precision)).merge(hll)
+
+        for col, groups in sketches["segments"].items():
+            target = merged["segments"].setdefault(col, {})
+            for value, hll in groups.items():
+                target.setdefault(value, HyperLogLog(hll.precision)).merge(hll)
+
+        for col, sketch in sketches["quantiles"].items():
+            merged["quantiles"].setdefault(col, DDSketch(sketch.alpha)).merge(sketch)
+
+    return merged
+
+
+# ================================
+# CROSS-YEAR REPORT
+# ================================
+
+if __name__ == "__main__":
+
+    files = sorted(glob.glob("amazon_india_*_sketches.json"))
+    if not files:
+        raise SystemExit("❌ No sketch files found; run All_clean_amazon.py first")
+
+    merged = merge_sketches(load_sketches(f) for f in files)
+
+    print(f"📊 {len(files)} yearly sketch files | {merged['rows']} rows")
+
+    print("\nDISTINCT COUNTS (HyperLogLog)")
+    for col, hll in merged["distinct"].items():
+        print(f"{col:<20} ~{hll.count():>10}  (±{hll.relative_error() * 100:.2f}% std. error)")
+
+    print("\nDISTINCT CUSTOMERS PER SEGMENT")
+    for col, groups in merged["segments"].items():
+        for value, hll in sorted(groups.items()):
+            print(f"{col:<20} {value:<12} ~{hll.count()}")
+
+    print("\nQUANTILES (DDSketch)")
+    for col, sketch in merged["quantiles"].items():
+        p25, p50, p95 = (sketch.quantile(q) for q in (0.25, 0.5, 0.95))
+        print(f"{col:<20} p25={p25:,.2f} median={p50:,.2f} p95={p95:,.2f}"
+              f"  (±{sketch.alpha * 100:.0f}% relative)")
+
+    print("\n✅ Cross-year statistics computed from sketches")
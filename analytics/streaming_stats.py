@@ -0,0 +1,275 @@
+"""
+Streaming Statistics
+--------------------
+Mergeable accumulators for the correlation matrices and bucket tables
+of EDA_10_15, EDA_11_12 and EDA_16, computed chunk by chunk (or per
+yearly file in parallel) instead of on the fully loaded frame.
+
+MomentAccumulator keeps pairwise-complete counts, means, M2 and
+co-moments and merges them with the parallel (Chan / Welford) update,
+so the combined correlation equals df[cols].corr() exactly up to
+floating point.  BucketAccumulator keeps per-bucket sums and counts,
+which merge by addition.
+
+Run (from the project root):
+python -m analytics.streaming_stats
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# ================================
+# CONFIG
+# ================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MASTER_PATH = os.path.join(BASE_DIR, "master", "amazon_india_master_2015_2025.csv")
+
+CHUNK_SIZE = 500_000
+
+DISCOUNT_BUCKET = ("discount_percent", [0, 10, 20, 30, 40, 50, 100],
+                   ["0-10", "10-20", "20-30", "30-40", "40-50", "50+"])
+
+RATING_BAND = ("product_rating", [0, 2, 3, 4, 5], ["0-2", "2-3", "3-4", "4-5"])
+
+
+# ================================
+# MOMENTS / CORRELATION
+# ================================
+
+class MomentAccumulator:
+    """
+    Pairwise-complete mean, variance and covariance of numeric columns.
+
+    For every column pair (i, j) it tracks the number of rows where both
+    are present (n), the means of i and j over those rows, their M2 sums
+    and the co-moment C, matching pandas' pairwise NaN handling.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))     # mean of column i over rows where i and j present
+        self.m2 = np.zeros((k, k))       # sum of squared deviations of column i over those rows
+        self.comoment = np.zeros((k, k))
+
+    def update(self, frame):
+        """Adds a chunk (DataFrame holding self.columns)."""
+        values = frame[self.columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        if not present.any():
+            return self
+
+        # shift by the chunk mean so the raw sums below stay well conditioned
+        with np.errstate(invalid="ignore"):
+            shift = np.nan_to_num(np.nanmean(np.where(present, values, np.nan), axis=0))
+        centered = np.where(present, values - shift, 0.0)
+        mask = present.astype(float)
+
+        n = mask.T @ mask
+        sums = centered.T @ mask                 # [i, j] = sum of x_i where i and j present
+        squares = (centered ** 2).T @ mask
+        cross = centered.T @ centered
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            local_mean = np.where(n > 0, sums / n, 0.0)
+            m2 = np.where(n > 0, squares - sums * local_mean, 0.0)
+            comoment = np.where(n > 0, cross - sums * sums.T / n, 0.0)
+
+        chunk = MomentAccumulator(self.columns)
+        chunk.n = n
+        chunk.mean = local_mean + shift[:, None]
+        chunk.m2 = m2
+        chunk.comoment = comoment
+
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Combines another accumulator into this one (Chan et al.)."""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge accumulators over different columns")
+
+        n = self.n + other.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(n > 0, other.n / n, 0.0)
+            delta = other.mean - self.mean                # delta[i, j] for column i
+            factor = np.where(n > 0, self.n * other.n / n, 0.0)
+
+        self.m2 = self.m2 + other.m2 + delta ** 2 * factor
+        self.comoment = self.comoment + other.comoment + delta * delta.T * factor
+        self.mean = self.mean + delta * weight
+        self.n = n
+
+        return self
+
+    def count(self):
+        return pd.Series(np.diag(self.n), index=self.columns, name="count")
+
+    def means(self):
+        return pd.Series(np.diag(self.mean), index=self.columns, name="mean")
+
+    def variances(self, ddof=1):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.diag(self.m2) / (np.diag(self.n) - ddof)
+        return pd.Series(var, index=self.columns, name="var")
+
+    def covariance(self, ddof=1):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = np.where(self.n > ddof, self.comoment / (self.n - ddof), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Pearson correlation, same as DataFrame.corr()."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr = np.where(self.n > 1, corr, np.nan)
+        np.fill_diagonal(corr, np.where(np.diag(self.n) > 1, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+
+# ================================
+# BUCKET TABLES
+# ================================
+
+class BucketAccumulator:
+    """
+    Per-group sums and counts for group-bys over bucketed columns.
+
+    keys are plain columns or names in buckets, where buckets maps a
+    name to (source_column, bins, labels) for pd.cut.  Bins must be
+    fixed up front so every chunk buckets rows identically.
+    """
+
+    def __init__(self, keys, measures, buckets=None):
+        self.keys = list(keys)
+        self.measures = list(measures)
+        self.buckets = dict(buckets or {})
+        self.table = None
+
+    def _group_keys(self, frame):
+        keys = []
+        for key in self.keys:
+            if key in self.buckets:
+                column, bins, labels = self.buckets[key]
+                keys.append(pd.cut(pd.to_numeric(frame[column], errors="coerce"),
+                                   bins=bins, labels=labels).rename(key))
+            else:
+                keys.append(frame[key].rename(key))
+        return keys
+
+    def update(self, frame):
+        values = frame[self.measures].apply(pd.to_numeric, errors="coerce")
+        grouped = values.groupby(self._group_keys(frame), observed=True)
+
+        sums = grouped.sum().add_suffix("_sum")
+        counts = grouped.count().add_suffix("_count")
+        rows = grouped.size().rename("rows")
+        chunk = pd.concat([sums, counts, rows], axis=1)
+
+        return self._add(chunk)
+
+    def _add(self, table):
+        if self.table is None:
+            self.table = table
+        else:
+            self.table = self.table.add(table, fill_value=0)
+        return self
+
+    def merge(self, other):
+        if other.table is not None:
+            self._add(other.table)
+        return self
+
+    def result(self):
+        """Sums, counts and means per group, sorted by key."""
+        table = self.table.sort_index().copy()
+        for measure in self.measures:
+            table[f"{measure}_mean"] = table[f"{measure}_sum"] / table[f"{measure}_count"]
+        return table
+
+
+# ================================
+# DRIVERS
+# ================================
+
+def stream_file(path, accumulators, chunksize=CHUNK_SIZE):
+    """Feeds every chunk of a CSV through the accumulators."""
+    columns = set()
+    for acc in accumulators:
+        if isinstance(acc, MomentAccumulator):
+            columns.update(acc.columns)
+        else:
+            columns.update(acc.measures)
+            for key in acc.keys:
+                columns.add(acc.buckets[key][0] if key in acc.buckets else key)
+
+    for chunk in pd.read_csv(path, usecols=sorted(columns), chunksize=chunksize):
+        for acc in accumulators:
+            acc.update(chunk)
+
+    return accumulators
+
+
+def _stream_one(args):
+    path, factory, chunksize = args
+    return stream_file(path, factory(), chunksize)
+
+
+def stream_files_parallel(paths, factory, workers=None, chunksize=CHUNK_SIZE):
+    """
+    Streams each file (e.g. one cleaned year) in its own process and
+    merges the resulting accumulators.  factory() must be a module-level
+    function returning a fresh list of accumulators.
+    """
+    merged = factory()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_stream_one, [(p, factory, chunksize) for p in paths]):
+            for acc, other in zip(merged, partial):
+                acc.merge(other)
+    return merged
+
+
+def pricing_accumulators():
+    """EDA_10_15: pricing correlation and discount effectiveness tables."""
+    return [
+        MomentAccumulator(["original_price_inr", "discount_percent", "discounted_price_inr",
+                           "quantity", "final_amount_inr"]),
+        BucketAccumulator(["discount_bucket"], ["quantity", "final_amount_inr"],
+                          {"discount_bucket": DISCOUNT_BUCKET}),
+        BucketAccumulator(["category", "discount_bucket"], ["quantity", "final_amount_inr"],
+                          {"discount_bucket": DISCOUNT_BUCKET}),
+        BucketAccumulator(["order_year", "discount_bucket"], ["final_amount_inr"],
+                          {"discount_bucket": DISCOUNT_BUCKET}),
+    ]
+
+
+def rating_accumulators():
+    """EDA_16: rating correlation and rating band table."""
+    return [
+        MomentAccumulator(["product_rating", "quantity", "final_amount_inr", "discounted_price_inr"]),
+        BucketAccumulator(["rating_band"], ["quantity", "final_amount_inr"],
+                          {"rating_band": RATING_BAND}),
+    ]
+
+
+# ================================
+# DEMO
+# ================================
+
+if __name__ == "__main__":
+
+    corr, discount, category_discount, year_discount = stream_file(MASTER_PATH, pricing_accumulators())
+
+    print("📊 PRICING & DEMAND CORRELATION")
+    print(corr.correlation().round(3))
+
+    print("\n🏷️ DISCOUNT EFFECTIVENESS")
+    print(discount.result()[["quantity_mean", "final_amount_inr_mean", "final_amount_inr_sum"]])
+
+    print("\n✅ Streaming statistics completed")
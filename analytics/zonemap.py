@@ -0,0 +1,469 @@
+"""
+Zone-Map Index
+--------------
+Data skipping for the master dataset.
+
+create_master_amazon_data.py writes the master sorted by order_date in
+row blocks of BLOCK_ROWS and a sidecar index next to it
+(amazon_india_master_2015_2025.zonemap.json) recording, per block:
+
+  byte offset / length in the CSV, row count
+  min / max of order_date and order_year
+  the set of category and customer_state values
+
+A filtered load (analytics.loader.load_master with filters / years /
+dates) reads only the byte ranges of blocks that can match and parses
+them in one go; the exact row filter is applied afterwards.  The
+index is ignored (full read) if the CSV no longer has the size it was
+built for.
+
+ingest_deltas.py appends daily deltas in place (append_blocked_csv):
+the last block is filled up to BLOCK_ROWS and further rows start new
+blocks, so the index stays current without rewriting the master.
+Corrected rows are replaced where they are (replace_blocked_rows),
+rewriting the master from the first block that holds one.
+
+A second sidecar (amazon_india_master_2015_2025.ids.npy) maps the
+64-bit hash of every transaction_id to its block, sorted by hash, so
+the rows of given ids are found by np.searchsorted plus a read of
+their blocks only.  It is rebuilt from the CSV (one column) when its
+row count no longer matches the zone map.
+
+Run (from the project root) to inspect the index:
+python -m analytics.zonemap
+"""
+
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from cleaning.csv_io import read_csv
+
+# ================================
+# CONFIG
+# ================================
+
+BLOCK_ROWS = 50_000
+
+SET_COLS = ["category", "customer_state"]
+
+ID_INDEX_DTYPE = np.dtype([("key", "<u8"), ("block", "<i4")])
+
+
+# ================================
+# WRITE
+# ================================
+
+def zonemap_path(csv_path):
+    """amazon_india_master_2015_2025.csv -> ..._2015_2025.zonemap.json"""
+    return os.path.splitext(csv_path)[0] + ".zonemap.json"
+
+
+def _value_set(series):
+    values = series.dropna().astype(str).unique().tolist()
+    return sorted(values) + ([None] if series.isna().any() else [])
+
+
+def write_blocked_csv(df, csv_path, block_rows=BLOCK_ROWS):
+    """
+    Writes df sorted by order_date as one CSV plus its zone map.
+    Returns the number of blocks.
+    """
+    df = df.sort_values("order_date", kind="stable", ignore_index=True)
+    dates = pd.to_datetime(df["order_date"], errors="coerce")
+
+    blocks = []
+    tmp_path = csv_path + ".tmp"
+
+    with open(tmp_path, "wb") as f:
+        f.write(df.head(0).to_csv(index=False).encode("utf-8"))
+
+        for start in range(0, len(df), block_rows):
+            block = df.iloc[start:start + block_rows]
+            block_dates = dates.iloc[start:start + block_rows]
+
+            offset = f.tell()
+            f.write(block.to_csv(index=False, header=False).encode("utf-8"))
+
+            blocks.append(_block_stats(block, block_dates, offset, f.tell() - offset))
+
+    os.replace(tmp_path, csv_path)
+
+    zonemap = {
+        "source": os.path.basename(csv_path),
+        "size": os.path.getsize(csv_path),
+        "rows": len(df),
+        "block_rows": block_rows,
+        "columns": list(df.columns),
+        "blocks": blocks,
+    }
+    _save_id_index(_id_entries(df["transaction_id"], _row_blocks(blocks)), csv_path)
+    _save_zonemap(zonemap, csv_path)
+
+    return len(blocks)
+
+
+def _block_stats(block, block_dates, offset, length):
+    years = pd.to_numeric(block["order_year"], errors="coerce")
+    return {
+        "offset": offset,
+        "length": length,
+        "rows": len(block),
+        "order_date_min": str(block_dates.min().date()) if block_dates.notna().any() else None,
+        "order_date_max": str(block_dates.max().date()) if block_dates.notna().any() else None,
+        "order_year_min": int(years.min()) if years.notna().any() else None,
+        "order_year_max": int(years.max()) if years.notna().any() else None,
+        **{col: _value_set(block[col]) for col in SET_COLS},
+    }
+
+
+def _merge_stats(a, b):
+    """Stats of block a extended by the rows of b (written right after it)."""
+    def pick(fn, x, y):
+        present = [v for v in (x, y) if v is not None]
+        return fn(present) if present else None
+
+    def union(x, y):
+        values = {v for v in x + y if v is not None}
+        return sorted(values) + ([None] if None in x + y else [])
+
+    return {
+        "offset": a["offset"],
+        "length": a["length"] + b["length"],
+        "rows": a["rows"] + b["rows"],
+        "order_date_min": pick(min, a["order_date_min"], b["order_date_min"]),
+        "order_date_max": pick(max, a["order_date_max"], b["order_date_max"]),
+        "order_year_min": pick(min, a["order_year_min"], b["order_year_min"]),
+        "order_year_max": pick(max, a["order_year_max"], b["order_year_max"]),
+        **{col: union(a[col], b[col]) for col in SET_COLS},
+    }
+
+
+def _save_zonemap(zonemap, csv_path):
+    tmp_path = zonemap_path(csv_path) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(zonemap, f, indent=1)
+    os.replace(tmp_path, zonemap_path(csv_path))
+
+
+def append_blocked_csv(df, csv_path):
+    """
+    Appends df (sorted by order_date) to a blocked CSV in place and
+    updates its zone map: the last block is filled up to block_rows,
+    the remaining rows start new blocks.  The columns are reordered to
+    the master's.  Returns the number of rows appended.
+
+    The CSV is written first; if the zone map update is interrupted,
+    the index is stale (size mismatch) and loads fall back to full
+    reads until the master is rebuilt.
+    """
+    zonemap = _current_zonemap(csv_path)
+    if df.empty:
+        return 0
+    index = load_id_index(csv_path, zonemap)
+
+    df = df[zonemap["columns"]].sort_values("order_date", kind="stable", ignore_index=True)
+    dates = pd.to_datetime(df["order_date"], errors="coerce")
+
+    blocks = zonemap["blocks"]
+    block_rows = zonemap["block_rows"]
+    room = block_rows - blocks[-1]["rows"] if blocks else 0
+
+    # (start, end, extends_last_block)
+    ranges = [(0, min(room, len(df)), True)] if room > 0 else []
+    ranges += [(start, min(start + block_rows, len(df)), False)
+               for start in range(max(room, 0), len(df), block_rows)]
+
+    with open(csv_path, "ab") as f:
+        for start, end, extends in ranges:
+            block = df.iloc[start:end]
+
+            offset = f.tell()
+            f.write(block.to_csv(index=False, header=False).encode("utf-8"))
+            stats = _block_stats(block, dates.iloc[start:end], offset, f.tell() - offset)
+
+            if extends:
+                blocks[-1] = _merge_stats(blocks[-1], stats)
+            else:
+                blocks.append(stats)
+
+    _save_id_index(_merge_id_entries(index, _id_entries(df["transaction_id"], _row_blocks(blocks)[-len(df):])),
+                   csv_path)
+    zonemap["size"] = os.path.getsize(csv_path)
+    zonemap["rows"] += len(df)
+    _save_zonemap(zonemap, csv_path)
+
+    return len(df)
+
+
+def replace_blocked_rows(df, csv_path):
+    """
+    Replaces the master rows with the transaction_ids of df by the rows
+    of df, in place: every row keeps its block, and the master is
+    rewritten from the first block holding one of the ids (recent
+    corrections only rewrite the tail).  Returns the number of master
+    rows replaced.
+    """
+    zonemap = _current_zonemap(csv_path)
+    if df.empty:
+        return 0
+
+    ids = df["transaction_id"].astype(str)
+    located = locate_ids(csv_path, ids, zonemap)
+    if not (located >= 0).any():
+        return 0
+
+    blocks = zonemap["blocks"]
+    first = int(located[located >= 0].min())
+    tail = read_blocks(csv_path, blocks[first:], zonemap, dtype=str, verbose=False)
+
+    # rows as text, so untouched rows are written back byte for byte
+    rows = rows_as_text(df.drop_duplicates("transaction_id", keep="last"), zonemap["columns"])
+    rows = rows.set_index("transaction_id", drop=False)
+    replaced = tail["transaction_id"].isin(rows.index)
+    tail.loc[replaced] = rows.loc[tail.loc[replaced, "transaction_id"]].to_numpy()
+
+    # encode the new tail before touching the file
+    chunks, start, offset = [], 0, blocks[first]["offset"]
+    for number in range(first, len(blocks)):
+        block = tail.iloc[start:start + blocks[number]["rows"]]
+        start += len(block)
+
+        data = block.to_csv(index=False, header=False).encode("utf-8")
+        dates = pd.to_datetime(block["order_date"], errors="coerce")
+        blocks[number] = _block_stats(block, dates, offset, len(data))
+        chunks.append(data)
+        offset += len(data)
+
+    with open(csv_path, "r+b") as f:
+        f.seek(blocks[first]["offset"])
+        f.write(b"".join(chunks))
+        f.truncate()
+
+    zonemap["size"] = os.path.getsize(csv_path)
+    _save_zonemap(zonemap, csv_path)
+
+    return int(replaced.sum())
+
+
+def _current_zonemap(csv_path):
+    zonemap = load_zonemap(csv_path)
+    if zonemap is None:
+        raise ValueError(
+            f"No current zone map for {csv_path}; rebuild it with master/create_master_amazon_data.py"
+        )
+    return zonemap
+
+
+def rows_as_text(df, columns):
+    """df[columns] as the strings a CSV round trip gives (NaN when empty)."""
+    buffer = io.StringIO(df[columns].to_csv(index=False))
+    return pd.read_csv(buffer, dtype=str)
+
+
+# ================================
+# TRANSACTION ID INDEX
+# ================================
+
+def id_index_path(csv_path):
+    """amazon_india_master_2015_2025.csv -> ..._2015_2025.ids.npy"""
+    return os.path.splitext(csv_path)[0] + ".ids.npy"
+
+
+def _id_keys(ids):
+    return pd.util.hash_pandas_object(pd.Series(ids).astype(str), index=False).to_numpy(dtype=np.uint64)
+
+
+def _row_blocks(blocks):
+    """Block number of every row, in file order."""
+    return np.repeat(np.arange(len(blocks), dtype=np.int32), [b["rows"] for b in blocks])
+
+
+def _id_entries(ids, row_blocks):
+    entries = np.empty(len(row_blocks), dtype=ID_INDEX_DTYPE)
+    entries["key"] = _id_keys(ids)
+    entries["block"] = row_blocks
+    return np.sort(entries, order="key", kind="stable")
+
+
+def _merge_id_entries(index, entries):
+    return np.insert(index, np.searchsorted(index["key"], entries["key"]), entries)
+
+
+def _save_id_index(entries, csv_path):
+    path = id_index_path(csv_path)
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, entries)
+    os.replace(tmp_path, path)
+
+
+def load_id_index(csv_path, zonemap=None):
+    """
+    The id index of csv_path (memory-mapped), rebuilt from the CSV's
+    transaction_id column if missing or out of date.
+    """
+    zonemap = zonemap or _current_zonemap(csv_path)
+    path = id_index_path(csv_path)
+
+    if os.path.exists(path):
+        index = np.load(path, mmap_mode="r")
+        if len(index) == zonemap["rows"]:
+            return index
+
+    ids = read_csv(csv_path, usecols=["transaction_id"], dtype=str, verbose=False)["transaction_id"]
+    _save_id_index(_id_entries(ids, _row_blocks(zonemap["blocks"])), csv_path)
+    return np.load(path, mmap_mode="r")
+
+
+def locate_ids(csv_path, ids, zonemap=None):
+    """
+    Candidate block of every id (-1 = not in the master).  Ids sharing
+    a hash with a master row map to that row's block, so callers read
+    the block to confirm.
+    """
+    index = load_id_index(csv_path, zonemap)
+    keys = _id_keys(ids)
+    if len(index) == 0:
+        return np.full(len(keys), -1, dtype=np.int64)
+
+    pos = np.minimum(np.searchsorted(index["key"], keys), len(index) - 1)
+    found = index["key"][pos] == keys
+    return np.where(found, index["block"][pos], -1).astype(np.int64)
+
+
+def read_rows_by_id(csv_path, ids):
+    """
+    Master rows (as text, see rows_as_text) whose transaction_id is in
+    ids; only the blocks the id index points to are read.
+    """
+    zonemap = _current_zonemap(csv_path)
+    ids = pd.Series(ids).astype(str)
+    located = np.unique(locate_ids(csv_path, ids, zonemap))
+    blocks = [zonemap["blocks"][b] for b in located if b >= 0]
+
+    rows = read_blocks(csv_path, blocks, zonemap, dtype=str, verbose=False)
+    return rows[rows["transaction_id"].isin(ids)].reset_index(drop=True)
+
+
+# ================================
+# PRUNE & READ
+# ================================
+
+def load_zonemap(csv_path):
+    """The zone map of csv_path, or None if missing or stale."""
+    path = zonemap_path(csv_path)
+    if not os.path.exists(path) or not os.path.exists(csv_path):
+        return None
+    with open(path) as f:
+        zonemap = json.load(f)
+    if zonemap.get("size") != os.path.getsize(csv_path):
+        return None
+    return zonemap
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def block_can_match(block, filters=None, years=None, dates=None):
+    """False only if no row of block can match; missing bounds may match."""
+    year_bounds = block["order_year_min"] is not None
+
+    for col, value in (filters or {}).items():
+        wanted = _as_list(value)
+        if col in SET_COLS:
+            present = set(block[col])
+            if not any((w is None and None in present) or (w is not None and str(w) in present)
+                       for w in wanted):
+                return False
+        elif col == "order_year" and year_bounds:
+            # missing years are not recorded, so None may always match
+            if not any(w is None or block["order_year_min"] <= int(w) <= block["order_year_max"]
+                       for w in wanted):
+                return False
+
+    if years is not None and year_bounds:
+        start, end = years
+        if block["order_year_max"] < int(start) or block["order_year_min"] > int(end):
+            return False
+
+    if dates is not None and block["order_date_min"] is not None:
+        start, end = (pd.Timestamp(d) for d in dates)
+        if (pd.Timestamp(block["order_date_max"]) < start
+                or pd.Timestamp(block["order_date_min"]) > end):
+            return False
+
+    return True
+
+
+def matching_blocks(zonemap, filters=None, years=None, dates=None):
+    return [b for b in zonemap["blocks"] if block_can_match(b, filters, years, dates)]
+
+
+def read_blocks(csv_path, blocks, zonemap, engine="auto", **kwargs):
+    """Parses only the given blocks (adjacent ones are read as one range)."""
+    buffer = io.BytesIO()
+
+    with open(csv_path, "rb") as f:
+        header_length = zonemap["blocks"][0]["offset"] if zonemap["blocks"] else 0
+        buffer.write(f.read(header_length))
+
+        run_start = run_end = None
+        for block in blocks + [None]:
+            if block is not None and block["offset"] == run_end:
+                run_end += block["length"]
+                continue
+            if run_start is not None:
+                f.seek(run_start)
+                buffer.write(f.read(run_end - run_start))
+            if block is not None:
+                run_start, run_end = block["offset"], block["offset"] + block["length"]
+
+    buffer.seek(0)
+    return read_csv(buffer, engine=engine, **kwargs)
+
+
+def filter_rows(df, filters=None, years=None, dates=None):
+    """Exact row filter with the aggregation-spec semantics."""
+    mask = pd.Series(True, index=df.index)
+
+    for col, value in (filters or {}).items():
+        if value is None:
+            mask &= df[col].isna()
+        elif isinstance(value, (list, tuple, set)):
+            mask &= df[col].isin(list(value))
+        else:
+            mask &= df[col] == value
+
+    if years is not None:
+        start, end = years
+        mask &= df["order_year"].between(int(start), int(end))
+
+    if dates is not None:
+        start, end = (pd.Timestamp(d) for d in dates)
+        order_date = pd.to_datetime(df["order_date"], errors="coerce")
+        mask &= order_date.between(start, end)
+
+    return df[mask.to_numpy()]
+
+
+if __name__ == "__main__":
+
+    from analytics.loader import MASTER_PATH
+
+    zonemap = load_zonemap(MASTER_PATH)
+    if zonemap is None:
+        raise SystemExit("❌ No (current) zone map; run master/create_master_amazon_data.py first")
+
+    print(f"📦 {zonemap['source']} | {zonemap['rows']} rows | {len(zonemap['blocks'])} blocks")
+    for i, block in enumerate(zonemap["blocks"]):
+        print(f"{i:>4} {block['order_date_min']} → {block['order_date_max']} "
+              f"| {block['rows']:>7} rows | {len(block['category'])} categories "
+              f"| {len(block['customer_state'])} states")
+
+    for years in [(2024, 2024), (2015, 2016)]:
+        kept = matching_blocks(zonemap, years=years)
+        print(f"\n🎯 years={years}: {len(kept)} / {len(zonemap['blocks'])} blocks to read")
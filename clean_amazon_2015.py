@@ -2,11 +2,15 @@ import pandas as pd
 import numpy as np
 import re
 
+from cleaning.catalogue_index import load_price_index
+from cleaning.city_resolver import CityResolver
+from cleaning.csv_io import read_csv, write_csv
+
 # ===============================
 # LOAD DATA
 # ===============================
 FILE_NAME = "amazon_india_2015.csv"
-df = pd.read_csv(FILE_NAME)
+df = read_csv(FILE_NAME)
 
 print("Initial shape:", df.shape)
 
@@ -85,119 +89,10 @@ df["customer_rating"] = df["customer_rating"].apply(clean_rating)
 # ======================================================
 # QUESTION 4: Standardize customer_city
 # ======================================================
-def clean_city(city):
-    if pd.isna(city):
-        return np.nan
-
-    city = str(city).strip().lower()
-
-    city_map = {
-        # Bangalore
-        "bangalore": "Bengaluru",
-        "bengaluru": "Bengaluru",
-        "banglore": "Bengaluru",
-        "bangaluru": "Bengaluru",
-        "Bengalore": "Bengaluru",
-        
-        # Mumbai
-        "mumbai": "Mumbai",
-        "bombay": "Mumbai",
-        "mumba": "Mumbai",
-
-        # Delhi
-        "delhi": "Delhi",
-        "new delhi": "Delhi",
-        "delhi ncr": "Delhi",
-
-        # Chennai
-        "chennai": "Chennai",
-        "chenai": "Chennai",
-        "madras": "Chennai",
-
-        # Kolkata
-        "kolkata": "Kolkata",
-        "calcutta": "Kolkata",
-
-        # Hyderabad
-        "hyderabad": "Hyderabad",
-
-        # Pune
-        "pune": "Pune",
-
-        # Ahmedabad
-        "ahmedabad": "Ahmedabad",
-
-        # Jaipur
-        "jaipur": "Jaipur",
-
-        # Lucknow
-        "lucknow": "Lucknow",
-
-        # Indore
-        "indore": "Indore",
-
-        # Kochi
-        "kochi": "Kochi",
-        "cochin": "Kochi",
-
-        # Coimbatore
-        "coimbatore": "Coimbatore",
-
-        # Bhubaneswar
-        "bhubaneswar": "Bhubaneswar",
-
-        # Chandigarh
-        "chandigarh": "Chandigarh",
+city_resolver = CityResolver()
 
-        # Vadodara
-        "vadodara": "Vadodara",
-
-        # Surat
-        "surat": "Surat",
-
-        # Nagpur
-        "nagpur": "Nagpur",
-
-        # Meerut
-        "meerut": "Meerut",
-
-        # Moradabad
-        "moradabad": "Moradabad",
-
-        # Saharanpur
-        "saharanpur": "Saharanpur",
-
-        # Gorakhpur
-        "gorakhpur": "Gorakhpur",
-
-        # Kanpur
-        "kanpur": "Kanpur",
-
-        # Bareilly
-        "bareilly": "Bareilly",
-
-        # Aligarh
-        "aligarh": "Aligarh",
-
-        # Allahabad (Prayagraj old name kept)
-        "allahabad": "Allahabad",
-
-        # Visakhapatnam
-        "visakhapatnam": "Visakhapatnam",
-
-        # Patna
-        "patna": "Patna",
-
-        # Ludhiana
-        "ludhiana": "Ludhiana",
-
-        # Varanasi
-        "varanasi": "Varanasi"
-    }
-
-    return city_map.get(city, city.title())
-
-df["customer_city"] = df["customer_city"].apply(clean_city)
+df["customer_city"], _ = city_resolver.resolve(df["customer_city"])
+city_resolver.save()
 
 # ======================================================
 # QUESTION 5: Boolean Columns → True / False
@@ -288,18 +183,11 @@ df.drop(columns=["is_duplicate"], inplace=True)
 # QUESTION 9: Correct Outlier Prices using Product Catalogue
 # ======================================================
 
-# Load product catalogue
-catalogue = pd.read_csv("amazon_india_products_catalog.csv")
-
-# Keep only required columns
-catalogue = catalogue[["product_id", "base_price_2015"]]
+# Memory-mapped catalogue price index (sorted codes + prices)
+price_index = load_price_index("amazon_india_products_catalog.csv")
 
-# Merge catalogue price into main dataframe
-df = df.merge(
-    catalogue,
-    on="product_id",
-    how="left"
-)
+# Attach base price by code lookup instead of a frame-wide merge
+df["base_price_2015"] = price_index.lookup(df["product_id"])
 
 def correct_price(row):
     """
@@ -386,7 +274,7 @@ print("Q10 Payment method cleaned")
 # SAVE CLEANED DATA
 # ===============================
 OUTPUT_FILE = "amazon_india_2015_cleaned.csv"
-df.to_csv(OUTPUT_FILE, index=False)
+OUTPUT_FILE = write_csv(df, OUTPUT_FILE)
 
 print("Final shape:", df.shape)
 print("Cleaned file saved as:", OUTPUT_FILE)
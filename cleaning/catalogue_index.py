@@ -0,0 +1,134 @@
+"""
+Catalogue Price Index
+---------------------
+base_price_2015 lookup for Question 9 without merging the catalogue
+into every year frame.
+
+The index is two .npy files built once from
+amazon_india_products_catalog.csv:
+
+  amazon_india_products_catalog.codes.npy   sorted product_id (bytes)
+  amazon_india_products_catalog.prices.npy  base_price_2015 per code
+
+Both are opened with np.load(mmap_mode="r"), so every process that
+cleans a year maps the same pages instead of holding its own copy.
+A lookup is one np.searchsorted over the sorted codes.  The index is
+rebuilt whenever the catalogue CSV is newer than it.
+
+A product listed twice in the catalogue keeps its first row (the old
+catalogue merge repeated the order rows instead); the build reports
+how many duplicate listings it dropped.
+
+Run (from the folder with the catalogue) to (re)build it:
+python -m cleaning.catalogue_index
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from cleaning.csv_io import read_csv, resolve_path
+
+# ================================
+# CONFIG
+# ================================
+
+CATALOGUE_FILE = "amazon_india_products_catalog.csv"
+
+
+# ================================
+# BUILD
+# ================================
+
+def index_paths(catalogue_file=CATALOGUE_FILE):
+    stem = os.path.splitext(catalogue_file)[0]
+    return stem + ".codes.npy", stem + ".prices.npy"
+
+
+def encode_codes(product_ids):
+    """product_id values -> fixed-width UTF-8 bytes array ('' for missing)."""
+    ids = pd.Series(product_ids)
+    ids = ids.astype(object).where(ids.notna(), "")
+    return np.char.encode(ids.astype(str).to_numpy(dtype=str), "utf-8")
+
+
+def build_price_index(catalogue_file=CATALOGUE_FILE):
+    catalogue = read_csv(catalogue_file, usecols=["product_id", "base_price_2015"])
+    catalogue = catalogue.dropna(subset=["product_id"])
+
+    # first row wins if a product is listed twice
+    duplicates = catalogue["product_id"].duplicated(keep="first")
+    if duplicates.any():
+        print(f"⚠️ {catalogue_file}: {int(duplicates.sum())} duplicate product_id listings dropped "
+              f"({catalogue.loc[duplicates, 'product_id'].nunique()} products), first row kept")
+    catalogue = catalogue[~duplicates]
+
+    codes = encode_codes(catalogue["product_id"])
+    prices = pd.to_numeric(catalogue["base_price_2015"], errors="coerce").to_numpy(dtype=np.float64)
+
+    order = np.argsort(codes, kind="stable")
+
+    codes_path, prices_path = index_paths(catalogue_file)
+    for path, values in ((codes_path, codes[order]), (prices_path, prices[order])):
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, values)
+        os.replace(tmp_path, path)
+
+    return len(codes)
+
+
+# ================================
+# LOOKUP
+# ================================
+
+class CataloguePriceIndex:
+
+    def __init__(self, codes, prices):
+        self.codes = codes
+        self.prices = prices
+
+    def __len__(self):
+        return len(self.codes)
+
+    def lookup(self, product_ids):
+        """base_price_2015 for each product_id (NaN when not catalogued)."""
+        keys = encode_codes(product_ids)
+        result = np.full(len(keys), np.nan)
+        if len(self.codes) == 0:
+            return result
+
+        pos = np.searchsorted(self.codes, keys)
+        pos = np.minimum(pos, len(self.codes) - 1)
+        found = self.codes[pos] == keys
+
+        result[found] = self.prices[pos[found]]
+        return result
+
+
+def load_price_index(catalogue_file=CATALOGUE_FILE):
+    """Memory-maps the index, building it first if missing or stale."""
+    codes_path, prices_path = index_paths(catalogue_file)
+
+    stale = not (os.path.exists(codes_path) and os.path.exists(prices_path))
+    if not stale:
+        built = min(os.path.getmtime(codes_path), os.path.getmtime(prices_path))
+        stale = os.path.getmtime(resolve_path(catalogue_file)) > built
+
+    if stale:
+        build_price_index(catalogue_file)
+
+    return CataloguePriceIndex(
+        np.load(codes_path, mmap_mode="r"),
+        np.load(prices_path, mmap_mode="r"),
+    )
+
+
+if __name__ == "__main__":
+
+    count = build_price_index()
+    index = load_price_index()
+
+    print(f"✅ Catalogue price index built: {count} products")
+    print("Codes:", index_paths()[0])
+    print("Prices:", index_paths()[1])
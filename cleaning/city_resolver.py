@@ -0,0 +1,261 @@
+"""
+City Resolver
+-------------
+One shared canonical city list for All_clean_amazon.py and
+clean_amazon_2015.py.
+
+Each distinct raw spelling is resolved once:
+
+  1. known alias (CITY_ALIASES)          -> canonical city
+  2. persisted cache (city_alias_cache.json)
+  3. fuzzy match through a BK-tree over every canonical name and alias
+     (Levenshtein distance 1 for spellings of MIN_LENGTH_FOR_DISTANCE[1]
+     characters or more, 2 from MIN_LENGTH_FOR_DISTANCE[2]; same first
+     letter, unique best match only)
+  4. otherwise the title-cased spelling, as before
+
+Results of steps 3 and 4 are written to the cache, so a spelling is
+never fuzzy-matched twice.  The cache is dropped whenever the
+gazetteer or the matching thresholds change.
+
+Real cities one letter away from a canonical one (Raipur / Jaipur,
+Kannur / Kanpur, Jajpur / Jaipur) are six letters long, so short
+spellings are never matched at distance 1; a differing first letter
+is never treated as a typo.  The BK-tree only visits nodes whose
+distance to the query can still be within the threshold, so lookups
+stay cheap as the gazetteer grows.
+
+Run (from the project root) to resolve spellings by hand:
+python -m cleaning.city_resolver bombay mumbaai "new delhii"
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+# ================================
+# CONFIG
+# ================================
+
+CITY_CACHE_FILE = "city_alias_cache.json"
+
+# edit distance -> shortest spelling that may be matched at it
+MIN_LENGTH_FOR_DISTANCE = {1: 7, 2: 10}
+
+# lower-case spelling -> canonical city
+CITY_ALIASES = {
+    # Bangalore
+    "bangalore": "Bengaluru",
+    "bengaluru": "Bengaluru",
+    "banglore": "Bengaluru",
+    "bangaluru": "Bengaluru",
+    "bengalore": "Bengaluru",
+
+    # Mumbai
+    "mumbai": "Mumbai",
+    "bombay": "Mumbai",
+    "mumba": "Mumbai",
+
+    # Delhi
+    "delhi": "Delhi",
+    "new delhi": "Delhi",
+    "delhi ncr": "Delhi",
+
+    # Chennai
+    "chennai": "Chennai",
+    "chenai": "Chennai",
+    "madras": "Chennai",
+
+    # Kolkata
+    "kolkata": "Kolkata",
+    "calcutta": "Kolkata",
+
+    # Kochi
+    "kochi": "Kochi",
+    "cochin": "Kochi",
+
+    # Allahabad (Prayagraj old name kept)
+    "allahabad": "Allahabad",
+
+    # Single-spelling cities
+    "hyderabad": "Hyderabad",
+    "pune": "Pune",
+    "ahmedabad": "Ahmedabad",
+    "jaipur": "Jaipur",
+    "lucknow": "Lucknow",
+    "indore": "Indore",
+    "coimbatore": "Coimbatore",
+    "bhubaneswar": "Bhubaneswar",
+    "chandigarh": "Chandigarh",
+    "vadodara": "Vadodara",
+    "surat": "Surat",
+    "nagpur": "Nagpur",
+    "meerut": "Meerut",
+    "moradabad": "Moradabad",
+    "saharanpur": "Saharanpur",
+    "gorakhpur": "Gorakhpur",
+    "kanpur": "Kanpur",
+    "bareilly": "Bareilly",
+    "aligarh": "Aligarh",
+    "visakhapatnam": "Visakhapatnam",
+    "patna": "Patna",
+    "ludhiana": "Ludhiana",
+    "varanasi": "Varanasi",
+}
+
+CANONICAL_CITIES = sorted(set(CITY_ALIASES.values()))
+
+
+# ================================
+# EDIT DISTANCE
+# ================================
+
+def levenshtein(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings under Levenshtein distance."""
+
+    def __init__(self, words=()):
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """All (distance, word) pairs within max_distance, closest first."""
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= max_distance:
+                found.append((distance, node_word))
+            # triangle inequality: only these subtrees can hold matches
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return sorted(found)
+
+
+# ================================
+# RESOLVER
+# ================================
+
+class CityResolver:
+
+    def __init__(self, cache_path=CITY_CACHE_FILE, aliases=CITY_ALIASES):
+        self.cache_path = cache_path
+        self.aliases = dict(aliases)
+        for city in set(self.aliases.values()):
+            self.aliases.setdefault(city.lower(), city)
+
+        self.index = BKTree(sorted(self.aliases))
+        self.gazetteer = hashlib.md5(json.dumps([
+            sorted(self.aliases.items()), sorted(MIN_LENGTH_FOR_DISTANCE.items()),
+        ]).encode("utf-8")).hexdigest()
+
+        self.cache = self._load_cache()
+        self.dirty = False
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        with open(self.cache_path, encoding="utf-8") as f:
+            data = json.load(f)
+        # a new city or threshold can change any fuzzy result
+        if data.get("gazetteer") != self.gazetteer:
+            return {}
+        return data.get("aliases", {})
+
+    def save(self):
+        if not self.cache_path or not self.dirty:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"gazetteer": self.gazetteer, "aliases": self.cache},
+                      f, indent=2, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+        self.dirty = False
+
+    def fuzzy_match(self, key):
+        """Canonical city for a lower-case spelling, or None."""
+        max_distance = max((d for d, length in MIN_LENGTH_FOR_DISTANCE.items() if len(key) >= length),
+                           default=0)
+        if max_distance == 0:
+            return None
+        matches = [(distance, word) for distance, word in self.index.search(key, max_distance)
+                   if word[0] == key[0]]
+        if not matches:
+            return None
+        best = {self.aliases[word] for distance, word in matches if distance == matches[0][0]}
+        return best.pop() if len(best) == 1 else None
+
+    def lookup(self, key):
+        """Returns (city or None, how) for one lower-case spelling."""
+        if key in self.aliases:
+            return self.aliases[key], "alias"
+        if key not in self.cache:
+            self.cache[key] = self.fuzzy_match(key)
+            self.dirty = True
+        city = self.cache[key]
+        return city, ("fuzzy" if city is not None else "unresolved")
+
+    def resolve(self, raw):
+        """
+        Resolves a city column.  Works on the distinct spellings only and
+        returns (cities, how), where how is "alias", "fuzzy" or
+        "unresolved" (title-cased fallback) per row, NaN where raw is.
+        """
+        key = raw.astype(str).str.strip().str.lower().where(raw.notna())
+
+        cities, how = {}, {}
+        for spelling in key.dropna().unique():
+            city, source = self.lookup(spelling)
+            cities[spelling] = city if city is not None else spelling.title()
+            how[spelling] = source
+
+        return key.map(cities), key.map(how)
+
+
+if __name__ == "__main__":
+
+    resolver = CityResolver(cache_path=None)
+
+    spellings = sys.argv[1:] or ["bombay", "mumbaai", "bengaluru ", "hyderbad", "Noida"]
+    cities, how = resolver.resolve(pd.Series(spellings))
+
+    for spelling, city, source in zip(spellings, cities, how):
+        print(f"{spelling!r:<20} -> {city:<15} ({source})")
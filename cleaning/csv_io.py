@@ -0,0 +1,204 @@
+"""
+CSV Ingestion
+-------------
+One read / write path for the cleaners, the master builder and the
+notebook loader.
+
+  read_csv   - multithreaded pyarrow parser when available, falling
+               back to the pandas C parser on ImportError or on options
+               pyarrow does not support; a missing "x.csv" is looked
+               up as "x.csv.gz" / "x.csv.zst", and compressed inputs
+               are decompressed transparently
+  write_csv  - optional gzip / zstd output (suffix added to the name)
+  open_text  - plain text handle on a possibly compressed file (for
+               streaming a raw file into COPY)
+
+Every read and write is timed and kept in TIMINGS (path, engine,
+compression, seconds, rows, MB on disk), so the fastest engine /
+compression combination can be picked per file.
+
+zstd needs the optional "zstandard" package, the pyarrow engine the
+optional "pyarrow" package.
+
+Run (from the project root) to compare engines on some files:
+python -m cleaning.csv_io amazon_india_2015.csv amazon_india_2015.csv.gz
+"""
+
+import gzip
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+# ================================
+# CONFIG
+# ================================
+
+DEFAULT_ENGINE = "auto"     # "auto", "pyarrow", "c" or "python"
+
+# the C parser's default float conversion can be off by one ulp
+# (418.59 -> 418.59000000000003); round_trip parses floats exactly,
+# as pyarrow does, so every engine gives the same values
+C_FLOAT_PRECISION = "round_trip"
+
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+TIMINGS = []
+
+
+# ================================
+# HELPERS
+# ================================
+
+def compression_of(path):
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if path.endswith(suffix):
+            return compression
+    return None
+
+
+def resolve_path(path):
+    """path if it exists, else its first compressed variant that does."""
+    if os.path.exists(path):
+        return path
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if os.path.exists(path + suffix):
+            return path + suffix
+    return path
+
+
+def has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def engine_order(engine):
+    if engine == "auto":
+        return ["pyarrow", "c"] if has_pyarrow() else ["c"]
+    if engine == "pyarrow":
+        return ["pyarrow", "c"]
+    return [engine]
+
+
+def _log(action, path, engine, seconds, rows, verbose):
+    if not isinstance(path, str):
+        path = "<buffer>"
+    size_mb = os.path.getsize(path) / 1e6 if os.path.exists(path) else float("nan")
+    TIMINGS.append({
+        "action": action,
+        "path": path,
+        "engine": engine,
+        "compression": compression_of(path) or "none",
+        "seconds": round(seconds, 4),
+        "rows": rows,
+        "mb": round(size_mb, 2),
+    })
+    if verbose:
+        print(f"⏱️ {action} {os.path.basename(path)} | {engine} | "
+              f"{compression_of(path) or 'uncompressed'} | {rows} rows | "
+              f"{size_mb:.1f} MB | {seconds:.2f}s")
+
+
+def open_text(path):
+    """Text handle on path (a missing "x.csv" is looked up as .gz / .zst)."""
+    path = resolve_path(path)
+    compression = compression_of(path)
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        import zstandard
+        return io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), encoding="utf-8"
+        )
+    return open(path, "r", encoding="utf-8")
+
+
+def timings_frame():
+    return pd.DataFrame(TIMINGS)
+
+
+# ================================
+# READ / WRITE
+# ================================
+
+def read_csv(path, engine=DEFAULT_ENGINE, verbose=True, **kwargs):
+    """
+    pd.read_csv with engine fallback and compressed-file lookup.
+    path may also be a file-like object.  Extra keyword arguments go
+    to pd.read_csv.  The C parser reads floats with
+    C_FLOAT_PRECISION unless float_precision is given.
+    """
+    if isinstance(path, str):
+        path = resolve_path(path)
+    engines = engine_order(engine)
+
+    for i, name in enumerate(engines):
+        if hasattr(path, "seek"):
+            path.seek(0)
+        start = time.perf_counter()
+        try:
+            options = dict(kwargs)
+            if name == "c":
+                options.setdefault("float_precision", C_FLOAT_PRECISION)
+            df = pd.read_csv(path, engine=name, **options)
+        except (ImportError, ValueError) as exc:
+            if i == len(engines) - 1:
+                raise
+            if verbose:
+                print(f"⚠️ {name} parser failed on {os.path.basename(str(path))} ({exc}); "
+                      f"falling back to {engines[i + 1]}")
+            continue
+
+        _log("read", path, name, time.perf_counter() - start, len(df), verbose)
+        return df
+
+
+def write_csv(df, path, compression=None, verbose=True, **kwargs):
+    """
+    df.to_csv(index=False), compressed when compression is "gzip" or
+    "zstd".  Returns the path actually written.
+    """
+    if compression is not None:
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression_of(path) != compression:
+            path += COMPRESSION_SUFFIXES[compression]
+
+    start = time.perf_counter()
+    df.to_csv(path, index=False, compression=compression or "infer", **kwargs)
+    _log("write", path, "pandas", time.perf_counter() - start, len(df), verbose)
+
+    return path
+
+
+# ================================
+# ENGINE COMPARISON
+# ================================
+
+if __name__ == "__main__":
+
+    files = sys.argv[1:]
+    if not files:
+        raise SystemExit("❌ Pass one or more CSV files to compare")
+
+    for file in files:
+        for engine in ["c", "pyarrow"] if has_pyarrow() else ["c"]:
+            read_csv(file, engine=engine, verbose=False)
+
+    report = timings_frame()
+    report = report[["path", "compression", "engine", "rows", "mb", "seconds"]]
+
+    print("\n📊 CSV PARSE TIMINGS")
+    print(report.to_string(index=False))
+
+    fastest = report.loc[report.groupby("path")["seconds"].idxmin()]
+    print("\n🎯 Fastest engine per file")
+    print(fastest[["path", "engine", "seconds"]].to_string(index=False))
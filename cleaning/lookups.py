@@ -0,0 +1,29 @@
+"""
+Cleaning Lookups
+----------------
+Value maps shared by the pandas cleaner (All_clean_amazon.py) and the
+in-warehouse ELT cleaner (db_pipeline/elt_clean.py), so both apply
+the same rules.
+"""
+
+# ================================
+# BOOLEANS (Question 5)
+# ================================
+
+TRUE_VALUES = ["true", "yes", "1", "y"]
+FALSE_VALUES = ["false", "no", "0", "n"]
+
+# ================================
+# PAYMENT METHOD (Question 10)
+# ================================
+
+# substring -> payment method; the first key contained in the value wins
+PAYMENT_MAP = {
+    "upi": "UPI", "gpay": "UPI", "phonepe": "UPI", "paytm": "UPI",
+    "credit": "Credit Card", "cc": "Credit Card",
+    "debit": "Debit Card",
+    "net banking": "Net Banking",
+    "wallet": "Wallet",
+    "bnpl": "BNPL",
+    "cod": "Cash on Delivery"
+}
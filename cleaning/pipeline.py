@@ -0,0 +1,154 @@
+"""
+Pipelined Year Processing
+-------------------------
+Overlaps reading, cleaning and writing of the yearly files:
+
+  reader thread  -> read_q ->  cleaner (caller's thread)  -> write_q ->  writer thread
+
+While year N is being cleaned, year N+1 is already being parsed and
+year N-1 is being written.  A semaphore caps the number of years held
+in memory (read but not yet written) at max_in_flight, and the queues
+are bounded by the same number.
+
+Every stage records its busy time, so the report shows which stage
+is the bottleneck (utilization = busy time / wall time).
+
+Used by All_clean_amazon.py.
+"""
+
+import queue
+import threading
+import time
+
+# ================================
+# STAGE STATS
+# ================================
+
+_DONE = object()
+
+
+class StageStats:
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.waiting = 0.0
+
+    def utilization(self, wall):
+        return self.busy / wall if wall > 0 else 0.0
+
+
+def print_pipeline_report(stats, wall):
+    print("\n📊 PIPELINE STAGE UTILIZATION")
+    print("-" * 60)
+    print(f"{'stage':<10} {'items':>6} {'busy s':>9} {'waiting s':>10} {'utilization':>12}")
+    for stage in stats.values():
+        print(f"{stage.name:<10} {stage.items:>6} {stage.busy:>9.2f} "
+              f"{stage.waiting:>10.2f} {stage.utilization(wall) * 100:>11.1f}%")
+    print(f"{'wall':<10} {'':>6} {wall:>9.2f}")
+
+
+# ================================
+# PIPELINE
+# ================================
+
+def run_pipeline(items, read, clean, write, max_in_flight=2):
+    """
+    Runs write(item, clean(item, read(item))) for every item with the
+    three stages overlapped.  Items are cleaned and written in order.
+    Returns ({stage: StageStats}, wall_seconds).  The first exception
+    raised by any stage stops the pipeline and is re-raised.
+    """
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    stats = {name: StageStats(name) for name in ("read", "clean", "write")}
+    slots = threading.Semaphore(max_in_flight)
+    read_q = queue.Queue(maxsize=max_in_flight)
+    write_q = queue.Queue(maxsize=max_in_flight)
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        try:
+            for item in items:
+                start = time.perf_counter()
+                while not slots.acquire(timeout=0.1):
+                    if stop.is_set():
+                        return
+                stats["read"].waiting += time.perf_counter() - start
+
+                start = time.perf_counter()
+                data = read(item)
+                stats["read"].busy += time.perf_counter() - start
+                stats["read"].items += 1
+
+                read_q.put((item, data))
+        except BaseException as exc:
+            errors.append(exc)
+            stop.set()
+        finally:
+            read_q.put(_DONE)
+
+    def writer():
+        while True:
+            start = time.perf_counter()
+            entry = write_q.get()
+            stats["write"].waiting += time.perf_counter() - start
+            if entry is _DONE:
+                return
+            try:
+                if not stop.is_set():
+                    start = time.perf_counter()
+                    write(*entry)
+                    stats["write"].busy += time.perf_counter() - start
+                    stats["write"].items += 1
+            except BaseException as exc:
+                errors.append(exc)
+                stop.set()
+            finally:
+                slots.release()
+
+    wall_start = time.perf_counter()
+
+    threads = [
+        threading.Thread(target=reader, name="pipeline-reader", daemon=True),
+        threading.Thread(target=writer, name="pipeline-writer", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            start = time.perf_counter()
+            entry = read_q.get()
+            stats["clean"].waiting += time.perf_counter() - start
+            if entry is _DONE or stop.is_set():
+                break
+
+            item, data = entry
+            start = time.perf_counter()
+            result = clean(item, data)
+            stats["clean"].busy += time.perf_counter() - start
+            stats["clean"].items += 1
+
+            write_q.put((item, result))
+    except BaseException as exc:
+        errors.append(exc)
+        stop.set()
+    finally:
+        write_q.put(_DONE)
+        # unblock a reader waiting on a full queue
+        while threads[0].is_alive():
+            try:
+                read_q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+
+    return stats, time.perf_counter() - wall_start
@@ -0,0 +1,249 @@
+"""
+Cleaning Rules
+--------------
+The cleaning rules of All_clean_amazon.py (Questions 1-10) as one
+function, shared by the yearly cleaner and the micro-batch ingestion
+of daily delta files (ingest_deltas.py).
+
+Every rule counts the masks it applies into a QualityCounters object
+(see analytics/quality.py).  Medians and duplicates are computed over
+the frame that is passed in (one year file or one delta).
+
+Usage:
+    from cleaning.rules import clean_orders
+    df = clean_orders(df, quality, price_index, city_resolver)
+"""
+
+import numpy as np
+import pandas as pd
+
+from cleaning.lookups import FALSE_VALUES, PAYMENT_MAP, TRUE_VALUES
+
+# ================================
+# CONFIG
+# ================================
+
+# rows equal on these columns are duplicates (Question 8)
+DUP_COLS = ["customer_id", "product_id", "order_date", "final_amount_inr"]
+
+
+# ================================
+# RULES
+# ================================
+
+def clean_orders(df, quality, price_index, city_resolver, filled=None):
+    """
+    Applies Questions 1-10 to a raw orders frame and returns the
+    cleaned frame (duplicates dropped).  price_index is the catalogue
+    price index (cleaning/catalogue_index.py), city_resolver a
+    CityResolver; new fuzzy matches are not saved here.
+
+    filled, if given, receives {column: mask} of the cells filled with
+    the frame's median, whose value depends on the frame.
+    """
+    filled = {} if filled is None else filled
+
+    # ======================================================
+    # QUESTION 1: Clean & Standardize order_date → YYYY-MM-DD
+    # ======================================================
+    # format="mixed" parses every value on its own, like a per-row to_datetime
+    raw = df["order_date"]
+    dates = pd.to_datetime(raw, dayfirst=True, errors="coerce", format="mixed")
+
+    missing = quality.count("order_date", "missing", raw.isna())
+    quality.count("order_date", "unparseable_to_nan", ~missing & dates.isna())
+
+    df["order_date"] = dates.dt.date
+
+    # ======================================================
+    # QUESTION 2: Clean original_price_inr
+    # ======================================================
+    raw = df["original_price_inr"]
+    text = raw.astype(str).str.strip().str.lower()
+
+    missing = quality.count("original_price_inr", "missing", raw.isna())
+    placeholder = quality.count("original_price_inr", "text_placeholder",
+                                ~missing & text.str.contains("price", regex=False))
+
+    text = (
+        text.str.replace("₹", "", regex=False)
+            .str.replace("rs", "", regex=False)
+            .str.replace("â‚¹", "", regex=False)
+            .str.replace(",", "", regex=False)
+            .str.strip()
+    )
+
+    price = pd.to_numeric(text.where(~missing & ~placeholder), errors="coerce")
+
+    quality.count("original_price_inr", "unparseable",
+                  ~missing & ~placeholder & price.isna())
+    quality.count("original_price_inr", "negative_to_abs", price < 0)
+
+    price = price.abs()
+    filled["original_price_inr"] = quality.count("original_price_inr", "median_filled",
+                                                 price.isna())
+
+    df["original_price_inr"] = price.fillna(price.median())
+
+    # ======================================================
+    # QUESTION 3: Clean customer_rating (1.0–5.0)
+    # ======================================================
+    raw = df["customer_rating"]
+    text = raw.astype(str).str.strip().str.lower()
+
+    missing = quality.count("customer_rating", "missing", raw.isna())
+    numeric = quality.count("customer_rating", "numeric",
+                            ~missing & text.str.match(r"^\d(\.\d)?$"))
+    stars = quality.count("customer_rating", "star_text",
+                          ~missing & ~numeric & text.str.contains("star", regex=False))
+    scaled = quality.count("customer_rating", "fraction_rescaled",
+                           ~missing & ~numeric & ~stars & text.str.contains("/", regex=False))
+
+    rating = pd.Series(np.nan, index=df.index)
+    rating[numeric] = text[numeric].astype(float)
+    rating[stars] = pd.to_numeric(
+        text[stars].str.extract(r"(\d(?:\.\d)?)", expand=False), errors="coerce"
+    )
+
+    parts = text[scaled].str.extract(r"^([^/]*)/([^/]*)$")
+    fraction = pd.to_numeric(parts[0], errors="coerce") / pd.to_numeric(parts[1], errors="coerce")
+    rating[scaled] = (fraction * 5).replace([np.inf, -np.inf], np.nan).round(1)
+
+    quality.count("customer_rating", "unparseable_to_nan", ~missing & rating.isna())
+    quality.count("customer_rating", "out_of_range", (rating < 1) | (rating > 5))
+
+    df["customer_rating"] = rating
+
+    # ======================================================
+    # QUESTION 4: Standardize customer_city
+    # ======================================================
+    raw = df["customer_city"]
+    cities, how = city_resolver.resolve(raw)
+
+    quality.count("customer_city", "missing", raw.isna())
+    quality.count("customer_city", "alias_mapped", (how == "alias") & (cities != raw))
+    quality.count("customer_city", "fuzzy_matched", how == "fuzzy")
+    quality.count("customer_city", "fallthrough_title_case", how == "unresolved")
+
+    df["customer_city"] = cities
+
+    # ======================================================
+    # QUESTION 5: Boolean Columns → True / False
+    # ======================================================
+    bool_cols = ["is_prime_member", "is_prime_eligible", "is_festival_sale"]
+
+    for col in bool_cols:
+        raw = df[col]
+        text = raw.astype(str).str.lower().str.strip()
+
+        missing = quality.count(col, "missing_to_false", raw.isna())
+        is_true = quality.count(col, "true", ~missing & text.isin(TRUE_VALUES))
+        quality.count(col, "unrecognised_to_false",
+                      ~missing & ~is_true & ~text.isin(FALSE_VALUES))
+
+        df[col] = is_true
+
+    # ======================================================
+    # QUESTION 6: Standardize category
+    # ======================================================
+    raw = df["category"]
+    text = raw.astype(str).str.lower().str.replace("&", "and", regex=False)
+
+    missing = quality.count("category", "missing_to_unknown", raw.isna())
+    electronics = quality.count("category", "merged_electronics",
+                                ~missing & text.str.contains("electronic", regex=False))
+
+    category = text.str.title().mask(electronics, "Electronics").mask(missing, "Unknown")
+    quality.count("category", "renamed", ~missing & (category != raw))
+
+    df["category"] = category
+
+    # ======================================================
+    # QUESTION 7: Clean delivery_days
+    # ======================================================
+    raw = df["delivery_days"]
+    text = raw.astype(str).str.lower()
+
+    missing = quality.count("delivery_days", "missing", raw.isna())
+    same_day = quality.count("delivery_days", "same_day_text",
+                             ~missing & text.str.contains("same", regex=False))
+    express = quality.count("delivery_days", "express_text",
+                            ~missing & ~same_day & text.str.contains("express", regex=False))
+    ranged = quality.count("delivery_days", "range_to_max",
+                           ~missing & ~same_day & ~express & text.str.contains("-", regex=False))
+    numeric = ~missing & ~same_day & ~express & ~ranged
+
+    days = pd.Series(np.nan, index=df.index)
+    days[same_day] = 0
+    days[express] = 1
+
+    if ranged.any():
+        # numeric max ("5-10" -> 10); the original per-row rule took
+        # the max of the digit strings ("5-10" -> 5)
+        digits = text[ranged].str.extractall(r"(\d+)")[0]
+        range_max = digits.astype(int).groupby(level=0).max()
+        quality.count("delivery_days", "range_max_numeric",
+                      range_max != digits.groupby(level=0).max().astype(int))
+        days[ranged] = range_max
+
+    num = pd.to_numeric(text[numeric].str.strip(), errors="coerce")
+    num = np.trunc(num.where(np.isfinite(num)))
+    quality.count("delivery_days", "clamped_1_30", (num < 1) | (num > 30))
+    days[numeric] = num.clip(1, 30)
+
+    quality.count("delivery_days", "unparseable", ~missing & days.isna())
+    filled["delivery_days"] = quality.count("delivery_days", "median_filled",
+                                            days.isna())
+
+    df["delivery_days"] = days.fillna(int(days.median()))
+
+    # ======================================================
+    # QUESTION 8: Handle duplicates
+    # ======================================================
+    df["is_duplicate"] = df.duplicated(subset=DUP_COLS, keep=False)
+    dropped = df["is_duplicate"] & (df["quantity"] == 1)
+
+    quality.count("duplicates", "duplicate_rows", df["is_duplicate"])
+    quality.count("duplicates", "dropped", dropped)
+
+    df = df[~dropped]
+    df.drop(columns=["is_duplicate"], inplace=True)
+
+    # ======================================================
+    # QUESTION 9: Correct Outlier Prices using Catalogue
+    # ======================================================
+    sp = df["original_price_inr"]
+    bp = pd.Series(price_index.lookup(df["product_id"]), index=df.index)
+
+    known = ~quality.count("price_correction", "no_catalogue_price", sp.isna() | bp.isna())
+    div_100 = quality.count("price_correction", "divided_by_100", known & (sp >= bp * 100))
+    div_10 = quality.count("price_correction", "divided_by_10",
+                           known & ~div_100 & (sp >= bp * 10))
+    replaced = quality.count("price_correction", "replaced_with_base_price",
+                             known & ~div_100 & ~div_10 & ((sp > bp * 3) | (sp < bp * 0.3)))
+
+    corrected = np.select([div_100, div_10, replaced], [sp / 100, sp / 10, bp], default=sp)
+    df["original_price_inr"] = pd.Series(corrected, index=df.index).round(2).where(known, sp)
+
+    # ======================================================
+    # QUESTION 10: Clean payment_method
+    # ======================================================
+    raw = df["payment_method"]
+    text = raw.astype(str).str.lower()
+    missing = raw.isna()
+
+    # first matching key wins, as in the dict order
+    payment = pd.Series("Other", index=df.index)
+    matched = pd.Series(False, index=df.index)
+    for k, v in PAYMENT_MAP.items():
+        hit = ~missing & ~matched & text.str.contains(k, regex=False)
+        payment[hit] = v
+        matched |= hit
+
+    quality.count("payment_method", "missing_to_unknown", missing)
+    quality.count("payment_method", "mapped", matched)
+    quality.count("payment_method", "fallthrough_other", ~missing & ~matched)
+
+    df["payment_method"] = payment.mask(missing, "Unknown")
+
+    return df
@@ -1,23 +1,13 @@
-import psycopg2
-import os
+from customer_scd import CUSTOMER_SCHEMA_SQL, CUSTOMER_VERSION_JOIN, CUSTOMER_VERSIONS_SQL
+from db import get_connection
+from fact_changes import FACT_CHANGES_SCHEMA_SQL, FULL_REBUILD_SQL
+from time_dimension import build_calendar, copy_calendar, ensure_date_coverage
 
 # ================================
-# DB CONFIG
+# SQL SCRIPTS
 # ================================
 
-DB_CONFIG = {
-    "host": "localhost",
-    "port": 5432,
-    "dbname": "Amazon",
-    "user": "postgres",
-    "password": "Shivam@220"  
-}
-
-# ================================
-# SQL SCRIPT
-# ================================
-
-SQL_SCRIPT = """
+SCHEMA_SQL = """
 SET search_path TO public;
 
 DROP TABLE IF EXISTS transactions CASCADE;
@@ -25,8 +15,21 @@ DROP TABLE IF EXISTS products CASCADE;
 DROP TABLE IF EXISTS customers CASCADE;
 DROP TABLE IF EXISTS time_dimension CASCADE;
 
+-- SURROGATE KEY MAPS (never dropped, so keys stay stable across loads)
+
+CREATE TABLE IF NOT EXISTS product_key_map (
+    product_key INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    product_id TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS customer_key_map (
+    customer_key INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    customer_id TEXT NOT NULL UNIQUE
+);
+
 CREATE TABLE products (
-    product_id TEXT PRIMARY KEY,
+    product_key INT PRIMARY KEY,
+    product_id TEXT UNIQUE,
     product_name TEXT,
     category TEXT,
     subcategory TEXT,
@@ -36,18 +39,12 @@ CREATE TABLE products (
     product_rating NUMERIC(3,2)
 );
 
-CREATE TABLE customers (
-    customer_id TEXT PRIMARY KEY,
-    customer_city TEXT,
-    customer_state TEXT,
-    customer_tier TEXT,
-    customer_spending_tier TEXT,
-    customer_age_group TEXT,
-    is_prime_member BOOLEAN
-);
-
+-- customers (SCD type 2) + customer_version_map, see customer_scd.py
+""" + CUSTOMER_SCHEMA_SQL + """
+-- date_key is YYYYMMDD, stable by construction
 CREATE TABLE time_dimension (
-    date_key DATE PRIMARY KEY,
+    date_key INT PRIMARY KEY,
+    full_date DATE UNIQUE,
     year INT,
     quarter INT,
     month INT,
@@ -55,18 +52,20 @@ CREATE TABLE time_dimension (
     week INT,
     day INT,
     day_name TEXT,
-    is_weekend BOOLEAN
+    is_weekend BOOLEAN,
+    is_festival BOOLEAN,
+    festival_name TEXT
 );
 
 CREATE TABLE transactions (
 
     transaction_id TEXT PRIMARY KEY,
 
-    order_date DATE,
-    date_key DATE REFERENCES time_dimension(date_key),
+    date_key INT REFERENCES time_dimension(date_key),
 
-    customer_id TEXT REFERENCES customers(customer_id),
-    product_id TEXT REFERENCES products(product_id),
+    customer_key INT REFERENCES customer_key_map(customer_key),
+    customer_version_key INT REFERENCES customers(customer_version_key),
+    product_key INT REFERENCES products(product_key),
 
     quantity INT,
     subtotal_inr NUMERIC,
@@ -86,59 +85,58 @@ CREATE TABLE transactions (
 
     customer_rating NUMERIC(3,2)
 );
+"""
+
+# time_dimension is generated by time_dimension.py and bulk-loaded
+# with COPY, so it never scans staging_raw
+DIMENSIONS_SQL = """
+-- ASSIGN KEYS TO NEW IDS ONLY
+
+INSERT INTO product_key_map (product_id)
+SELECT DISTINCT s.product_id
+FROM staging_raw s
+LEFT JOIN product_key_map m ON m.product_id = s.product_id
+WHERE s.product_id IS NOT NULL
+  AND m.product_id IS NULL
+ORDER BY s.product_id;
+
+INSERT INTO customer_key_map (customer_id)
+SELECT DISTINCT s.customer_id
+FROM staging_raw s
+LEFT JOIN customer_key_map m ON m.customer_id = s.customer_id
+WHERE s.customer_id IS NOT NULL
+  AND m.customer_id IS NULL
+ORDER BY s.customer_id;
 
 -- LOAD DIMENSIONS
 
 INSERT INTO products
 SELECT DISTINCT
-    product_id,
-    product_name,
-    category,
-    subcategory,
-    brand,
-    product_weight_kg,
-    is_prime_eligible,
-    product_rating
-FROM staging_raw;
-
-INSERT INTO customers
-SELECT
-    customer_id,
-    MAX(customer_city),
-    MAX(customer_state),
-    MAX(customer_tier),
-    MAX(customer_spending_tier),
-    MAX(customer_age_group),
-    BOOL_OR(is_prime_member)
-FROM staging_raw
-GROUP BY customer_id;
-
-INSERT INTO time_dimension
-SELECT
-    order_date,
-    MAX(order_year),
-    MAX(order_quarter),
-    MAX(order_month),
-    TO_CHAR(order_date,'Month'),
-    EXTRACT(WEEK FROM order_date),
-    EXTRACT(DAY FROM order_date),
-    TO_CHAR(order_date,'Day'),
-    CASE 
-        WHEN EXTRACT(DOW FROM order_date) IN (0,6)
-        THEN TRUE ELSE FALSE 
-    END
-FROM staging_raw
-GROUP BY order_date;
+    m.product_key,
+    s.product_id,
+    s.product_name,
+    s.category,
+    s.subcategory,
+    s.brand,
+    s.product_weight_kg,
+    s.is_prime_eligible,
+    s.product_rating
+FROM staging_raw s
+JOIN product_key_map m ON m.product_id = s.product_id;
+"""
 
+FACT_SQL = """
 -- LOAD FACT
 
 INSERT INTO transactions
 SELECT
-    transaction_id,
-    order_date,
-    order_date,
-    customer_id,
-    product_id,
+    s.transaction_id,
+    (EXTRACT(YEAR FROM s.order_date) * 10000
+     + EXTRACT(MONTH FROM s.order_date) * 100
+     + EXTRACT(DAY FROM s.order_date))::INT,
+    ck.customer_key,
+    cv.customer_version_key,
+    pk.product_key,
     quantity,
     subtotal_inr,
     discount_percent,
@@ -152,13 +150,17 @@ SELECT
     is_festival_sale,
     festival_name,
     customer_rating
-FROM staging_raw;
+FROM staging_raw s
+LEFT JOIN customer_key_map ck ON ck.customer_id = s.customer_id
+LEFT JOIN product_key_map pk ON pk.product_id = s.product_id
+""" + CUSTOMER_VERSION_JOIN + """;
 
 -- INDEXES
 
-CREATE INDEX idx_txn_date ON transactions(order_date);
-CREATE INDEX idx_txn_customer ON transactions(customer_id);
-CREATE INDEX idx_txn_product ON transactions(product_id);
+CREATE INDEX idx_txn_date ON transactions(date_key);
+CREATE INDEX idx_txn_customer ON transactions(customer_key);
+CREATE INDEX idx_txn_customer_version ON transactions(customer_version_key);
+CREATE INDEX idx_txn_product ON transactions(product_key);
 CREATE INDEX idx_txn_return ON transactions(return_status);
 CREATE INDEX idx_txn_amount ON transactions(final_amount_inr);
 
@@ -183,15 +185,28 @@ SELECT COUNT(*) FROM transactions;
 
 print("🚀 Connecting to PostgreSQL...")
 
-conn = psycopg2.connect(**DB_CONFIG)
-conn.autocommit = True
-cur = conn.cursor()
+with get_connection(autocommit=True) as conn:
+    cur = conn.cursor()
 
-print("✅ Connected")
+    print("✅ Connected")
 
-cur.execute(SQL_SCRIPT)
+    cur.execute(SCHEMA_SQL)
+    cur.execute(DIMENSIONS_SQL)
+    cur.execute(CUSTOMER_VERSIONS_SQL.format(source="staging_raw"))
 
-print("🎯 Star schema built successfully")
+    print("📦 Product & customer dimensions loaded")
+
+    days = copy_calendar(cur, build_calendar())
+    days += ensure_date_coverage(cur)
 
-cur.close()
-conn.close()
+    print(f"📅 Calendar loaded: {days} days")
+
+    cur.execute(FACT_SQL)
+
+    # every Power BI extract partition has to be rewritten
+    cur.execute(FACT_CHANGES_SCHEMA_SQL)
+    cur.execute(FULL_REBUILD_SQL)
+
+    cur.close()
+
+print("🎯 Star schema built successfully")
@@ -0,0 +1,157 @@
+"""
+Customer Dimension (SCD Type 2)
+-------------------------------
+customers keeps one row per version of a customer's attributes
+(city, state, tier, spending tier, age group, Prime membership):
+
+  customer_version_key   surrogate key of the version (facts join on it)
+  customer_key           durable key of the customer (customer_key_map)
+  attr_hash              md5 of the attribute tuple
+  valid_from / valid_to  order dates the version covers, [from, to);
+                         valid_to = 9999-12-31 for the current version
+  is_current             one current version per customer
+
+A customer's attributes for an order day are those of the day's last
+order (by transaction_id).  A day whose hash differs from the
+previous day's (or from the stored current version) opens a new
+version and closes the previous one, so only changed customers
+produce rows and a load costs time in proportion to its source:
+build_star_schema.py runs CUSTOMER_VERSIONS_SQL over staging_raw
+into an empty table, db_pipeline/upsert_orders.py over a delta
+against the current versions only (partial index on is_current).
+
+Version keys come from customer_version_map, which is never dropped,
+so a rebuild gives every version the key it had before.
+
+Deltas are expected in order-date order: a delta day on or before the
+start of a customer's current version opens no version, and its
+orders join the version valid at their date.  Orders without a date
+join the current version.
+"""
+
+# ================================
+# SQL
+# ================================
+
+CUSTOMER_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS customer_version_map (
+    customer_version_key INT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    customer_key INT NOT NULL,
+    valid_from DATE NOT NULL,
+    attr_hash TEXT NOT NULL,
+    UNIQUE (customer_key, valid_from, attr_hash)
+);
+
+CREATE TABLE customers (
+    customer_version_key INT PRIMARY KEY,
+    customer_key INT NOT NULL,
+    customer_id TEXT,
+    customer_city TEXT,
+    customer_state TEXT,
+    customer_tier TEXT,
+    customer_spending_tier TEXT,
+    customer_age_group TEXT,
+    is_prime_member BOOLEAN,
+    attr_hash TEXT NOT NULL,
+    valid_from DATE NOT NULL,
+    valid_to DATE NOT NULL,
+    is_current BOOLEAN NOT NULL
+);
+
+CREATE UNIQUE INDEX idx_customers_current ON customers(customer_key) WHERE is_current;
+CREATE UNIQUE INDEX idx_customers_validity ON customers(customer_key, valid_from);
+"""
+
+# {source}: staging_raw (full build) or staging_delta (upsert)
+CUSTOMER_VERSIONS_SQL = """
+-- CHANGED ATTRIBUTE TUPLES (one per customer and day, hash-compared)
+
+DROP TABLE IF EXISTS customer_changes;
+
+CREATE TEMP TABLE customer_changes AS
+WITH daily AS (
+    SELECT DISTINCT ON (m.customer_key, s.order_date)
+        m.customer_key,
+        s.customer_id,
+        s.order_date AS valid_from,
+        s.customer_city,
+        s.customer_state,
+        s.customer_tier,
+        s.customer_spending_tier,
+        s.customer_age_group,
+        s.is_prime_member,
+        md5(ROW(s.customer_city, s.customer_state, s.customer_tier, s.customer_spending_tier,
+                s.customer_age_group, s.is_prime_member)::TEXT) AS attr_hash
+    FROM {source} s
+    JOIN customer_key_map m ON m.customer_id = s.customer_id
+    WHERE s.order_date IS NOT NULL
+    ORDER BY m.customer_key, s.order_date, s.transaction_id DESC
+),
+chained AS (
+    SELECT
+        d.*,
+        COALESCE(LAG(d.attr_hash) OVER (PARTITION BY d.customer_key ORDER BY d.valid_from),
+                 c.attr_hash) AS previous_hash
+    FROM daily d
+    LEFT JOIN customers c ON c.customer_key = d.customer_key AND c.is_current
+    WHERE c.customer_key IS NULL OR d.valid_from > c.valid_from
+)
+SELECT
+    *,
+    LEAD(valid_from) OVER (PARTITION BY customer_key ORDER BY valid_from) AS next_from
+FROM chained
+WHERE attr_hash IS DISTINCT FROM previous_hash;
+
+-- CLOSE THE CURRENT VERSION OF CHANGED CUSTOMERS
+
+UPDATE customers c
+SET valid_to = f.first_from,
+    is_current = FALSE
+FROM (
+    SELECT customer_key, MIN(valid_from) AS first_from
+    FROM customer_changes
+    GROUP BY customer_key
+) f
+WHERE c.customer_key = f.customer_key
+  AND c.is_current;
+
+-- STABLE VERSION KEYS
+
+INSERT INTO customer_version_map (customer_key, valid_from, attr_hash)
+SELECT customer_key, valid_from, attr_hash
+FROM customer_changes
+ORDER BY customer_key, valid_from
+ON CONFLICT (customer_key, valid_from, attr_hash) DO NOTHING;
+
+-- NEW VERSIONS
+
+INSERT INTO customers
+SELECT
+    v.customer_version_key,
+    ch.customer_key,
+    ch.customer_id,
+    ch.customer_city,
+    ch.customer_state,
+    ch.customer_tier,
+    ch.customer_spending_tier,
+    ch.customer_age_group,
+    ch.is_prime_member,
+    ch.attr_hash,
+    ch.valid_from,
+    COALESCE(ch.next_from, DATE '9999-12-31'),
+    ch.next_from IS NULL
+FROM customer_changes ch
+JOIN customer_version_map v
+  ON v.customer_key = ch.customer_key
+ AND v.valid_from = ch.valid_from
+ AND v.attr_hash = ch.attr_hash;
+
+DROP TABLE customer_changes;
+"""
+
+# join of a staging row s (customer_key_map ck) to the version valid
+# at its order date
+CUSTOMER_VERSION_JOIN = """LEFT JOIN customers cv
+  ON cv.customer_key = ck.customer_key
+ AND CASE WHEN s.order_date IS NULL THEN cv.is_current
+          ELSE s.order_date >= cv.valid_from AND s.order_date < cv.valid_to END"""
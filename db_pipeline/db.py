@@ -0,0 +1,259 @@
+"""
+Shared Database Layer
+---------------------
+One pooled PostgreSQL configuration for every db_pipeline script and
+a streaming reader that pulls large results through a named
+(server-side) cursor in fixed-size batches of typed DataFrames.
+
+Configuration comes from the standard libpq environment variables:
+PGHOST, PGPORT, PGDATABASE, PGUSER, PGPASSWORD
+plus DB_POOL_MIN / DB_POOL_MAX for the pool size.
+
+Usage:
+    from db import get_connection, stream_query      # inside db_pipeline/
+    from db_pipeline.db import stream_query          # from the project root
+
+    for batch in stream_query(YEAR_TRANSACTIONS_SQL, {"year": 2024}):
+        ...
+"""
+
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+from psycopg2.pool import ThreadedConnectionPool
+
+# ================================
+# DB CONFIG
+# ================================
+
+DB_CONFIG = {
+    "host": os.environ.get("PGHOST", "localhost"),
+    "port": int(os.environ.get("PGPORT", 5432)),
+    "dbname": os.environ.get("PGDATABASE", "Amazon"),
+    "user": os.environ.get("PGUSER", "postgres"),
+}
+
+# libpq reads PGPASSWORD / ~/.pgpass itself; only pass it through when set
+if os.environ.get("PGPASSWORD"):
+    DB_CONFIG["password"] = os.environ["PGPASSWORD"]
+
+POOL_MIN = int(os.environ.get("DB_POOL_MIN", 1))
+POOL_MAX = int(os.environ.get("DB_POOL_MAX", 8))
+
+BATCH_SIZE = 100_000
+
+# Postgres type OID -> pandas dtype for streamed batches
+PG_DTYPES = {
+    16: "boolean",                  # bool
+    20: "Int64",                    # int8
+    21: "Int64",                    # int2
+    23: "Int64",                    # int4
+    700: "float64",                 # float4
+    701: "float64",                 # float8
+    1700: "float64",                # numeric
+    1082: "datetime64[ns]",         # date
+    1114: "datetime64[ns]",         # timestamp
+    25: "string",                   # text
+    1043: "string",                 # varchar
+}
+
+# staging_raw holds the cleaned master, loaded by load_to_postgres.py
+# (COPY of the pandas-cleaned CSV) or built by elt_clean.py (in SQL)
+STAGING_RAW_SQL = """
+DROP TABLE IF EXISTS staging_raw;
+
+CREATE TABLE staging_raw (
+    transaction_id TEXT,
+    order_date DATE,
+
+    customer_id TEXT,
+    product_id TEXT,
+    product_name TEXT,
+    category TEXT,
+    subcategory TEXT,
+    brand TEXT,
+
+    original_price_inr NUMERIC,
+    discount_percent NUMERIC,
+    discounted_price_inr NUMERIC,
+
+    quantity INT,
+    subtotal_inr NUMERIC,
+    delivery_charges NUMERIC,
+    final_amount_inr NUMERIC,
+
+    customer_city TEXT,
+    customer_state TEXT,
+    customer_tier TEXT,
+    customer_spending_tier TEXT,
+    customer_age_group TEXT,
+
+    payment_method TEXT,
+
+    delivery_days INT,
+    delivery_type TEXT,
+
+    is_prime_member BOOLEAN,
+    is_festival_sale BOOLEAN,
+    festival_name TEXT,
+
+    customer_rating NUMERIC,
+    return_status TEXT,
+
+    order_month INT,
+    order_year INT,
+    order_quarter INT,
+
+    product_weight_kg NUMERIC,
+    is_prime_eligible BOOLEAN,
+    product_rating NUMERIC
+);
+"""
+
+YEAR_TRANSACTIONS_SQL = """
+SELECT
+    t.*,
+    d.full_date AS order_date,
+    d.year AS order_year,
+    d.month AS order_month,
+    d.quarter AS order_quarter,
+    p.product_id,
+    p.category,
+    p.subcategory,
+    p.brand,
+    c.customer_id,
+    c.customer_city,
+    c.customer_state,
+    c.customer_tier,
+    c.customer_age_group,
+    c.is_prime_member
+FROM transactions t
+JOIN time_dimension d ON d.date_key = t.date_key
+LEFT JOIN products p ON p.product_key = t.product_key
+LEFT JOIN customers c ON c.customer_version_key = t.customer_version_key
+WHERE d.year = %(year)s
+"""
+
+
+# ================================
+# CONNECTION POOL
+# ================================
+
+_pool = None
+_pool_lock = threading.Lock()
+_cursor_ids = itertools.count()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(POOL_MIN, POOL_MAX, **DB_CONFIG)
+    return _pool
+
+
+@contextmanager
+def get_connection(autocommit=False):
+    """
+    Borrows a pooled connection.  Commits on success, rolls back on
+    error and always returns the connection to the pool.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    conn.autocommit = autocommit
+    try:
+        yield conn
+        if not conn.autocommit:
+            conn.commit()
+    except BaseException:
+        # also covers GeneratorExit from an abandoned stream_query()
+        if not conn.closed and not conn.autocommit:
+            conn.rollback()
+        raise
+    finally:
+        if not conn.closed:
+            conn.autocommit = False
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+# ================================
+# READERS
+# ================================
+
+def _typed_frame(rows, description):
+    columns = [desc[0] for desc in description]
+    frame = pd.DataFrame(rows, columns=columns)
+
+    for desc in description:
+        dtype = PG_DTYPES.get(desc[1])
+        if dtype is None:
+            continue
+        if dtype.startswith("datetime64"):
+            frame[desc[0]] = pd.to_datetime(frame[desc[0]])
+        else:
+            frame[desc[0]] = frame[desc[0]].astype(dtype)
+
+    return frame
+
+
+def stream_query(sql, params=None, batch_size=BATCH_SIZE):
+    """
+    Yields typed DataFrames of at most batch_size rows, fetched through
+    a named server-side cursor so the full result never sits in client
+    memory.
+    """
+    with get_connection() as conn:
+        cur = conn.cursor(name=f"stream_{os.getpid()}_{next(_cursor_ids)}")
+        cur.itersize = batch_size
+        try:
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield _typed_frame(rows, cur.description)
+        finally:
+            cur.close()
+
+
+def read_frame(sql, params=None):
+    """Runs a (small) query and returns one typed DataFrame."""
+    with get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        frame = _typed_frame(cur.fetchall(), cur.description)
+        cur.close()
+    return frame
+
+
+def stream_transactions(year, batch_size=BATCH_SIZE):
+    """One year of transactions joined to all dimensions, in batches."""
+    return stream_query(YEAR_TRANSACTIONS_SQL, {"year": year}, batch_size)
+
+
+if __name__ == "__main__":
+
+    print("🚀 Streaming one year of transactions...")
+
+    rows = 0
+    revenue = 0.0
+    for batch in stream_transactions(2024, batch_size=50_000):
+        rows += len(batch)
+        revenue += batch["final_amount_inr"].sum()
+        print(f"  batch: {len(batch)} rows | {batch.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+
+    close_pool()
+
+    print(f"✅ 2024: {rows} rows | revenue {revenue:,.2f}")
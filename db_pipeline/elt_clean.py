@@ -0,0 +1,546 @@
+"""
+In-Warehouse Cleaning (ELT)
+---------------------------
+Alternative to All_clean_amazon.py + master/create_master_amazon_data.py
++ load_to_postgres.py: the raw year files are COPY'd as-is into an
+all-TEXT table and cleaned inside Postgres with set-based SQL, ending
+in the same staging_raw table.
+
+  elt_raw_orders       raw rows (+ source_file), UNLOGGED
+  elt_catalogue        raw product catalogue, UNLOGGED
+  elt_city_lookup      raw customer_city -> canonical city
+  elt_payment_lookup   substring -> payment method, in priority order
+  elt_payment_map      raw payment_method -> method (first matching
+                       substring), one row per distinct spelling
+  elt_parsed           row-wise rules applied (dates, prices, ratings,
+                       cities, booleans, categories, delivery days,
+                       payment methods)
+  elt_cleaned          + per-file median fills, duplicate removal and
+                       the catalogue price correction
+
+Both are built with CREATE TABLE AS, so the scans, joins and regex
+work can run on parallel workers (INSERT ... SELECT never does).
+
+The rules are the ones of the pandas cleaner (Questions 1-10), with
+the lookups shared through cleaning/lookups.py and the city aliases /
+fuzzy matching of cleaning/city_resolver.py (run in Python over the
+distinct spellings only).  Medians and duplicates are per year file,
+as in the pandas cleaner.
+
+Dates are parsed like pandas' dayfirst parser for the D-M-Y, D/M/Y and
+Y-M-D layouts found in the raw files; any other layout becomes NULL.
+
+Run (from the project root, raw year files in the project root):
+python db_pipeline/elt_clean.py
+"""
+
+import datetime
+import os
+import sys
+import time
+
+import pandas as pd
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+from db import STAGING_RAW_SQL, get_connection
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from cleaning.city_resolver import CITY_CACHE_FILE, CityResolver  # noqa: E402
+from cleaning.csv_io import open_text, resolve_path  # noqa: E402
+from cleaning.lookups import PAYMENT_MAP, TRUE_VALUES  # noqa: E402
+
+# ================================
+# CONFIG
+# ================================
+
+RAW_DIR = BASE_DIR
+
+YEAR_FILES = [
+    "amazon_india_2015.csv",
+    "amazon_india_2016.csv",
+    "amazon_india_2017.csv",
+    "amazon_india_2018.csv",
+    "amazon_india_2019.csv",
+    "amazon_india_2020.csv",
+    "amazon_india_2021.csv",
+    "amazon_india_2022.csv",
+    "amazon_india_2023.csv",
+    "amazon_india_2024.csv",
+    "amazon_india_2025.csv"
+]
+
+CATALOGUE_FILE = "amazon_india_products_catalog.csv"
+
+# workers per parallel query node while building elt_parsed / elt_cleaned
+PARALLEL_WORKERS = 4
+
+# sort / hash memory for the medians and the duplicate window
+WORK_MEM = "256MB"
+
+# keep the elt_* work tables after the run (for auditing the rules)
+KEEP_WORK_TABLES = False
+
+# strings pandas.read_csv reads as missing
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null"
+]
+
+WORK_TABLES = [
+    "elt_cleaned",
+    "elt_parsed",
+    "elt_raw_orders",
+    "elt_catalogue",
+    "elt_city_lookup",
+    "elt_payment_lookup",
+    "elt_payment_map",
+]
+
+# ================================
+# SQL
+# ================================
+
+FUNCTIONS_SQL = """
+-- pandas' missing-value strings -> NULL
+CREATE OR REPLACE FUNCTION elt_na(value TEXT) RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE WHEN value = ANY (%(na_values)s::TEXT[]) THEN NULL ELSE value END
+$$;
+
+-- make_date() that returns NULL instead of raising on impossible dates
+CREATE OR REPLACE FUNCTION elt_make_date(y INT, m INT, d INT) RETURNS DATE
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN y < 1 OR m NOT BETWEEN 1 AND 12 OR d < 1 THEN NULL
+        WHEN d > CASE
+                     WHEN m IN (4, 6, 9, 11) THEN 30
+                     WHEN m <> 2 THEN 31
+                     WHEN y %% 4 = 0 AND (y %% 100 <> 0 OR y %% 400 = 0) THEN 29
+                     ELSE 28
+                 END THEN NULL
+        ELSE make_date(y, m, d)
+    END
+$$;
+
+-- two-digit years within 50 years of this_year (as dateutil does)
+CREATE OR REPLACE FUNCTION elt_full_year(y TEXT, this_year INT) RETURNS INT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN length(y) = 4 THEN y::INT
+        WHEN y::INT + this_year / 100 * 100 >= this_year + 50 THEN y::INT + this_year / 100 * 100 - 100
+        WHEN y::INT + this_year / 100 * 100 < this_year - 50 THEN y::INT + this_year / 100 * 100 + 100
+        ELSE y::INT + this_year / 100 * 100
+    END
+$$;
+
+-- largest number in the text ("1-2 days" -> 2); a function rather than a
+-- correlated subquery, which would keep the query off parallel workers
+CREATE OR REPLACE FUNCTION elt_max_number(value TEXT) RETURNS INT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT max(m[1]::INT) FROM regexp_matches(value, '(\\d+)', 'g') m
+$$;
+
+-- pandas' dayfirst parsing of D-M-Y / D/M/Y (swapped when the month
+-- cannot be one) and Y-M-D (read as Y-D-M when both fit); other layouts -> NULL
+CREATE OR REPLACE FUNCTION elt_parse_date(value TEXT, this_year INT) RETURNS DATE
+LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE AS $$
+DECLARE
+    parts TEXT[];
+    a INT;
+    b INT;
+BEGIN
+    value := btrim(value);
+    IF value ~ '^\\d{1,2}[-/]\\d{1,2}[-/](\\d{4}|\\d{2})$' THEN
+        parts := string_to_array(translate(value, '/', '-'), '-');
+        a := parts[1]::INT;
+        b := parts[2]::INT;
+        IF b > 12 AND a <= 12 THEN
+            RETURN elt_make_date(elt_full_year(parts[3], this_year), a, b);
+        END IF;
+        RETURN elt_make_date(elt_full_year(parts[3], this_year), b, a);
+    ELSIF value ~ '^\\d{4}[-/]\\d{1,2}[-/]\\d{1,2}$' THEN
+        parts := string_to_array(translate(value, '/', '-'), '-');
+        a := parts[2]::INT;
+        b := parts[3]::INT;
+        IF b > 12 THEN
+            RETURN elt_make_date(parts[1]::INT, a, b);
+        END IF;
+        RETURN elt_make_date(parts[1]::INT, b, a);
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+-- to_numeric(errors="coerce") for plain decimal text
+CREATE OR REPLACE FUNCTION elt_float(value TEXT) RETURNS FLOAT8
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN btrim(value) ~* '^[+-]?(\\d+\\.?\\d*|\\.\\d+)(e[+-]?\\d+)?$' THEN btrim(value)::FLOAT8
+    END
+$$;
+"""
+
+PAYMENT_MAP_SQL = """
+CREATE UNLOGGED TABLE elt_payment_map AS
+SELECT DISTINCT ON (v.raw_value)
+    v.raw_value,
+    p.method
+FROM (
+    SELECT DISTINCT elt_na(payment_method) AS raw_value
+    FROM elt_raw_orders
+) v
+LEFT JOIN elt_payment_lookup p
+    ON position(p.pattern IN lower(v.raw_value)) > 0
+WHERE v.raw_value IS NOT NULL
+ORDER BY v.raw_value, p.priority;
+"""
+
+PARSE_SQL = """
+CREATE UNLOGGED TABLE elt_parsed AS
+WITH src AS (
+    SELECT source_file, {na_columns}
+    FROM elt_raw_orders
+)
+
+SELECT
+    s.*,
+
+    -- Q1: dayfirst dates
+    elt_parse_date(s.order_date, %(this_year)s) AS order_date_clean,
+
+    -- Q2: currency symbols / thousands separators stripped, placeholders -> NULL
+    CASE
+        WHEN position('price' IN lower(btrim(s.original_price_inr))) = 0 THEN abs(elt_float(
+            replace(replace(replace(replace(
+                lower(btrim(s.original_price_inr)), '₹', ''), 'rs', ''), 'â‚¹', ''), ',', '')
+        ))
+    END AS price,
+
+    -- Q3: 4.0 / "4 stars" / "4/5" -> 1.0-5.0
+    CASE
+        WHEN lower(btrim(s.customer_rating)) ~ '^\\d(\\.\\d)?$'
+            THEN lower(btrim(s.customer_rating))::FLOAT8
+        WHEN position('star' IN lower(btrim(s.customer_rating))) > 0
+            THEN substring(s.customer_rating FROM '\\d\\.\\d|\\d')::FLOAT8
+        WHEN btrim(s.customer_rating) ~ '^[^/]*/[^/]*$'
+            THEN round(elt_float(split_part(btrim(s.customer_rating), '/', 1))
+                       / NULLIF(elt_float(split_part(btrim(s.customer_rating), '/', 2)), 0)
+                       * 5 * 10) / 10
+    END AS rating,
+
+    -- Q4: city lookup (aliases + fuzzy matches, built in Python)
+    c.city,
+
+    -- Q5: booleans
+    COALESCE(lower(btrim(s.is_prime_member)) = ANY (%(true_values)s::TEXT[]), false) AS prime_member,
+    COALESCE(lower(btrim(s.is_prime_eligible)) = ANY (%(true_values)s::TEXT[]), false) AS prime_eligible,
+    COALESCE(lower(btrim(s.is_festival_sale)) = ANY (%(true_values)s::TEXT[]), false) AS festival_sale,
+
+    -- Q6: categories
+    CASE
+        WHEN s.category IS NULL THEN 'Unknown'
+        WHEN position('electronic' IN lower(s.category)) > 0 THEN 'Electronics'
+        ELSE initcap(replace(lower(s.category), '&', 'and'))
+    END AS category_clean,
+
+    -- Q7: delivery days ("same day" 0, "express" 1, ranges -> max, else 1-30)
+    CASE
+        WHEN position('same' IN lower(s.delivery_days)) > 0 THEN 0
+        WHEN position('express' IN lower(s.delivery_days)) > 0 THEN 1
+        WHEN position('-' IN s.delivery_days) > 0
+            THEN elt_max_number(s.delivery_days)
+        WHEN elt_float(s.delivery_days) IS NULL THEN NULL
+        ELSE least(greatest(trunc(elt_float(s.delivery_days)), 1), 30)
+    END AS days,
+
+    -- Q10: payment methods (first matching pattern, see elt_payment_map)
+    CASE
+        WHEN s.payment_method IS NULL THEN 'Unknown'
+        ELSE COALESCE(pm.method, 'Other')
+    END AS payment
+
+FROM src s
+LEFT JOIN elt_city_lookup c
+    ON c.raw_value = s.customer_city
+LEFT JOIN elt_payment_map pm
+    ON pm.raw_value = s.payment_method;
+"""
+
+CLEAN_SQL = """
+CREATE UNLOGGED TABLE elt_cleaned AS
+WITH medians AS (
+    SELECT
+        source_file,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS price_median,
+        trunc(percentile_cont(0.5) WITHIN GROUP (ORDER BY days)) AS days_median
+    FROM elt_parsed
+    GROUP BY source_file
+),
+
+filled AS (
+    SELECT
+        p.*,
+        COALESCE(p.price, m.price_median) AS price_filled,
+        COALESCE(p.days, m.days_median) AS days_filled,
+
+        -- Q8: duplicates within a year file
+        count(*) OVER (
+            PARTITION BY p.source_file, p.customer_id, p.product_id,
+                         p.order_date_clean, p.final_amount_inr::FLOAT8
+        ) AS copies
+    FROM elt_parsed p
+    JOIN medians m
+        ON m.source_file = p.source_file
+),
+
+corrected AS (
+    SELECT
+        f.*,
+
+        -- Q9: catalogue price correction (x100 / x10 typos, else outliers -> base price)
+        CASE
+            WHEN f.price_filled IS NULL OR cat.base_price IS NULL THEN f.price_filled
+            WHEN f.price_filled >= cat.base_price * 100 THEN round(f.price_filled / 100 * 100) / 100
+            WHEN f.price_filled >= cat.base_price * 10 THEN round(f.price_filled / 10 * 100) / 100
+            WHEN f.price_filled > cat.base_price * 3 OR f.price_filled < cat.base_price * 0.3
+                THEN round(cat.base_price * 100) / 100
+            ELSE round(f.price_filled * 100) / 100
+        END AS price_corrected
+    FROM filled f
+    LEFT JOIN (
+        -- first row wins if a product is listed twice
+        SELECT DISTINCT ON (product_id)
+            product_id,
+            elt_float(base_price_2015) AS base_price
+        FROM elt_catalogue
+        WHERE product_id IS NOT NULL
+        ORDER BY product_id, row_no
+    ) cat
+        ON cat.product_id = f.product_id
+    WHERE NOT (f.copies > 1 AND f.quantity::FLOAT8 = 1)
+)
+
+SELECT
+    transaction_id::TEXT,
+    order_date_clean AS order_date,
+
+    customer_id::TEXT,
+    product_id::TEXT,
+    product_name::TEXT,
+    category_clean AS category,
+    subcategory::TEXT,
+    brand::TEXT,
+
+    price_corrected::NUMERIC AS original_price_inr,
+    discount_percent::NUMERIC,
+    discounted_price_inr::NUMERIC,
+
+    quantity::FLOAT8::INT AS quantity,
+    subtotal_inr::NUMERIC,
+    delivery_charges::NUMERIC,
+    final_amount_inr::NUMERIC,
+
+    city AS customer_city,
+    customer_state::TEXT,
+    customer_tier::TEXT,
+    customer_spending_tier::TEXT,
+    customer_age_group::TEXT,
+
+    payment AS payment_method,
+
+    days_filled::INT AS delivery_days,
+    delivery_type::TEXT,
+
+    prime_member AS is_prime_member,
+    festival_sale AS is_festival_sale,
+    festival_name::TEXT,
+
+    rating::NUMERIC AS customer_rating,
+    return_status::TEXT,
+
+    order_month::FLOAT8::INT AS order_month,
+    order_year::FLOAT8::INT AS order_year,
+    order_quarter::FLOAT8::INT AS order_quarter,
+
+    product_weight_kg::NUMERIC,
+    prime_eligible AS is_prime_eligible,
+    product_rating::NUMERIC
+FROM corrected;
+"""
+
+
+# ================================
+# LOAD RAW FILES
+# ================================
+
+def read_header(path):
+    with open_text(path) as f:
+        return f.readline().strip().split(",")
+
+
+def create_text_table(cur, table, columns, extra=""):
+    cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(table)))
+    cur.execute(sql.SQL("CREATE UNLOGGED TABLE {} ({}{})").format(
+        sql.Identifier(table),
+        sql.SQL(extra),
+        sql.SQL(", ").join(sql.SQL("{} TEXT").format(sql.Identifier(c)) for c in columns),
+    ))
+
+
+def copy_file(cur, table, path, columns):
+    """COPY a (possibly compressed) CSV into table, header skipped."""
+    statement = sql.SQL("COPY {} ({}) FROM STDIN WITH CSV HEADER").format(
+        sql.Identifier(table),
+        sql.SQL(", ").join(sql.Identifier(c) for c in columns),
+    )
+    with open_text(path) as f:
+        cur.copy_expert(statement.as_string(cur), f)
+    return cur.rowcount
+
+
+def load_raw_orders(cur, files):
+    columns = read_header(files[0])
+    create_text_table(cur, "elt_raw_orders", columns, extra="source_file TEXT, ")
+
+    for path in files:
+        if read_header(path) != columns:
+            raise ValueError(f"Column mismatch in {path}")
+
+        # every COPY'd row is tagged with its file
+        cur.execute(
+            sql.SQL("ALTER TABLE elt_raw_orders ALTER COLUMN source_file SET DEFAULT {}").format(
+                sql.Literal(os.path.basename(path))
+            )
+        )
+        rows = copy_file(cur, "elt_raw_orders", path, columns)
+        print(f"✅ COPY {os.path.basename(path)} | {rows} rows")
+
+    return columns
+
+
+def load_catalogue(cur, path):
+    columns = read_header(path)
+    create_text_table(cur, "elt_catalogue", columns, extra="row_no BIGSERIAL, ")
+    rows = copy_file(cur, "elt_catalogue", path, columns)
+    print(f"✅ COPY {os.path.basename(path)} | {rows} products")
+
+
+# ================================
+# LOOKUP TABLES
+# ================================
+
+def build_city_lookup(cur):
+    """raw spelling -> city, resolved once per distinct spelling."""
+    cur.execute("SELECT DISTINCT elt_na(customer_city) FROM elt_raw_orders")
+    spellings = pd.Series([row[0] for row in cur.fetchall() if row[0] is not None], dtype=object)
+
+    # same alias cache as the pandas cleaner, which runs next to the raw files
+    resolver = CityResolver(cache_path=os.path.join(RAW_DIR, CITY_CACHE_FILE))
+    cities, _ = resolver.resolve(spellings)
+    resolver.save()
+
+    cur.execute("DROP TABLE IF EXISTS elt_city_lookup")
+    cur.execute("CREATE UNLOGGED TABLE elt_city_lookup (raw_value TEXT PRIMARY KEY, city TEXT)")
+    execute_values(cur, "INSERT INTO elt_city_lookup VALUES %s", list(zip(spellings, cities)))
+    cur.execute("ANALYZE elt_city_lookup")
+
+    print(f"🧭 City lookup: {len(spellings)} distinct spellings")
+
+
+def build_payment_lookup(cur):
+    cur.execute("DROP TABLE IF EXISTS elt_payment_lookup")
+    cur.execute(
+        "CREATE UNLOGGED TABLE elt_payment_lookup (priority INT, pattern TEXT, method TEXT)"
+    )
+    execute_values(
+        cur,
+        "INSERT INTO elt_payment_lookup VALUES %s",
+        [(i, pattern, method) for i, (pattern, method) in enumerate(PAYMENT_MAP.items())],
+    )
+
+    cur.execute("DROP TABLE IF EXISTS elt_payment_map")
+    cur.execute(PAYMENT_MAP_SQL)
+    cur.execute("ANALYZE elt_payment_map")
+
+
+# ================================
+# CLEAN
+# ================================
+
+def parse_sql(columns):
+    na_columns = ", ".join(f'elt_na("{c}") AS "{c}"' for c in columns)
+    return PARSE_SQL.format(na_columns=na_columns)
+
+
+def run_elt(files, catalogue_file):
+    timings = {}
+
+    with get_connection(autocommit=True) as conn:
+        cur = conn.cursor()
+
+        start = time.perf_counter()
+        columns = load_raw_orders(cur, files)
+        load_catalogue(cur, catalogue_file)
+        cur.execute("ANALYZE elt_raw_orders")
+        cur.execute("ANALYZE elt_catalogue")
+        timings["copy"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cur.execute(FUNCTIONS_SQL, {"na_values": NA_VALUES})
+        build_city_lookup(cur)
+        build_payment_lookup(cur)
+        timings["lookups"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cur.execute("SET max_parallel_workers_per_gather = %s", (PARALLEL_WORKERS,))
+        cur.execute("SET work_mem = %s", (WORK_MEM,))
+        for table in ("elt_parsed", "elt_cleaned"):
+            cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(table)))
+
+        # row-wise rules first (no cross-row work, so it parallelizes fully),
+        # then medians, duplicates and the catalogue correction
+        cur.execute(parse_sql(columns), {
+            "this_year": datetime.date.today().year,
+            "true_values": TRUE_VALUES,
+        })
+        cur.execute("ANALYZE elt_parsed")
+        cur.execute(CLEAN_SQL)
+        timings["clean"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cur.execute(STAGING_RAW_SQL)
+        cur.execute("INSERT INTO staging_raw SELECT * FROM elt_cleaned")
+        rows = cur.rowcount
+        timings["staging_raw"] = time.perf_counter() - start
+
+        if not KEEP_WORK_TABLES:
+            for table in WORK_TABLES:
+                cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(table)))
+
+        cur.close()
+
+    return rows, timings
+
+
+# ================================
+# RUN
+# ================================
+
+if __name__ == "__main__":
+
+    files = [resolve_path(os.path.join(RAW_DIR, f)) for f in YEAR_FILES]
+    missing = [f for f in files if not os.path.exists(f)]
+    if missing:
+        raise SystemExit(f"❌ Raw files missing: {missing}")
+
+    rows, timings = run_elt(files, resolve_path(os.path.join(RAW_DIR, CATALOGUE_FILE)))
+
+    print("\n⏱️ ELT TIMINGS")
+    for step, seconds in timings.items():
+        print(f"{step:<12} {seconds:>8.2f}s")
+
+    print(f"\n🎯 staging_raw rebuilt in-warehouse: {rows} rows")
@@ -0,0 +1,248 @@
+"""
+Power BI Incremental Extract Feed
+---------------------------------
+Exports the star schema built by build_star_schema.py to Parquet:
+
+powerbi_extracts/
+├── dimensions/products.parquet, customers.parquet, time_dimension.parquet
+├── transactions/period=<YYYY-MM, YYYY-MM-DD or unknown>/part-0.parquet
+└── manifest.json
+
+Fact partitions are only rewritten when fact_changes (see
+db_pipeline/fact_changes.py) logged a change to one of their dates
+since the last export: upsert_orders.py logs the dates of every batch,
+build_star_schema.py a full rebuild.  The fact table itself is not
+scanned.  manifest.json keeps, per partition, its date range, row
+count and updated_at (UTC time of the export that last wrote it), and
+the last change id it has seen.
+
+In Power BI, RangeStart / RangeEnd of the incremental-refresh policy
+only select the date window that is refreshed (range_start >=
+RangeStart and range_start < RangeEnd), not the partitions that
+changed.  To skip unchanged partitions inside that window, join the
+manifest's updated_at onto each partition's rows and pick it as the
+"Detect data changes" column of the policy.
+
+Orders without a parseable date (date_key NULL) go to their own
+partition, period=unknown, which has no date range; the policy has to
+load it on every refresh.
+
+Run:
+python db_pipeline/export_powerbi_extracts.py
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from db import get_connection
+from fact_changes import CHANGES_SQL, FACT_CHANGES_SCHEMA_SQL
+
+# ================================
+# CONFIG
+# ================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXPORT_DIR = os.path.join(BASE_DIR, "powerbi_extracts")
+
+PARTITION_BY = "month"   # "month" or "day"
+
+DIMENSIONS = ["products", "customers", "time_dimension"]
+
+NUMERIC_OID = 1700   # Postgres NUMERIC -> float64, so every partition has the same schema
+
+# date_key is YYYYMMDD, so a month partition is date_key / 100
+PARTITION_EXPR = {
+    "month": "date_key / 100",
+    "day": "date_key",
+}
+
+# partitions of a full export
+PARTITIONS_SQL = """
+SELECT DISTINCT {expr} AS partition_key
+FROM transactions
+ORDER BY 1;
+"""
+
+# partition of the orders without a date_key
+UNKNOWN_PARTITION = "unknown"
+
+
+# ================================
+# HELPERS
+# ================================
+
+def partition_key(date_key, partition_by):
+    """Partition key of a date_key (None for orders without a date)."""
+    if pd.isna(date_key):
+        return None
+    date_key = int(date_key)
+    return date_key if partition_by == "day" else date_key // 100
+
+
+def partition_range(key, partition_by):
+    """Returns (label, range_start, range_end_exclusive) for a partition key."""
+    if key is None:
+        return UNKNOWN_PARTITION, None, None
+    if partition_by == "day":
+        start = pd.Timestamp(str(key))
+        end = start + pd.Timedelta(days=1)
+        label = start.strftime("%Y-%m-%d")
+    else:
+        start = pd.Timestamp(year=key // 100, month=key % 100, day=1)
+        end = start + pd.DateOffset(months=1)
+        label = start.strftime("%Y-%m")
+    return label, start, end
+
+
+def partition_query(key, partition_by):
+    """SELECT of a partition's rows and its parameters."""
+    if key is None:
+        return "SELECT * FROM transactions WHERE date_key IS NULL", None
+    low, high = partition_bounds(key, partition_by)
+    return "SELECT * FROM transactions WHERE date_key BETWEEN %s AND %s", (low, high)
+
+
+def partition_bounds(key, partition_by):
+    """date_key bounds (inclusive) of a partition."""
+    if partition_by == "day":
+        return key, key
+    return key * 100 + 1, key * 100 + 31
+
+
+def read_query(conn, sql, params=None):
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    columns = [desc[0] for desc in cur.description]
+    frame = pd.DataFrame(cur.fetchall(), columns=columns)
+
+    for desc in cur.description:
+        if desc[1] == NUMERIC_OID:
+            frame[desc[0]] = frame[desc[0]].astype("float64")
+
+    cur.close()
+    return frame
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"partitions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(manifest, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def write_parquet(frame, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    frame.to_parquet(tmp_path, index=False, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+# ================================
+# EXPORT
+# ================================
+
+def export_extracts(conn, export_dir=EXPORT_DIR, partition_by=PARTITION_BY):
+    manifest_path = os.path.join(export_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+
+    if manifest.get("partition_by", partition_by) != partition_by:
+        print("⚠️ Partition grain changed, rebuilding all fact partitions")
+        shutil.rmtree(os.path.join(export_dir, "transactions"), ignore_errors=True)
+        manifest = {"partitions": {}}
+
+    watermark = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    # ---------- dimensions (small, always rewritten) ----------
+    for table in DIMENSIONS:
+        frame = read_query(conn, f"SELECT * FROM {table}")
+        write_parquet(frame, os.path.join(export_dir, "dimensions", f"{table}.parquet"))
+        print(f"📦 {table:<15} {len(frame):>10} rows")
+
+    # ---------- fact partitions (only changed ones) ----------
+    cur = conn.cursor()
+    cur.execute(FACT_CHANGES_SCHEMA_SQL)
+    conn.commit()
+    cur.close()
+
+    seen = manifest.get("last_change_id")
+    changes = read_query(conn, CHANGES_SQL, (seen or 0,))
+    conn.commit()   # releases the lock on fact_changes
+
+    last_change_id = int(changes["change_id"].max()) if not changes.empty else seen or 0
+
+    # no manifest, an older one or a rebuilt fact table: export everything
+    full = seen is None or bool(changes["full_rebuild"].any())
+
+    if full:
+        sql = PARTITIONS_SQL.format(expr=PARTITION_EXPR[partition_by])
+        keys = [None if pd.isna(k) else int(k) for k in read_query(conn, sql)["partition_key"]]
+        partitions = {}
+    else:
+        keys = {partition_key(k, partition_by) for k in changes["date_key"]}
+        partitions = dict(manifest["partitions"])
+    changed = 0
+
+    for key in keys:
+        label, start, end = partition_range(key, partition_by)
+        folder = os.path.join(export_dir, "transactions", f"period={label}")
+        frame = read_query(conn, *partition_query(key, partition_by))
+
+        # every row moved away or was deleted
+        if frame.empty:
+            partitions.pop(label, None)
+            shutil.rmtree(folder, ignore_errors=True)
+            continue
+
+        write_parquet(frame, os.path.join(folder, "part-0.parquet"))
+        changed += 1
+        partitions[label] = {
+            "updated_at": watermark,
+            "range_start": start.strftime("%Y-%m-%d") if start is not None else None,
+            "range_end": end.strftime("%Y-%m-%d") if end is not None else None,
+            "rows": len(frame),
+        }
+
+    # partitions a full export no longer has
+    if full:
+        for label in set(manifest["partitions"]) - set(partitions):
+            shutil.rmtree(os.path.join(export_dir, "transactions", f"period={label}"),
+                          ignore_errors=True)
+
+    manifest = {
+        "partition_by": partition_by,
+        "watermark": watermark,
+        "previous_watermark": manifest.get("watermark"),
+        "last_change_id": last_change_id,
+        "partitions": dict(sorted(partitions.items())),
+    }
+    write_manifest(manifest, manifest_path)
+
+    return changed, len(partitions)
+
+
+# ================================
+# EXECUTION
+# ================================
+
+if __name__ == "__main__":
+
+    print("🚀 Connecting to PostgreSQL...")
+
+    with get_connection() as conn:
+        print("✅ Connected")
+        changed, total = export_extracts(conn)
+
+    print(f"\n🔄 Fact partitions rewritten: {changed} / {total}")
+    print(f"🎯 Extracts written to {EXPORT_DIR}")
@@ -0,0 +1,56 @@
+"""
+Fact Change Log
+---------------
+fact_changes records which order dates of transactions were written,
+so export_powerbi_extracts.py rewrites only the partitions that hold
+them instead of scanning the whole fact table:
+
+  change_id      increasing id; an export remembers the last one it read
+  date_key       a date_key that gained, lost or changed rows
+                 (NULL = the orders without a date)
+  full_rebuild   TRUE for the row build_star_schema.py writes after
+                 rebuilding transactions: every partition changed
+  changed_at     time of the write
+
+db_pipeline/upsert_orders.py logs the date_keys of the batch's
+transaction_ids before and after its INSERT ... ON CONFLICT, so a
+correction that moves an order to another date marks both partitions.
+The table is never dropped, so change ids keep increasing across
+rebuilds.
+"""
+
+# ================================
+# SQL
+# ================================
+
+FACT_CHANGES_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS fact_changes (
+    change_id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    date_key INT,
+    full_rebuild BOOLEAN NOT NULL DEFAULT FALSE,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+FULL_REBUILD_SQL = """
+INSERT INTO fact_changes (full_rebuild) VALUES (TRUE);
+"""
+
+# date_keys currently held by the batch's transaction_ids
+BATCH_DATES_SQL = """
+INSERT INTO fact_changes (date_key)
+SELECT DISTINCT t.date_key
+FROM transactions t
+JOIN staging_delta d ON d.transaction_id = t.transaction_id;
+"""
+
+# SHARE mode waits for running upserts, so no change id below the
+# maximum read here can still be committed later
+CHANGES_SQL = """
+LOCK TABLE fact_changes IN SHARE MODE;
+
+SELECT change_id, date_key, full_rebuild
+FROM fact_changes
+WHERE change_id > %s
+ORDER BY change_id;
+"""
@@ -1,8 +1,9 @@
 import pandas as pd
-import psycopg2
 from psycopg2 import sql
 import os
 
+from db import STAGING_RAW_SQL, get_connection
+
 # ================================
 # CONFIG
 # ================================
@@ -15,14 +16,6 @@ CSV_PATH = os.path.join(
     "amazon_india_master_2015_2025.csv"
 )
 
-DB_CONFIG = {
-    "host": "localhost",
-    "port": 5432,
-    "dbname": "Amazon",
-    "user": "postgres",
-    "password": "Shivam@220"
-}
-
 # ================================
 # LOAD CSV
 # ================================
@@ -38,91 +31,36 @@ print("Columns:", df.shape[1])
 # CONNECT TO POSTGRES
 # ================================
 
-conn = psycopg2.connect(**DB_CONFIG)
-conn.autocommit = True
-cur = conn.cursor()
-
-print("✅ Connected to PostgreSQL")
-
-# ================================
-# CREATE STAGING TABLE
-# ================================
-
-cur.execute("""
-DROP TABLE IF EXISTS staging_raw;
-
-CREATE TABLE staging_raw (
-    transaction_id TEXT,
-    order_date DATE,
-
-    customer_id TEXT,
-    product_id TEXT,
-    product_name TEXT,
-    category TEXT,
-    subcategory TEXT,
-    brand TEXT,
-
-    original_price_inr NUMERIC,
-    discount_percent NUMERIC,
-    discounted_price_inr NUMERIC,
+with get_connection(autocommit=True) as conn:
+    cur = conn.cursor()
 
-    quantity INT,
-    subtotal_inr NUMERIC,
-    delivery_charges NUMERIC,
-    final_amount_inr NUMERIC,
+    print("✅ Connected to PostgreSQL")
 
-    customer_city TEXT,
-    customer_state TEXT,
-    customer_tier TEXT,
-    customer_spending_tier TEXT,
-    customer_age_group TEXT,
+    # ================================
+    # CREATE STAGING TABLE
+    # ================================
 
-    payment_method TEXT,
+    cur.execute(STAGING_RAW_SQL)
 
-    delivery_days INT,
-    delivery_type TEXT,
+    print("📦 staging_raw table created")
 
-    is_prime_member BOOLEAN,
-    is_festival_sale BOOLEAN,
-    festival_name TEXT,
+    # ================================
+    # LOAD DATA USING COPY
+    # ================================
 
-    customer_rating NUMERIC,
-    return_status TEXT,
+    with open(CSV_PATH, "r", encoding="utf-8") as f:
+        cur.copy_expert(
+            """
+            COPY staging_raw
+            FROM STDIN
+            WITH CSV HEADER
+            DELIMITER ','
+            """,
+            f
+        )
 
-    order_month INT,
-    order_year INT,
-    order_quarter INT,
-
-    product_weight_kg NUMERIC,
-    is_prime_eligible BOOLEAN,
-    product_rating NUMERIC
-);
-""")
-
-print("📦 staging_raw table created")
-
-# ================================
-# LOAD DATA USING COPY
-# ================================
-
-with open(CSV_PATH, "r", encoding="utf-8") as f:
-    cur.copy_expert(
-        """
-        COPY staging_raw
-        FROM STDIN
-        WITH CSV HEADER
-        DELIMITER ','
-        """,
-        f
-    )
-
-print("🚀 Data loaded into staging_raw")
-
-# ================================
-# CLOSE CONNECTION
-# ================================
+    print("🚀 Data loaded into staging_raw")
 
-cur.close()
-conn.close()
+    cur.close()
 
 print("🎯 LOAD COMPLETED SUCCESSFULLY")
@@ -0,0 +1,144 @@
+"""
+Calendar (Time Dimension) Generator
+-----------------------------------
+Builds the complete daily calendar for time_dimension in a vectorized
+way, so the warehouse never derives it from a GROUP BY over
+staging_raw and has no gaps on days without orders (needed for
+Power BI time intelligence).
+
+Used by build_star_schema.py; run on its own to preview:
+python db_pipeline/time_dimension.py
+"""
+
+import io
+from datetime import timedelta
+
+import pandas as pd
+
+# ================================
+# CONFIG
+# ================================
+
+CALENDAR_START = "2015-01-01"
+CALENDAR_END = "2025-12-31"
+
+# Fixed-date national holidays / sale days
+FIXED_FESTIVALS = {
+    (1, 26): "Republic Day",
+    (8, 15): "Independence Day",
+    (12, 25): "Christmas",
+}
+
+# Diwali moves every year (Lakshmi Puja date)
+DIWALI_DATES = [
+    "2015-11-11",
+    "2016-10-30",
+    "2017-10-19",
+    "2018-11-07",
+    "2019-10-27",
+    "2020-11-14",
+    "2021-11-04",
+    "2022-10-24",
+    "2023-11-12",
+    "2024-10-31",
+    "2025-10-20",
+]
+
+CALENDAR_COLUMNS = [
+    "date_key",
+    "full_date",
+    "year",
+    "quarter",
+    "month",
+    "month_name",
+    "week",
+    "day",
+    "day_name",
+    "is_weekend",
+    "is_festival",
+    "festival_name",
+]
+
+
+# ================================
+# GENERATOR
+# ================================
+
+def build_calendar(start=CALENDAR_START, end=CALENDAR_END):
+    """
+    One row per day between start and end (inclusive).
+    date_key is the integer surrogate key YYYYMMDD.
+    """
+    dates = pd.date_range(start, end, freq="D")
+
+    calendar = pd.DataFrame({
+        "date_key": dates.year * 10000 + dates.month * 100 + dates.day,
+        "full_date": dates.date,
+        "year": dates.year,
+        "quarter": dates.quarter,
+        "month": dates.month,
+        "month_name": dates.month_name(),
+        "week": dates.isocalendar().week.to_numpy(),
+        "day": dates.day,
+        "day_name": dates.day_name(),
+        "is_weekend": dates.dayofweek >= 5,
+    })
+
+    festival = pd.Series(pd.NA, index=dates, dtype="object")
+    for (month, day), name in FIXED_FESTIVALS.items():
+        festival[(dates.month == month) & (dates.day == day)] = name
+    festival[dates.isin(pd.to_datetime(DIWALI_DATES))] = "Diwali"
+
+    calendar["festival_name"] = festival.to_numpy()
+    calendar["is_festival"] = festival.notna().to_numpy()
+
+    return calendar[CALENDAR_COLUMNS]
+
+
+# ================================
+# BULK LOAD
+# ================================
+
+def copy_calendar(cur, calendar, table="time_dimension"):
+    """Bulk-loads a calendar frame with COPY."""
+    buffer = io.StringIO()
+    calendar.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(CALENDAR_COLUMNS)}) FROM STDIN WITH CSV",
+        buffer
+    )
+
+    return len(calendar)
+
+
+def ensure_date_coverage(cur, table="time_dimension"):
+    """
+    Checks that the calendar spans every order date in staging_raw and
+    generates any missing leading / trailing range.
+    Returns the number of days added.
+    """
+    cur.execute(f"SELECT MIN(full_date), MAX(full_date) FROM {table}")
+    cal_start, cal_end = cur.fetchone()
+
+    cur.execute("SELECT MIN(order_date), MAX(order_date) FROM staging_raw")
+    first_order, last_order = cur.fetchone()
+
+    added = 0
+    if first_order is not None and first_order < cal_start:
+        added += copy_calendar(cur, build_calendar(first_order, cal_start - timedelta(days=1)), table)
+    if last_order is not None and last_order > cal_end:
+        added += copy_calendar(cur, build_calendar(cal_end + timedelta(days=1), last_order), table)
+
+    return added
+
+
+if __name__ == "__main__":
+
+    calendar = build_calendar()
+
+    print("📅 Calendar rows:", len(calendar))
+    print(calendar.head(10).to_string(index=False))
+    print("\nFestival days:", int(calendar["is_festival"].sum()))
+    print("Weekend days:", int(calendar["is_weekend"].sum()))
@@ -0,0 +1,215 @@
+"""
+Incremental Warehouse Upsert
+----------------------------
+Merges a batch of cleaned orders (one daily delta, see
+ingest_deltas.py) into staging_raw and the star schema built by
+build_star_schema.py, in one transaction, without rebuilding anything:
+
+  staging_delta       the batch, COPY'd into a temp table
+  staging_raw         rows of the batch replace rows with the same
+                      transaction_id, so a later full rebuild sees them
+  key maps            surrogate keys for new product / customer ids only
+  products            inserted or updated from the batch
+  customers           new versions for the batch's customers whose
+                      attribute hash differs from their current
+                      version (db_pipeline/customer_scd.py)
+  time_dimension      extended if the batch lies outside the calendar
+  transactions        INSERT ... ON CONFLICT (transaction_id) DO UPDATE
+  fact_changes        the date_keys the batch's transaction_ids had
+                      before and have after the upsert
+                      (db_pipeline/fact_changes.py)
+
+The next run of export_powerbi_extracts.py rewrites only the fact
+partitions logged in fact_changes.
+
+Usage (from the project root):
+    from db_pipeline.upsert_orders import upsert_orders
+    counts = upsert_orders(df)
+"""
+
+import io
+import sys
+
+from db_pipeline.customer_scd import CUSTOMER_VERSION_JOIN, CUSTOMER_VERSIONS_SQL
+from db_pipeline.db import get_connection
+from db_pipeline.fact_changes import BATCH_DATES_SQL, FACT_CHANGES_SCHEMA_SQL
+from db_pipeline.time_dimension import ensure_date_coverage
+
+# ================================
+# SQL
+# ================================
+
+STAGING_COLUMNS_SQL = """
+SELECT column_name
+FROM information_schema.columns
+WHERE table_schema = current_schema() AND table_name = 'staging_raw'
+ORDER BY ordinal_position;
+"""
+
+DELTA_TABLE_SQL = """
+CREATE TEMP TABLE staging_delta (LIKE staging_raw) ON COMMIT DROP;
+"""
+
+STAGING_SQL = """
+DELETE FROM staging_raw s
+USING staging_delta d
+WHERE s.transaction_id = d.transaction_id;
+
+INSERT INTO staging_raw
+SELECT * FROM staging_delta;
+"""
+
+DIMENSIONS_SQL = """
+-- ASSIGN KEYS TO NEW IDS ONLY
+
+INSERT INTO product_key_map (product_id)
+SELECT DISTINCT product_id
+FROM staging_delta
+WHERE product_id IS NOT NULL
+ORDER BY product_id
+ON CONFLICT (product_id) DO NOTHING;
+
+INSERT INTO customer_key_map (customer_id)
+SELECT DISTINCT customer_id
+FROM staging_delta
+WHERE customer_id IS NOT NULL
+ORDER BY customer_id
+ON CONFLICT (customer_id) DO NOTHING;
+
+-- UPSERT DIMENSIONS
+
+INSERT INTO products
+SELECT DISTINCT ON (s.product_id)
+    m.product_key,
+    s.product_id,
+    s.product_name,
+    s.category,
+    s.subcategory,
+    s.brand,
+    s.product_weight_kg,
+    s.is_prime_eligible,
+    s.product_rating
+FROM staging_delta s
+JOIN product_key_map m ON m.product_id = s.product_id
+ORDER BY s.product_id
+ON CONFLICT (product_key) DO UPDATE SET
+    product_name = EXCLUDED.product_name,
+    category = EXCLUDED.category,
+    subcategory = EXCLUDED.subcategory,
+    brand = EXCLUDED.brand,
+    product_weight_kg = EXCLUDED.product_weight_kg,
+    is_prime_eligible = EXCLUDED.is_prime_eligible,
+    product_rating = EXCLUDED.product_rating;
+""" + CUSTOMER_VERSIONS_SQL.format(source="staging_delta")
+
+FACT_SQL = """
+INSERT INTO transactions
+SELECT DISTINCT ON (s.transaction_id)
+    s.transaction_id,
+    (EXTRACT(YEAR FROM s.order_date) * 10000
+     + EXTRACT(MONTH FROM s.order_date) * 100
+     + EXTRACT(DAY FROM s.order_date))::INT,
+    ck.customer_key,
+    cv.customer_version_key,
+    pk.product_key,
+    quantity,
+    subtotal_inr,
+    discount_percent,
+    discounted_price_inr,
+    delivery_charges,
+    final_amount_inr,
+    delivery_days,
+    delivery_type,
+    payment_method,
+    return_status,
+    is_festival_sale,
+    festival_name,
+    customer_rating
+FROM staging_delta s
+LEFT JOIN customer_key_map ck ON ck.customer_id = s.customer_id
+LEFT JOIN product_key_map pk ON pk.product_id = s.product_id
+""" + CUSTOMER_VERSION_JOIN + """
+ORDER BY s.transaction_id
+ON CONFLICT (transaction_id) DO UPDATE SET
+    date_key = EXCLUDED.date_key,
+    customer_key = EXCLUDED.customer_key,
+    customer_version_key = EXCLUDED.customer_version_key,
+    product_key = EXCLUDED.product_key,
+    quantity = EXCLUDED.quantity,
+    subtotal_inr = EXCLUDED.subtotal_inr,
+    discount_percent = EXCLUDED.discount_percent,
+    discounted_price_inr = EXCLUDED.discounted_price_inr,
+    delivery_charges = EXCLUDED.delivery_charges,
+    final_amount_inr = EXCLUDED.final_amount_inr,
+    delivery_days = EXCLUDED.delivery_days,
+    delivery_type = EXCLUDED.delivery_type,
+    payment_method = EXCLUDED.payment_method,
+    return_status = EXCLUDED.return_status,
+    is_festival_sale = EXCLUDED.is_festival_sale,
+    festival_name = EXCLUDED.festival_name,
+    customer_rating = EXCLUDED.customer_rating;
+"""
+
+
+# ================================
+# UPSERT
+# ================================
+
+def _copy_frame(cur, df, table, columns):
+    """COPY of df (in staging_raw column order) into table."""
+    frame = df[columns].copy()
+    # delivery_days is float after the median fill; the column is INT
+    frame["delivery_days"] = frame["delivery_days"].round().astype("Int64")
+
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH CSV", buffer)
+
+
+def upsert_orders(df):
+    """
+    Merges cleaned orders into staging_raw and the star schema in one
+    transaction.  Returns {"staging_rows", "transactions", "days_added"}.
+    """
+    if df.empty:
+        return {"staging_rows": 0, "transactions": 0, "days_added": 0}
+
+    with get_connection() as conn:
+        cur = conn.cursor()
+
+        cur.execute(STAGING_COLUMNS_SQL)
+        columns = [row[0] for row in cur.fetchall()]
+
+        cur.execute(DELTA_TABLE_SQL)
+        _copy_frame(cur, df, "staging_delta", columns)
+
+        cur.execute(STAGING_SQL)
+        staging_rows = cur.rowcount
+
+        cur.execute(DIMENSIONS_SQL)
+
+        # the batch is in staging_raw now, so its dates are covered too
+        days_added = ensure_date_coverage(cur)
+
+        # the partitions the batch leaves and the ones it lands in
+        cur.execute(FACT_CHANGES_SCHEMA_SQL)
+        cur.execute(BATCH_DATES_SQL)
+        cur.execute(FACT_SQL)
+        transactions = cur.rowcount
+        cur.execute(BATCH_DATES_SQL)
+
+        cur.close()
+
+    return {"staging_rows": staging_rows, "transactions": transactions, "days_added": days_added}
+
+
+if __name__ == "__main__":
+
+    from cleaning.csv_io import read_csv
+
+    # python -m db_pipeline.upsert_orders <cleaned orders CSV>
+    counts = upsert_orders(read_csv(sys.argv[1]))
+    print(f"🎯 Upserted {counts['transactions']} transactions "
+          f"| {counts['staging_rows']} staging rows | {counts['days_added']} calendar days added")
@@ -1,25 +1,15 @@
 """
 Validate Warehouse Row Counts
 -----------------------------
-Checks staging vs star-schema tables.
+Checks staging vs star-schema tables.  Every staging_raw row should
+be a fact (rows without a customer / product id keep a NULL key), so
+row counts and revenue of staging_raw and transactions must agree.
 
 Run:
 python db_pipeline/validate_warehouse_counts.py
 """
 
-import psycopg2
-
-# ================================
-# DB CONFIG
-# ================================
-
-DB_CONFIG = {
-    "host": "localhost",
-    "port": 5432,
-    "dbname": "Amazon",
-    "user": "postgres",
-    "password": "Shivam@220"   # <-- CHANGE
-}
+from db import get_connection
 
 # ================================
 # QUERIES TO RUN
@@ -29,8 +19,22 @@ QUERIES = {
     "staging_raw": "SELECT COUNT(*) FROM staging_raw;",
     "products": "SELECT COUNT(*) FROM products;",
     "customers": "SELECT COUNT(*) FROM customers;",
+    "customers (current)": "SELECT COUNT(*) FROM customers WHERE is_current;",
     "time_dimension": "SELECT COUNT(*) FROM time_dimension;",
     "transactions": "SELECT COUNT(*) FROM transactions;",
+    "product_key_map": "SELECT COUNT(*) FROM product_key_map;",
+    "customer_key_map": "SELECT COUNT(*) FROM customer_key_map;",
+    "customer_version_map": "SELECT COUNT(*) FROM customer_version_map;",
+    "facts w/o customer": "SELECT COUNT(*) FROM transactions WHERE customer_key IS NULL;",
+    "facts w/o product": "SELECT COUNT(*) FROM transactions WHERE product_key IS NULL;",
+}
+
+# (staging_raw query, transactions query) that must return the same value
+CHECKS = {
+    "row count": ("SELECT COUNT(*) FROM staging_raw;",
+                  "SELECT COUNT(*) FROM transactions;"),
+    "revenue": ("SELECT COALESCE(SUM(final_amount_inr), 0) FROM staging_raw;",
+                "SELECT COALESCE(SUM(final_amount_inr), 0) FROM transactions;"),
 }
 
 # ================================
@@ -39,20 +43,39 @@ QUERIES = {
 
 print("🚀 Connecting to PostgreSQL...")
 
-conn = psycopg2.connect(**DB_CONFIG)
-cur = conn.cursor()
+with get_connection() as conn:
+    cur = conn.cursor()
+
+    print("✅ Connected\n")
+
+    print("📊 WAREHOUSE VALIDATION COUNTS")
+    print("-" * 40)
+
+    for table, query in QUERIES.items():
+        cur.execute(query)
+        count = cur.fetchone()[0]
+        print(f"{table:<20} : {count}")
 
-print("✅ Connected\n")
+    print("\n🔍 STAGING vs FACTS")
+    print("-" * 40)
 
-print("📊 WAREHOUSE VALIDATION COUNTS")
-print("-" * 40)
+    mismatches = 0
+    for check, (staging_query, fact_query) in CHECKS.items():
+        cur.execute(staging_query)
+        staging = cur.fetchone()[0]
+        cur.execute(fact_query)
+        facts = cur.fetchone()[0]
 
-for table, query in QUERIES.items():
-    cur.execute(query)
-    count = cur.fetchone()[0]
-    print(f"{table:<15} : {count}")
+        if staging == facts:
+            print(f"✅ {check:<17} : {facts}")
+        else:
+            mismatches += 1
+            print(f"⚠️ {check:<17} : staging {staging} | transactions {facts} "
+                  f"| difference {staging - facts}")
 
-cur.close()
-conn.close()
+    cur.close()
 
-print("\n🎯 Validation completed successfully.")
+if mismatches:
+    print(f"\n❌ Validation found {mismatches} staging / fact mismatch(es).")
+else:
+    print("\n🎯 Validation completed successfully.")
@@ -0,0 +1,311 @@
+"""
+Micro-Batch Ingestion
+---------------------
+Watches an inbox for daily delta files (raw orders with the columns
+of the yearly files) and takes every file through the whole pipeline
+in one go, without a full run:
+
+  inbox/amazon_india_delta_<date>.csv (.gz / .zst)
+    -> clean       the rules of All_clean_amazon.py (cleaning/rules.py)
+    -> dedup       transaction_ids against the master's id index: a
+                   known id is a re-delivery (dropped) if the row is
+                   unchanged and a correction otherwise; new orders
+                   against the master rows of the last
+                   DEDUP_WINDOW_DAYS (read through the zone map)
+    -> warehouse   new orders and corrections upserted into staging_raw
+                   and the star schema (db_pipeline/upsert_orders.py,
+                   one transaction)
+    -> master      corrections replaced in place, new orders appended,
+                   zone map and id index updated (analytics/zonemap.py)
+    -> inbox/processed/   (inbox/failed/ if any stage raised)
+
+Every batch appends one JSON line to inbox/ingestion_log.jsonl: file,
+content hash, rows in / out, date range, the quality and dedup
+counters, rows upserted / appended / corrected and the seconds per
+stage.  A file whose content was already ingested is skipped, so
+re-delivered deltas are harmless.  Producers should write a delta under another
+name and rename it into the inbox once complete.
+
+Medians (Questions 2 and 7) are taken over the delta itself.  The
+customer shards and the per-year sketches / quality metrics are not
+touched; they are rebuilt by the next full run, which only contains
+the deltas once they are part of the yearly files.
+
+Run (from the project root, catalogue in the project root):
+python ingest_deltas.py             # process the inbox once
+python ingest_deltas.py --watch     # keep polling it
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from analytics.loader import MASTER_PATH, load_master
+from analytics.quality import QualityCounters
+from analytics.zonemap import append_blocked_csv, read_rows_by_id, replace_blocked_rows, rows_as_text
+from cleaning.catalogue_index import load_price_index
+from cleaning.city_resolver import CityResolver
+from cleaning.csv_io import COMPRESSION_SUFFIXES, read_csv
+from cleaning.rules import DUP_COLS, clean_orders
+from db_pipeline.db import close_pool
+from db_pipeline.upsert_orders import upsert_orders
+
+# ======================================================
+# CONFIGURATION
+# ======================================================
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+INBOX_DIR = os.path.join(BASE_DIR, "inbox")
+
+DELTA_PREFIX = "amazon_india_delta_"
+
+LOG_FILE = "ingestion_log.jsonl"
+
+CATALOGUE_FILE = "amazon_india_products_catalog.csv"
+
+# master rows this many days before a delta's first order are
+# checked for duplicates of its rows
+DEDUP_WINDOW_DAYS = 7
+
+# seconds between two looks at the inbox in --watch mode
+POLL_SECONDS = 5
+
+# False = clean, dedup and append to the master only
+UPSERT_WAREHOUSE = True
+
+
+# ======================================================
+# INBOX & LOG
+# ======================================================
+
+def pending_files(inbox):
+    """Delta files in the inbox, oldest name first."""
+    suffixes = [".csv"] + [".csv" + s for s in COMPRESSION_SUFFIXES.values()]
+    paths = []
+    for suffix in suffixes:
+        paths += glob.glob(os.path.join(inbox, DELTA_PREFIX + "*" + suffix))
+    return sorted(paths)
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ingested_hashes(inbox):
+    path = os.path.join(inbox, LOG_FILE)
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return {e["hash"] for e in entries if e["status"] == "ingested"}
+
+
+def append_log(inbox, entry):
+    with open(os.path.join(inbox, LOG_FILE), "a") as f:
+        f.write(json.dumps(entry, default=str) + "\n")
+
+
+def move_to(path, folder):
+    os.makedirs(folder, exist_ok=True)
+    shutil.move(path, os.path.join(folder, os.path.basename(path)))
+
+
+# ======================================================
+# DEDUP AGAINST RECENT HISTORY
+# ======================================================
+
+def dedup_against_history(df, quality, master_path=MASTER_PATH, filled=None):
+    """
+    Splits a cleaned batch into new orders and corrections of master
+    rows.  Rows repeating a transaction_id of the batch are dropped; a
+    row whose transaction_id is in the master is dropped if equal to
+    the master row (a re-delivery) and is a correction otherwise.
+    New quantity-1 rows equal on DUP_COLS to a master row of the last
+    DEDUP_WINDOW_DAYS are dropped (Question 8 across the batch
+    boundary).
+
+    Known ids are found through the master's id index, so only their
+    blocks are read.  filled is clean_orders' {column: median-filled
+    mask}.  Returns (new rows, corrections, master rows read).
+    """
+    filled = filled or {}
+    repeated = quality.count("history_dedup", "repeated_in_batch",
+                             df["transaction_id"].duplicated())
+
+    known_rows = read_rows_by_id(master_path, df["transaction_id"])
+    known = df["transaction_id"].astype(str).isin(known_rows["transaction_id"]).to_numpy() & ~repeated
+
+    columns = list(known_rows.columns)
+    changed = np.zeros(len(df), dtype=bool)
+    if known.any():
+        delta_rows = rows_as_text(df[known], columns).set_index("transaction_id")
+        master_rows = known_rows.drop_duplicates("transaction_id").set_index("transaction_id")
+        master_rows = master_rows.loc[delta_rows.index]
+
+        # median-filled cells depend on the batch, not on the order:
+        # they are not compared and keep the master's value
+        kept = {}
+        for col, mask in filled.items():
+            cells = mask.reindex(df.index, fill_value=False)[known].to_numpy()
+            delta_rows.loc[cells, col] = master_rows.loc[cells, col].to_numpy()
+            kept[col] = pd.Series(master_rows[col].where(cells).to_numpy(), index=df.index[known])
+
+        same = (delta_rows.fillna("") == master_rows.fillna("")).all(axis=1).to_numpy()
+        changed[np.flatnonzero(known)[~same]] = True
+
+        df = df.copy()
+        for col, values in kept.items():
+            values = pd.to_numeric(values.dropna(), errors="coerce")
+            df.loc[values.index, col] = values
+
+    quality.count("history_dedup", "already_in_master", known & ~changed)
+    corrections = quality.count("history_dedup", "correction", changed)
+
+    dates = pd.to_datetime(df["order_date"], errors="coerce")
+    if dates.notna().any():
+        window = (dates.min() - pd.Timedelta(days=DEDUP_WINDOW_DAYS), dates.max())
+        history = load_master(master_path, columns=["transaction_id"] + DUP_COLS, dates=window)
+    else:
+        history = pd.DataFrame(columns=["transaction_id"] + DUP_COLS)
+
+    keys = pd.MultiIndex.from_arrays([
+        df["customer_id"], df["product_id"], dates, pd.to_numeric(df["final_amount_inr"], errors="coerce"),
+    ])
+    history_keys = pd.MultiIndex.from_arrays([
+        history["customer_id"], history["product_id"], history["order_date"], history["final_amount_inr"],
+    ])
+    duplicate = quality.count("history_dedup", "duplicate_of_master",
+                              ~repeated & ~known & keys.isin(history_keys) & (df["quantity"] == 1))
+
+    new = ~(repeated | known | duplicate)
+    return df[new], df[corrections], len(history) + len(known_rows)
+
+
+# ======================================================
+# INGEST ONE DELTA
+# ======================================================
+
+def ingest_file(path, price_index, city_resolver, master_path=MASTER_PATH,
+                upsert=UPSERT_WAREHOUSE):
+    """Cleans, dedups, upserts and appends one delta.  Returns its log entry."""
+    seconds = {}
+
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        seconds[stage] = round(time.perf_counter() - start, 3)
+        return result
+
+    df = timed("read", lambda: read_csv(path, verbose=False))
+
+    quality = QualityCounters(os.path.basename(path))
+    quality.rows_in = len(df)
+
+    filled = {}
+    df = timed("clean", clean_orders, df, quality, price_index, city_resolver, filled)
+    df, corrections, history_rows = timed("dedup", dedup_against_history, df, quality,
+                                          master_path, filled)
+    quality.rows_out = len(df) + len(corrections)
+
+    # corrections take the ON CONFLICT ... DO UPDATE path
+    counts = timed("warehouse", upsert_orders, pd.concat([df, corrections])) if upsert else {}
+    corrected = timed("master_corrections", replace_blocked_rows, corrections, master_path)
+    appended = timed("master", append_blocked_csv, df, master_path)
+
+    city_resolver.save()
+
+    dates = pd.to_datetime(df["order_date"], errors="coerce")
+    return {
+        "rows_in": quality.rows_in,
+        "rows_out": quality.rows_out,
+        "order_date_min": str(dates.min().date()) if dates.notna().any() else None,
+        "order_date_max": str(dates.max().date()) if dates.notna().any() else None,
+        "history_rows_checked": history_rows,
+        "master_rows_appended": appended,
+        "master_rows_corrected": corrected,
+        "warehouse": counts,
+        "rules": quality.rules,
+        "seconds": seconds,
+    }
+
+
+def process_inbox(inbox, price_index, city_resolver, master_path=MASTER_PATH):
+    """Ingests every pending delta once.  Returns the number of files handled."""
+    done = ingested_hashes(inbox)
+    files = pending_files(inbox)
+
+    for path in files:
+        start = time.perf_counter()
+        entry = {
+            "file": os.path.basename(path),
+            "hash": file_hash(path),
+            "received_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+        if entry["hash"] in done:
+            entry["status"] = "skipped_duplicate_file"
+            move_to(path, os.path.join(inbox, "processed"))
+            print(f"⏭️  {entry['file']}: already ingested")
+        else:
+            try:
+                entry.update(ingest_file(path, price_index, city_resolver, master_path))
+                entry["status"] = "ingested"
+                done.add(entry["hash"])
+                move_to(path, os.path.join(inbox, "processed"))
+                print(f"✅ {entry['file']}: {entry['rows_in']} rows in | {entry['rows_out']} ingested "
+                      f"| {time.perf_counter() - start:.2f}s")
+            except Exception as exc:
+                entry["status"] = "failed"
+                entry["error"] = f"{type(exc).__name__}: {exc}"
+                move_to(path, os.path.join(inbox, "failed"))
+                print(f"❌ {entry['file']}: {entry['error']}")
+
+        entry["seconds_total"] = round(time.perf_counter() - start, 3)
+        append_log(inbox, entry)
+
+    return len(files)
+
+
+# ======================================================
+# RUN
+# ======================================================
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Micro-batch ingestion of daily delta files")
+    parser.add_argument("--inbox", default=INBOX_DIR)
+    parser.add_argument("--master", default=MASTER_PATH)
+    parser.add_argument("--watch", action="store_true", help="keep polling the inbox")
+    args = parser.parse_args()
+
+    os.makedirs(args.inbox, exist_ok=True)
+
+    # loaded once, reused by every batch
+    price_index = load_price_index(CATALOGUE_FILE)
+    city_resolver = CityResolver()
+
+    print(f"📥 Watching {args.inbox}" if args.watch else f"📥 Processing {args.inbox}")
+
+    try:
+        while True:
+            process_inbox(args.inbox, price_index, city_resolver, args.master)
+            if not args.watch:
+                break
+            time.sleep(POLL_SECONDS)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped")
+    finally:
+        close_pool()
@@ -1,5 +1,12 @@
 import pandas as pd
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.shards import shard_dir, write_shards
+from analytics.zonemap import write_blocked_csv
+from cleaning.csv_io import read_csv, resolve_path, write_csv
 
 # ==========================================
 # MASTER DATA CREATION (2015–2025)
@@ -16,6 +23,17 @@ import os
 
 BASE_PATH = ".."  # go one level up from /master
 
+# None, "gzip" or "zstd" for the master file
+# (the zone-map index is only written for the uncompressed master)
+OUTPUT_COMPRESSION = None
+
+# rows per zone-map block
+BLOCK_ROWS = 50_000
+
+# number of customer-hash shards for the per-customer analyses
+# (analytics/customers.py); None = no shards
+CUSTOMER_SHARDS = None
+
 YEAR_FILES = [
     "amazon_india_2015_cleaned.csv",
     "amazon_india_2016_cleaned.csv",
@@ -35,13 +53,14 @@ all_dfs = []
 print("📥 Loading cleaned yearly files...")
 
 for file in YEAR_FILES:
-    file_path = os.path.join(BASE_PATH, file)
+    # cleaned files may have been written as .csv.gz / .csv.zst
+    file_path = resolve_path(os.path.join(BASE_PATH, file))
 
     if not os.path.exists(file_path):
         print(f"❌ File missing: {file_path}")
         continue
 
-    df = pd.read_csv(file_path)
+    df = read_csv(file_path)
     print(f"✅ Loaded {file} | Shape: {df.shape}")
     all_dfs.append(df)
 
@@ -64,7 +83,19 @@ print(
 # SAVE MASTER FILE
 # ==========================================
 OUTPUT_FILE = "amazon_india_master_2015_2025.csv"
-master_df.to_csv(OUTPUT_FILE, index=False)
+
+if OUTPUT_COMPRESSION is None:
+    # sorted by order_date in row blocks + zone-map sidecar (data skipping)
+    blocks = write_blocked_csv(master_df, OUTPUT_FILE, block_rows=BLOCK_ROWS)
+    print(f"🧭 Zone map written: {blocks} blocks of {BLOCK_ROWS} rows")
+else:
+    OUTPUT_FILE = write_csv(master_df, OUTPUT_FILE, compression=OUTPUT_COMPRESSION)
+
+if CUSTOMER_SHARDS:
+    # one file per hash(customer_id) % CUSTOMER_SHARDS, sorted by customer_id, order_date
+    shards_path = shard_dir(OUTPUT_FILE)
+    manifest = write_shards(master_df, shards_path, CUSTOMER_SHARDS, compression=OUTPUT_COMPRESSION)
+    print(f"🧩 {manifest['n_shards']} customer shards written to {shards_path}")
 
 print("\n✅ MASTER DATASET CREATED SUCCESSFULLY")
 print(f"📁 File saved as: {OUTPUT_FILE}")
@@ -0,0 +1,31 @@
+import json
+
+import pandas as pd
+
+from cleaning.city_resolver import CityResolver
+
+
+def resolve(spellings, cache_path=None):
+    cities, how = CityResolver(cache_path=cache_path).resolve(pd.Series(spellings))
+    return list(cities), list(how)
+
+
+def test_real_near_neighbour_cities_are_not_merged():
+    cities, how = resolve(["Raipur", "Kannur", "Jajpur", "Nagaur", "Jodhpur", "Solapur"])
+    assert cities == ["Raipur", "Kannur", "Jajpur", "Nagaur", "Jodhpur", "Solapur"]
+    assert how == ["unresolved"] * 6
+
+
+def test_long_typos_still_match():
+    cities, how = resolve(["mumbaai", "hyderbad", "new delhii", "visakapatnam"])
+    assert cities == ["Mumbai", "Hyderabad", "Delhi", "Visakhapatnam"]
+    assert how == ["fuzzy"] * 4
+
+
+def test_cached_fuzzy_matches_are_dropped_when_the_gazetteer_changes(tmp_path):
+    cache_path = tmp_path / "city_alias_cache.json"
+    cache_path.write_text(json.dumps({"gazetteer": "old", "aliases": {"raipur": "Jaipur"}}))
+
+    cities, how = resolve(["Raipur"], cache_path=str(cache_path))
+    assert cities == ["Raipur"]
+    assert how == ["unresolved"]